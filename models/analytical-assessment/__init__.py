@@ -6,9 +6,11 @@ This package powers the analytical reasoning component of the AuraSkill Career G
 Modules:
     app.py                - FastAPI entrypoint with /generate-question and /evaluate endpoints
     question_generator.py - LLM-based analytical question generator
+    question_pipeline.py  - Concurrent generate→validate pipeline used by /start-quiz
+    question_bank.py      - SQLite bank of pre-validated questions with background refill
     validator.py          - Multi-layer validation (structure, logic, Bloom’s taxonomy)
     evaluator.py          - User answer evaluation and skill profiling
-    utils/                - Helper utilities (Bloom classifier, SymPy checker, difficulty estimator)
+    utils/                - Helper utilities (Bloom classifier, SymPy checker, LLM backend + fake LLM, metrics)
 """
 
 # Import commonly used functions for easier package-level access
@@ -1,31 +1,96 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 from question_generator import generate_question
 from validator import validate_question
 from evaluator import evaluate_answers
-from utils.career_mapper import get_categories_for_career
-
+from batch_evaluator import evaluate_batch
+from question_pipeline import generate_valid_questions, stream_valid_questions
+from question_bank import QuestionBank, BankRefiller, bucket_key
+from utils.career_mapper import get_categories_for_career, aget_categories_for_career
+from utils.validation_cache import validation_cache
+from utils.llm_client import current_endpoint
+from utils.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from utils.session_backend import make_session_backend
+
+import os
 import random
+import asyncio
+import re
+import uuid
+from contextlib import asynccontextmanager, aclosing
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 
 
+#  Question Bank (pre-generated, validated questions)
+
+question_bank = QuestionBank()
+bank_refiller = BankRefiller(question_bank)
+
+
+#  Session Store (SESSION_BACKEND = memory | sqlite | redis)
+
+# Per-user quiz state, kept compact: bank ids of the session's questions plus
+# the answers so far. With sqlite/redis any worker can serve any request.
+# Backend calls can block on locks or network round trips (SQLite BEGIN
+# IMMEDIATE, Redis WATCH retries), so async code runs them in a thread.
+sessions = make_session_backend("analytical")
+SESSION_SWEEP_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+
+
+async def _sweep_sessions():
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_SECONDS)
+        await asyncio.to_thread(sessions.sweep)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    bank_refiller.start()
+    sweeper = asyncio.create_task(_sweep_sessions())
+    yield
+    sweeper.cancel()
+    await bank_refiller.stop()
+
+
 #  FastAPI Initialization
 
 app = FastAPI(
     title="Analytical Skill Assessment Model API",
     description="LLM-based analytical skill assessment system that pre-generates 12 validated questions.",
-    version="3.0.0"
+    version="3.0.0",
+    lifespan=lifespan
 )
 
 load_dotenv()
 
 
-#  Temporary In-Memory Session Store
+#  LLM Cost Attribution
+
+@app.middleware("http")
+async def tag_llm_endpoint(request: Request, call_next):
+    """Labels LLM calls made while serving this request with its route path."""
+    token = current_endpoint.set(request.url.path)
+    try:
+        return await call_next(request)
+    finally:
+        current_endpoint.reset(token)
+
+
+#  Worker-local progressive generation state
 
-# This keeps per-user quiz state. In production, use Redis or MongoDB.
-sessions: Dict[str, Dict[str, Any]] = {}
+# user_id -> background filler task / condition notified as questions land.
+# Waiters on other workers poll the session store instead.
+_fillers: Dict[str, asyncio.Task] = {}
+_ready: Dict[str, asyncio.Condition] = {}
+QUESTION_POLL_SECONDS = 0.25
+_QUESTION_ID = re.compile(r"Q(\d+)")
+
+# Progressive mode returns the first question as soon as it is validated and
+# generates the rest in the background while the user answers.
+PROGRESSIVE_START = os.getenv("ANALYTICAL_PROGRESSIVE_START", "false").lower() == "true"
+QUESTION_WAIT_TIMEOUT = float(os.getenv("ANALYTICAL_QUESTION_WAIT_TIMEOUT", "60"))
 
 
 # Request Models
@@ -36,6 +101,7 @@ class GenerationRequest(BaseModel):
     AL_stream: str
     category: Optional[str] = None
     difficulty: Optional[str] = None
+    progressive: Optional[bool] = None
 
 class AnswerRequest(BaseModel):
     user_id: str
@@ -49,6 +115,18 @@ class EvaluationRequest(BaseModel):
     correct_answers: Dict[str, Any]
     question_metadata: Optional[Dict[str, Any]] = Field(default=None)
 
+class BatchUser(BaseModel):
+    user_id: str
+    user_answers: Dict[str, Any]
+    # per-user answer key; when omitted the request's shared key is used
+    correct_answers: Optional[Dict[str, Any]] = None
+    question_metadata: Optional[Dict[str, Any]] = None
+
+class BatchEvaluationRequest(BaseModel):
+    users: List[BatchUser]
+    correct_answers: Optional[Dict[str, Any]] = None
+    question_metadata: Optional[Dict[str, Any]] = Field(default=None)
+
 
 #  Helper: Generate a single valid question
 
@@ -68,6 +146,110 @@ def generate_single_valid_question(career: str, stream: str, category: Optional[
     raise ValueError("Failed to generate a valid analytical question after multiple attempts.")
 
 
+#  Helpers: Bank-backed session questions
+
+def _keep_in_bank(req: GenerationRequest, difficulty: str, q: Dict[str, Any]):
+    """Stores a freshly generated question in the bank (served-marking happens once it joins a quiz)."""
+    q["bank_id"] = question_bank.add(req.career, req.AL_stream, q["category"], difficulty, q)
+
+
+def _numbered(q: Dict[str, Any], index: int) -> Dict[str, Any]:
+    q["id"] = f"Q{index + 1}"
+    return q
+
+
+async def _notify(user_id: str):
+    cond = _ready.get(user_id)
+    if cond is not None:
+        async with cond:
+            cond.notify_all()
+
+
+async def _fill_remaining(user_id: str, nonce: str, pipeline, req: GenerationRequest, difficulty: str):
+    """Background task: drains the pipeline into the stored session as questions validate."""
+    def owned(state):
+        return state.get("nonce") == nonce
+
+    def append(bank_id):
+        def mutate(state):
+            if not owned(state):
+                return None
+            state["q"].append(bank_id)
+            return state
+        return mutate
+
+    def finish(error):
+        def mutate(state):
+            if not owned(state):
+                return None
+            state["filling"] = False
+            if error or len(state["q"]) < 12:
+                state["err"] = error or "Not enough valid questions generated after multiple attempts."
+            return state
+        return mutate
+
+    error = None
+    try:
+        async with aclosing(pipeline):
+            async for q in pipeline:
+                _keep_in_bank(req, difficulty, q)
+                state = await asyncio.to_thread(sessions.update, user_id, append(q["bank_id"]))
+                if state is None or not owned(state):
+                    return  # session finished, discarded or restarted elsewhere
+                question_bank.mark_served(user_id, [q["bank_id"]])
+                await _notify(user_id)
+    except Exception as e:
+        error = str(e)
+    finally:
+        await asyncio.to_thread(sessions.update, user_id, finish(error))
+        await _notify(user_id)
+        if _fillers.get(user_id) is asyncio.current_task():
+            _fillers.pop(user_id, None)
+            _ready.pop(user_id, None)
+
+
+async def _question_at(user_id: str, index: int) -> Dict[str, Any]:
+    """Returns question `index`, waiting for background generation only if it is not ready yet."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + QUESTION_WAIT_TIMEOUT
+    while True:
+        state = await asyncio.to_thread(sessions.get, user_id)
+        if state is None:
+            raise ValueError("No active quiz session found. Please start the quiz first.")
+        if index < len(state["q"]):
+            return _numbered(question_bank.get_many([state["q"][index]])[0], index)
+        if not state.get("filling"):
+            raise ValueError(state.get("err") or "Question generation ended before the quiz was complete.")
+
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        wait = min(QUESTION_POLL_SECONDS, remaining)
+        cond = _ready.get(user_id)
+        if cond is None:
+            await asyncio.sleep(wait)
+            continue
+        async with cond:
+            try:
+                await asyncio.wait_for(cond.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+
+def _answer_index(question_id: str) -> Optional[int]:
+    """Question index encoded in a served question ID ("Q3" → 2); None for other IDs."""
+    match = _QUESTION_ID.fullmatch(question_id.strip())
+    return int(match.group(1)) - 1 if match and int(match.group(1)) > 0 else None
+
+
+async def _discard_session(user_id: str):
+    await asyncio.to_thread(sessions.delete, user_id)
+    filler = _fillers.pop(user_id, None)
+    _ready.pop(user_id, None)
+    if filler and not filler.done():
+        filler.cancel()
+
+
 #  Step 1: Start Quiz — Pre-generate 12 validated questions
 
 @app.post("/start-quiz")
@@ -75,45 +257,84 @@ async def start_quiz(req: GenerationRequest):
     """
     Pre-generates 12 fully validated analytical questions for the user.
     Invalid questions are automatically skipped.
+
+    In progressive mode the session is returned as soon as the first
+    question is ready; the rest are generated in the background.
     """
     try:
         user_id = req.user_id
-        possible_categories = get_categories_for_career(req.career)
-        valid_questions = []
-        attempts = 0
-
-        while len(valid_questions) < 12 and attempts < 50:
-            attempts += 1
-            category = random.choice(possible_categories)
-            difficulty = req.difficulty or "medium"
-
-            question = generate_question(req.career, req.AL_stream, category, difficulty)
-            if "error" in question:
-                continue
-
-            validated = validate_question(question)
-            if validated.get("is_valid"):
-                validated["id"] = f"Q{len(valid_questions)+1}"
-                valid_questions.append(validated)
-
-        if len(valid_questions) < 12:
-            raise ValueError("Not enough valid questions generated after multiple attempts.")
-
-        # Store session in memory
-        sessions[user_id] = {
+        possible_categories = await aget_categories_for_career(req.career)
+        difficulty = req.difficulty or "medium"
+        progressive = PROGRESSIVE_START if req.progressive is None else req.progressive
+
+        # Serve from the pre-validated bank first (local read, no LLM calls)
+        banked = question_bank.draw(
+            user_id, req.career, req.AL_stream, possible_categories, difficulty, 12
+        )
+        question_bank.register_demand([
+            bucket_key(req.career, req.AL_stream, c, difficulty) for c in possible_categories
+        ])
+
+        await _discard_session(user_id)
+        questions = list(banked)
+        session = {
+            "nonce": uuid.uuid4().hex,
             "career": req.career,
             "AL_stream": req.AL_stream,
-            "questions": valid_questions,
-            "answers": []
+            "q": [],
+            "a": [],
+            "filling": False,
+            "err": None
         }
 
-        print(f"✅ Generated {len(valid_questions)} validated questions for user {user_id} ({req.career})")
+        # Bank miss → generate the shortfall live (concurrently) and keep it for later takers
+        shortfall = 12 - len(banked)
+        pipeline = None
+        if shortfall > 0 and progressive:
+            pipeline = stream_valid_questions(
+                req.career, req.AL_stream, possible_categories, difficulty, target=shortfall
+            )
+            if not questions:
+                try:
+                    first = await anext(pipeline)
+                except StopAsyncIteration:
+                    raise ValueError("Not enough valid questions generated after multiple attempts.")
+                except BaseException:
+                    await pipeline.aclose()
+                    raise
+                _keep_in_bank(req, difficulty, first)
+                questions.append(first)
+            session["filling"] = True
+        elif shortfall > 0:
+            fresh = await generate_valid_questions(
+                req.career, req.AL_stream, possible_categories, difficulty, target=shortfall
+            )
+            for q in fresh:
+                _keep_in_bank(req, difficulty, q)
+                questions.append(q)
+        bank_refiller.wake()
+
+        # Store the compact session (bank ids only), then start the background filler
+        session["q"] = [q["bank_id"] for q in questions]
+        await asyncio.to_thread(sessions.put, user_id, session)
+        # only now is the quiz assembled: a failed start above leaves the drawn questions unserved
+        question_bank.mark_served(user_id, session["q"])
+        if pipeline is not None:
+            _ready[user_id] = asyncio.Condition()
+            _fillers[user_id] = asyncio.create_task(
+                _fill_remaining(user_id, session["nonce"], pipeline, req, difficulty)
+            )
+
+        ready_count = len(questions)
+        print(f"✅ {ready_count}/12 validated questions ready for user {user_id} ({req.career})")
 
         return {
             "status": "ready",
-            "message": f"12 validated questions generated successfully for {req.career}.",
-            "question_count": len(valid_questions),
-            "first_question": valid_questions[0],
+            "message": f"12 validated questions generated successfully for {req.career}." if ready_count >= 12
+            else f"First question ready; remaining questions for {req.career} are being generated.",
+            "question_count": 12,
+            "ready_count": ready_count,
+            "first_question": _numbered(questions[0], 0),
             "remaining": 11
         }
 
@@ -131,27 +352,37 @@ async def submit_answer(req: AnswerRequest):
     """
     try:
         user_id = req.user_id
-        if user_id not in sessions:
-            raise ValueError("No active quiz session found. Please start the quiz first.")
 
-        session = sessions[user_id]
-        session["answers"].append({
-            "question_id": req.question_id,
-            "selected": req.selected_answer,
-            "correct": req.correct_answer,
-            "category": req.category
-        })
+        def record(state):
+            # Keyed by question index: a retried submission (e.g. after a 504)
+            # replaces its earlier answer instead of counting twice
+            answer = [req.question_id, req.selected_answer, req.correct_answer, req.category]
+            index = _answer_index(req.question_id)
+            if index is not None and index < len(state["a"]):
+                state["a"][index] = answer
+            else:
+                state["a"].append(answer)
+            return state
+
+        # Atomic read-modify-write: a background filler may be appending questions concurrently
+        session = await asyncio.to_thread(sessions.update, user_id, record)
+        if session is None:
+            raise ValueError("No active quiz session found. Please start the quiz first.")
 
-        answered = len(session["answers"])
+        answers = [
+            {"question_id": qid, "selected": selected, "correct": correct, "category": category}
+            for qid, selected, correct, category in session["a"]
+        ]
+        answered = len(answers)
 
         # ✅ All questions answered → Evaluate results
         if answered >= 12:
-            user_answers = {a["question_id"]: a["selected"] for a in session["answers"]}
-            correct_answers = {a["question_id"]: a["correct"] for a in session["answers"]}
-            metadata = {a["question_id"]: {"category": a["category"]} for a in session["answers"]}
+            user_answers = {a["question_id"]: a["selected"] for a in answers}
+            correct_answers = {a["question_id"]: a["correct"] for a in answers}
+            metadata = {a["question_id"]: {"category": a["category"]} for a in answers}
             result = evaluate_answers(user_answers, correct_answers, metadata)
 
-            sessions.pop(user_id, None)
+            await _discard_session(user_id)
 
             return {
                 "status": "completed",
@@ -160,7 +391,7 @@ async def submit_answer(req: AnswerRequest):
             }
 
         # Otherwise → Return next question
-        next_question = session["questions"][answered]
+        next_question = await _question_at(user_id, answered)
         return {
             "status": "next",
             "message": f"Answer recorded. {12 - answered} questions remaining.",
@@ -168,6 +399,14 @@ async def submit_answer(req: AnswerRequest):
             "next_question": next_question
         }
 
+    except asyncio.TimeoutError:
+        # The answer is already recorded; resubmitting it is safe
+        raise HTTPException(
+            status_code=504,
+            detail=f"Next question was not ready within {QUESTION_WAIT_TIMEOUT:g}s. Please resubmit the same answer."
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Answer submission failed: {str(e)}")
 
@@ -186,6 +425,35 @@ async def evaluate_user_answers(req: EvaluationRequest):
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
 
 
+@app.post("/evaluate-batch")
+async def evaluate_batch_answers(req: BatchEvaluationRequest):
+    """
+    Scores many users in one request; each evaluation is identical to /evaluate.
+    Users that /evaluate would reject get an "error" entry instead.
+    """
+    users = [(u.user_id, u.user_answers, u.correct_answers, u.question_metadata) for u in req.users]
+    # CPU-bound: scored off the event loop
+    results = await asyncio.to_thread(evaluate_batch, users, req.correct_answers, req.question_metadata)
+    return {"status": "success", "count": len(results), "results": results}
+
+
+#  Cache / Bank Stats
+
+@app.get("/stats")
+async def stats():
+    """Validation-cache hit/miss counters."""
+    return {
+        "validation_cache": validation_cache.stats(),
+        "sessions": {"backend": sessions.name, "live": await asyncio.to_thread(sessions.count)}
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """LLM latency, token and retry metrics in Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 #  Health Check
 
 @app.get("/")
@@ -197,6 +465,8 @@ async def root():
         "routes": {
             "/start-quiz": "POST - Generate all 12 validated questions up front",
             "/submit-answer": "POST - Submit answer and fetch next question",
-            "/evaluate": "POST - Evaluate user answers directly (for testing)"
+            "/evaluate": "POST - Evaluate user answers directly (for testing)",
+            "/stats": "GET - Validation cache hit/miss counters",
+            "/metrics": "GET - LLM latency/token/retry metrics (Prometheus format)"
         }
     }
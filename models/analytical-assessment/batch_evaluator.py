@@ -0,0 +1,249 @@
+"""
+batch_evaluator.py — Scores many users' answers at once
+
+Nightly re-scoring and research exports evaluate the same quiz for many
+users. Instead of normalizing every correct answer and looking up every
+question's category again for each user (as evaluate_answers does), an
+AnswerKey holds the quiz's normalized answers and category codes once,
+and a batch is scored with array operations:
+
+  - user answers are normalized once per distinct value and matched
+    against the key's answer codes as integer arrays
+  - per-user and per-(user, category) tallies are NumPy bincount /
+    unique group-bys over the whole batch
+
+Each user's evaluation is identical to evaluate_answers(user_answers,
+correct_answers, question_metadata): category order, score rounding,
+level and feedback text. Users evaluate_answers would raise on get an
+"error" entry with the same message.
+"""
+
+import json
+import operator
+from itertools import chain, compress, repeat
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from evaluator import evaluate_answers, generate_feedback
+
+_MISSING_DATA = "Missing answer data for evaluation."
+_KEY_CACHE_SIZE = 256
+_UNBUILT = object()
+
+
+# -----------------------------------------------------------
+# 🔑 PRECOMPUTED ANSWER KEY
+# -----------------------------------------------------------
+class AnswerKey:
+    """
+    One quiz's correct answers and question categories, precomputed:
+      - qids: question IDs in correct_answers order
+      - answer_codes: code of each question's normalized correct answer
+      - vocab: normalized answer string → code
+      - category_codes / categories: each question's category, coded in
+        order of first appearance
+    """
+
+    __slots__ = ("qids", "answer_codes", "vocab", "category_codes", "categories")
+
+    def __init__(self, correct_answers: Dict[str, Any], question_metadata: Optional[Dict[str, Any]] = None):
+        if not correct_answers:
+            raise ValueError(_MISSING_DATA)
+        if question_metadata and not isinstance(question_metadata, dict):
+            raise TypeError("question_metadata must be a mapping of question ID to metadata.")
+
+        self.qids = list(correct_answers)
+        normalized = [str(c).strip().lower() for c in correct_answers.values()]
+        self.vocab = {s: i for i, s in enumerate(dict.fromkeys(normalized))}
+        self.answer_codes = list(map(self.vocab.__getitem__, normalized))
+
+        # same lookup as evaluate_answers; a bad metadata entry raises here
+        # and its users fall back to evaluate_answers (see evaluate_batch)
+        metadata = question_metadata or {}
+        names = [metadata[qid].get("category", "unknown") if qid in metadata else "unknown" for qid in self.qids]
+        codes = {}
+        self.category_codes = [codes.setdefault(n, len(codes)) for n in names]
+        self.categories = list(codes)
+        if not all(isinstance(n, str) for n in self.categories):
+            # generate_feedback needs string names; evaluate_answers reports the error
+            raise TypeError("question categories must be strings.")
+
+    def __len__(self):
+        return len(self.qids)
+
+
+class AnswerKeyCache:
+    """
+    Reuses AnswerKeys across users (and CLI chunks) that carry the same quiz.
+    Keys are matched by their JSON text, which keeps question order and
+    value types (1, "1" and true score differently).
+    """
+
+    def __init__(self, max_size: int = _KEY_CACHE_SIZE):
+        self.max_size = max_size
+        self._keys: Dict[str, AnswerKey] = {}
+
+    def get(self, correct_answers: Dict[str, Any], question_metadata: Optional[Dict[str, Any]] = None) -> AnswerKey:
+        fingerprint = json.dumps([correct_answers, question_metadata], default=repr)
+        key = self._keys.get(fingerprint)
+        if key is None:
+            if len(self._keys) >= self.max_size:
+                self._keys.clear()
+            key = self._keys[fingerprint] = AnswerKey(correct_answers, question_metadata)
+        return key
+
+
+# -----------------------------------------------------------
+# 🧠 BATCH EVALUATION
+# -----------------------------------------------------------
+def evaluate_batch(
+    users: Iterable[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+    correct_answers: Optional[Dict[str, Any]] = None,
+    question_metadata: Optional[Dict[str, Any]] = None,
+    cache: Optional[AnswerKeyCache] = None,
+) -> List[Dict]:
+    """
+    Evaluates many users in one pass.
+
+    users: (user_id, user_answers, correct_answers, question_metadata) tuples;
+    a user whose correct_answers is None is scored against the shared
+    correct_answers / question_metadata given here.
+
+    Returns, in input order:
+        {"user_id": ..., "evaluation": evaluate_answers-equivalent dict}
+        or {"user_id": ..., "error": message}
+    """
+    cache = cache or AnswerKeyCache()
+    shared_key = _UNBUILT
+    results: List[Dict] = []
+    answers: Dict[int, Dict[str, Any]] = {}
+    groups: Dict[int, Tuple[AnswerKey, List[int]]] = {}
+
+    for user_id, user_answers, user_correct, user_metadata in users:
+        result = {"user_id": user_id}
+        results.append(result)
+        key = None
+        if user_answers and isinstance(user_answers, dict):
+            if user_correct is None:
+                if shared_key is _UNBUILT:
+                    shared_key = _build_key(cache, correct_answers, question_metadata)
+                key = shared_key
+            else:
+                key = _build_key(cache, user_correct, user_metadata)
+        if user_correct is None:
+            user_correct, user_metadata = correct_answers, question_metadata
+        if key is None:
+            # nothing to precompute for: evaluate_answers gives the exact result or error
+            try:
+                result["evaluation"] = evaluate_answers(user_answers, user_correct, user_metadata)
+            except Exception as e:
+                result["error"] = str(e)
+            continue
+        answers[len(results) - 1] = user_answers
+        groups.setdefault(id(key), (key, []))[1].append(len(results) - 1)
+
+    if groups:
+        _score(results, answers, list(groups.values()))
+    return results
+
+
+def _build_key(cache: AnswerKeyCache, correct_answers, question_metadata) -> Optional[AnswerKey]:
+    try:
+        return cache.get(correct_answers, question_metadata)
+    except Exception:
+        return None
+
+
+# -----------------------------------------------------------
+# ⚙️ ARRAY CORE
+# -----------------------------------------------------------
+def _answer_codes(given: List[Any], vocab: Dict[str, int]) -> List[int]:
+    """Key code of each normalized answer (-1 when it matches no correct answer)."""
+    try:
+        distinct = dict.fromkeys(given)
+    except TypeError:  # unhashable answers
+        distinct = None
+    # only plain strings are normalized per distinct value: 1, 1.0 and True
+    # hash alike but str() differently
+    if distinct is not None and all(type(v) is str for v in distinct):
+        code = {v: vocab.get(v.strip().lower(), -1) for v in distinct}
+        return list(map(code.__getitem__, given))
+    return [vocab.get(str(v).strip().lower(), -1) for v in given]
+
+
+def _rounded(numerator: np.ndarray, denominator: np.ndarray, scale: int, digits: int) -> List[float]:
+    """round((n / d) * scale, digits) per entry, computed once per distinct (n, d) pair."""
+    base = int(denominator.max(initial=0)) + 1
+    distinct, inverse = np.unique(numerator * base + denominator, return_inverse=True)
+    values = [round(((p // base) / (p % base)) * scale, digits) for p in distinct.tolist()]
+    return [values[i] for i in inverse.tolist()]
+
+
+def _score(results: List[Dict], answers: Dict[int, Dict[str, Any]], groups: List[Tuple[AnswerKey, List[int]]]):
+    n_users = len(results)
+    totals, answered = [0] * n_users, [0] * n_users
+    user_rows, category_rows, answer_rows, expected_rows, names = [], [], [], [], []
+
+    # ---- one row per answered question (list-level, C-speed map/compress) --
+    # small keys are common (users carrying their own quiz), so rows are
+    # collected for the whole batch and go to NumPy once
+    for key, members in groups:
+        m, offset = len(key), len(names)
+        flat = []
+        for i in members:
+            flat.extend(map(answers[i].get, key.qids))
+            totals[i], answered[i] = m, len(answers[i])
+        present = list(map(operator.is_not, flat, repeat(None)))
+        answer_rows.extend(_answer_codes(list(compress(flat, present)), key.vocab))
+        expected_rows.extend(compress(key.answer_codes * len(members), present))
+        category_rows.extend(compress([c + offset for c in key.category_codes] * len(members), present))
+        user_rows.extend(compress(chain.from_iterable(repeat(i, m) for i in members), present))
+        names.extend(key.categories)
+
+    user = np.array(user_rows, dtype=np.int64)
+    category = np.array(category_rows, dtype=np.int64)
+    correct = np.array(answer_rows, dtype=np.int64) == np.array(expected_rows, dtype=np.int64)
+    totals, answered = np.array(totals, dtype=np.int64), np.array(answered, dtype=np.int64)
+    scored = np.flatnonzero(totals)
+
+    # ---- per user -------------------------------------------------------
+    correct_counts = np.bincount(user, weights=correct, minlength=n_users).astype(np.int64)
+    overall = _rounded(correct_counts[scored], totals[scored], 10, 2)
+    completion = _rounded(answered[scored], totals[scored], 100, 2)
+
+    # ---- per (user, category), in order of first answered question -------
+    cells, first_row, group = np.unique(user * len(names) + category, return_index=True, return_inverse=True)
+    group_total = np.bincount(group, minlength=len(cells))
+    group_correct = np.bincount(group, weights=correct, minlength=len(cells)).astype(np.int64)
+    group_user = cells // len(names)
+    order = np.lexsort((first_row, group_user))
+    bounds = np.searchsorted(group_user[order], np.arange(n_users + 1)).tolist()
+    category_names = [names[c] for c in (cells % len(names))[order].tolist()]
+    category_values = _rounded(group_correct[order], group_total[order], 10, 1) if len(cells) else []
+
+    # ---- assemble evaluate_answers-shaped evaluations ---------------------
+    feedback: Dict[tuple, tuple] = {}
+    for i, overall_score, completion_rate in zip(scored.tolist(), overall, completion):
+        lo, hi = bounds[i], bounds[i + 1]
+        category_scores = dict(zip(category_names[lo:hi], category_values[lo:hi]))
+        signature = tuple(category_scores.items())
+        if signature not in feedback:
+            feedback[signature] = generate_feedback(category_scores)
+        strengths, improvements, summary = feedback[signature]
+
+        if overall_score < 4.0:
+            level = "Beginner"
+        elif overall_score < 7.0:
+            level = "Intermediate"
+        else:
+            level = "Advanced"
+
+        results[i]["evaluation"] = {
+            "category_scores": category_scores,
+            "overall_score": overall_score,
+            "level": level,
+            "completion_rate": completion_rate,
+            "strengths": list(strengths),
+            "improvements": list(improvements),
+            "feedback": summary,
+        }
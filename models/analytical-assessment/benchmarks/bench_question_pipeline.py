@@ -0,0 +1,46 @@
+"""
+Benchmarks quiz-start generation: serial (concurrency=1, the old behaviour)
+vs the concurrent pipeline, against the local fake LLM.
+
+Run from the service directory:
+    python -m benchmarks.bench_question_pipeline --latency 0.2 --invalid-rate 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from question_pipeline import generate_valid_questions
+from utils.validation_cache import validation_cache
+from utils.fake_llm import FakeAsyncOpenAI
+
+CATEGORIES = ["data_interpretation", "pattern_recognition", "case_study"]
+
+
+async def _run(concurrency: int, latency: float, invalid_rate: float, target: int):
+    llm = FakeAsyncOpenAI(latency=latency, invalid_rate=invalid_rate, seed=7)
+    start = time.perf_counter()
+    questions = await generate_valid_questions(
+        "Data Analyst", "Physical Science", CATEGORIES, "medium",
+        target=target, concurrency=concurrency, llm=llm,
+    )
+    return time.perf_counter() - start, len(questions), llm.calls
+
+
+def main():
+    validation_cache.enabled = False  # measure raw LLM work, not cache hits
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated seconds per LLM call")
+    parser.add_argument("--invalid-rate", type=float, default=0.2, help="fraction of rejected candidates")
+    parser.add_argument("--target", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 12])
+    args = parser.parse_args()
+
+    print(f"latency={args.latency}s invalid_rate={args.invalid_rate} target={args.target}")
+    for c in args.concurrency:
+        elapsed, produced, calls = asyncio.run(_run(c, args.latency, args.invalid_rate, args.target))
+        print(f"concurrency={c:>3}  time={elapsed:7.3f}s  questions={produced}  llm_calls={calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compares "split" (logic call + Bloom call) vs "combined" (one structured
+call) validation on the same recorded candidates, using the fake LLM.
+
+Run from the service directory:
+    python -m benchmarks.bench_validation_modes --questions 100 --latency 0.1
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import time
+
+from validator import avalidate_question
+from utils.validation_cache import validation_cache
+from utils.fake_llm import FakeAsyncOpenAI, FakeLLM
+
+
+def _recorded_candidates(n: int):
+    # Replay the same generator output for both modes
+    source = FakeLLM()
+    messages = [{"role": "system", "content": "question generator"}, {"role": "user", "content": "Category: case_study"}]
+    return [json.loads(source.respond(messages)) for _ in range(n)]
+
+
+async def _run(mode: str, candidates, latency: float, concurrency: int):
+    llm = FakeAsyncOpenAI(latency=latency, invalid_rate=0.1, seed=3)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(q):
+        async with sem:
+            return await avalidate_question(copy.deepcopy(q), llm=llm, mode=mode)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(q) for q in candidates))
+    elapsed = time.perf_counter() - start
+    valid = sum(1 for r in results if r.get("is_valid"))
+    return elapsed, valid, llm.fake
+
+
+def main():
+    validation_cache.enabled = False  # measure raw LLM work, not cache hits
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1, help="simulated seconds per LLM call")
+    parser.add_argument("--concurrency", type=int, default=1, help="questions validated at once")
+    args = parser.parse_args()
+
+    candidates = _recorded_candidates(args.questions)
+    for mode in ("split", "combined"):
+        elapsed, valid, fake = asyncio.run(_run(mode, candidates, args.latency, args.concurrency))
+        print(
+            f"{mode:>8}: time={elapsed:7.3f}s  valid={valid}/{len(candidates)}  llm_calls={fake.calls}  "
+            f"prompt_tokens={fake.prompt_tokens}  completion_tokens={fake.completion_tokens}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+evaluate_batch.py
+-----------------------------------
+Streaming re-scoring of stored analytical answers with the batch
+evaluator (batch_evaluator.py).
+
+Input: JSONL, one user per line (use "-" for stdin):
+    {"user_id": ..., "user_answers": {...},
+     "correct_answers": {...}, "question_metadata": {...}}   # key fields optional
+Lines without correct_answers are scored against the shared key given
+with --key (a JSON file holding "correct_answers" and "question_metadata").
+
+Output: one JSON line per user, {"user_id": ..., "evaluation": {...}}
+(or "error"), where each evaluation is identical to evaluate_answers.
+Lines are read and written in chunks, so memory stays flat on any input size.
+
+Run from the service directory:
+    python evaluate_batch.py answers.jsonl --key quiz_key.json --out rescored.jsonl
+    python evaluate_batch.py answers.jsonl --check      # also verify against evaluate_answers
+"""
+
+import argparse
+import json
+import sys
+import time
+from itertools import islice
+
+from batch_evaluator import AnswerKeyCache, evaluate_batch
+from evaluator import evaluate_answers
+
+
+# -----------------------------------------------------------
+# 📥 INPUT READER
+# -----------------------------------------------------------
+def read_jsonl_chunks(stream, chunk_size: int):
+    lines = ((n, line) for n, line in enumerate(stream, 1) if line.strip())
+    while True:
+        chunk = []
+        for n, line in islice(lines, chunk_size):
+            record = json.loads(line)
+            chunk.append((record.get("user_id", n), record.get("user_answers"),
+                          record.get("correct_answers"), record.get("question_metadata")))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _reference(user_id, user_answers, correct_answers, question_metadata):
+    try:
+        return {"user_id": user_id, "evaluation": evaluate_answers(user_answers, correct_answers, question_metadata)}
+    except Exception as e:
+        return {"user_id": user_id, "error": str(e)}
+
+
+# -----------------------------------------------------------
+# 🚀 MAIN
+# -----------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL answers, or - for stdin")
+    parser.add_argument("--key", help="shared answer key JSON: {\"correct_answers\": ..., \"question_metadata\": ...}")
+    parser.add_argument("--out", help="output JSONL (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="users scored per batch")
+    parser.add_argument("--check", action="store_true", help="compare every user with evaluate_answers")
+    args = parser.parse_args()
+
+    shared = {}
+    if args.key:
+        with open(args.key, "r", encoding="utf-8") as f:
+            shared = json.load(f)
+    correct_answers, question_metadata = shared.get("correct_answers"), shared.get("question_metadata")
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    cache = AnswerKeyCache()  # answer keys are reused across chunks
+    started = time.perf_counter()
+    users = mismatches = 0
+    scoring = 0.0
+    try:
+        for chunk in read_jsonl_chunks(source, args.chunk_size):
+            t0 = time.perf_counter()
+            results = evaluate_batch(chunk, correct_answers, question_metadata, cache=cache)
+            scoring += time.perf_counter() - t0
+            if args.check:
+                for (user_id, user_answers, key, metadata), result in zip(chunk, results):
+                    if key is None:
+                        key, metadata = correct_answers, question_metadata
+                    if json.dumps(_reference(user_id, user_answers, key, metadata)) != json.dumps(result):
+                        mismatches += 1
+                        print(f"❌ Mismatch for user {user_id}", file=sys.stderr)
+            out.write("".join(json.dumps(result) + "\n" for result in results))
+            users += len(results)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if args.out:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Scored {users} users in {elapsed:.2f}s ({scoring:.2f}s scoring, the rest JSON I/O)", file=sys.stderr)
+    if args.check:
+        print(f"🔍 {mismatches} mismatch(es) against evaluate_answers", file=sys.stderr)
+        sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import os
+import json
+import time
+import uuid
+import random
+import sqlite3
+import asyncio
+import threading
+from contextlib import aclosing
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from question_pipeline import stream_valid_questions
+
+# -----------------------------------------------------------
+# 🔧 Configuration
+# -----------------------------------------------------------
+BANK_PATH = Path(os.getenv("QUESTION_BANK_PATH", Path(__file__).parent / "data" / "question_bank.sqlite3"))
+LOW_WATER = int(os.getenv("QUESTION_BANK_LOW_WATER", "24"))
+HIGH_WATER = int(os.getenv("QUESTION_BANK_HIGH_WATER", "48"))
+# A question is retired after this many users have seen it (limits item exposure)
+MAX_SERVES = int(os.getenv("QUESTION_BANK_MAX_SERVES", "50"))
+REFILL_INTERVAL_SECONDS = float(os.getenv("QUESTION_BANK_REFILL_INTERVAL", "30"))
+# Served history older than this is pruned; a user may then see a question again
+SERVED_RETENTION_DAYS = float(os.getenv("QUESTION_BANK_SERVED_RETENTION_DAYS", "180"))
+# Buckets nobody has requested for this long are no longer refilled
+DEMAND_WINDOW_DAYS = float(os.getenv("QUESTION_BANK_DEMAND_WINDOW_DAYS", "14"))
+# Every worker runs a refiller; only the holder of this lease refills (renewed while it works)
+REFILL_LEASE_SECONDS = float(os.getenv("QUESTION_BANK_REFILL_LEASE_SECONDS", "300"))
+
+Bucket = Tuple[str, str, str, str]  # (career, AL_stream, category, difficulty)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id          TEXT PRIMARY KEY,
+    career      TEXT NOT NULL,
+    stream      TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    difficulty  TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    serve_count INTEGER NOT NULL DEFAULT 0,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_bucket
+    ON questions (career, stream, category, difficulty, serve_count);
+
+CREATE TABLE IF NOT EXISTS served (
+    user_id     TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    served_at   REAL NOT NULL,
+    PRIMARY KEY (user_id, question_id)
+);
+CREATE INDEX IF NOT EXISTS idx_served_at ON served (served_at);
+
+CREATE TABLE IF NOT EXISTS buckets (
+    career      TEXT NOT NULL,
+    stream      TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    difficulty  TEXT NOT NULL,
+    last_demand REAL NOT NULL,
+    PRIMARY KEY (career, stream, category, difficulty)
+);
+
+CREATE TABLE IF NOT EXISTS leases (
+    name        TEXT PRIMARY KEY,
+    owner       TEXT NOT NULL,
+    expires_at  REAL NOT NULL
+);
+"""
+
+
+def bucket_key(career: str, stream: str, category: str, difficulty: str) -> Bucket:
+    """Normalized bucket key; every read and write of a bucket goes through this."""
+    return (career.strip(), stream.strip(), category.strip().lower(), difficulty.strip().lower())
+
+
+# -----------------------------------------------------------
+# 🏦 Question Bank (SQLite)
+# -----------------------------------------------------------
+class QuestionBank:
+    """
+    Persistent store of questions that already passed validate_question(),
+    keyed by (career, AL_stream, category, difficulty).
+
+    Tracks which questions each user has been served so a repeat
+    taker never sees the same question twice.
+    """
+
+    def __init__(self, path: Path = BANK_PATH, max_serves: int = MAX_SERVES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_serves = max_serves
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ---------------- writes ----------------
+    def add(self, career: str, stream: str, category: str, difficulty: str, question: Dict[str, Any]) -> str:
+        """Stores one validated question and returns its bank id."""
+        qid = uuid.uuid4().hex[:16]
+        payload = {k: v for k, v in question.items() if k not in ("id", "bank_id")}
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO questions (id, career, stream, category, difficulty, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (qid, *bucket_key(career, stream, category, difficulty), json.dumps(payload), time.time()),
+            )
+        return qid
+
+    def mark_served(self, user_id: str, question_ids: List[str]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for qid in question_ids:
+                    cur = self._conn.execute(
+                        "INSERT OR IGNORE INTO served (user_id, question_id, served_at) VALUES (?, ?, ?)",
+                        (user_id, qid, now),
+                    )
+                    if cur.rowcount:
+                        self._conn.execute("UPDATE questions SET serve_count = serve_count + 1 WHERE id = ?", (qid,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def register_demand(self, buckets: List[Bucket]):
+        """Records that a bucket was requested so the refill worker keeps it stocked."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO buckets (career, stream, category, difficulty, last_demand) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (career, stream, category, difficulty) DO UPDATE SET last_demand = excluded.last_demand",
+                [(*bucket_key(*b), now) for b in buckets],
+            )
+
+    def prune_served(self, retention_days: float = SERVED_RETENTION_DAYS) -> int:
+        """Deletes served history older than the retention window; returns rows removed."""
+        if retention_days <= 0:
+            return 0
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM served WHERE served_at < ?", (cutoff,))
+        return cur.rowcount
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Takes or renews lease `name` for `owner` unless another owner holds an unexpired one."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (name, owner, now + ttl, now),
+            )
+        return cur.rowcount > 0
+
+    def release_lease(self, name: str, owner: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    # ---------------- reads ----------------
+    def draw(self, user_id: str, career: str, stream: str, categories: List[str], difficulty: str, n: int) -> List[Dict[str, Any]]:
+        """
+        Returns up to `n` questions from the matching buckets that this user
+        has not been served yet, mixed across categories. The caller marks them
+        served (mark_served) once the quiz is assembled, so a failed start
+        doesn't use them up.
+        """
+        if not categories or n <= 0:
+            return []
+        keys = [bucket_key(career, stream, c, difficulty) for c in categories]
+        placeholders = ",".join("?" for _ in keys)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT q.id, q.payload FROM questions q
+                WHERE q.career = ? AND q.stream = ? AND q.difficulty = ?
+                  AND q.category IN ({placeholders})
+                  AND q.serve_count < ?
+                  AND NOT EXISTS (SELECT 1 FROM served s WHERE s.user_id = ? AND s.question_id = q.id)
+                ORDER BY q.serve_count, RANDOM()
+                LIMIT ?
+                """,
+                (keys[0][0], keys[0][1], keys[0][3], *[k[2] for k in keys], self.max_serves, user_id, n),
+            ).fetchall()
+
+        questions = []
+        for qid, payload in rows:
+            q = json.loads(payload)
+            q["bank_id"] = qid
+            questions.append(q)
+        random.shuffle(questions)
+        return questions
+
+    def get_many(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Returns stored questions by bank id, in the order given (unknown ids are skipped)."""
+        if not ids:
+            return []
+        placeholders = ",".join("?" for _ in ids)
+        with self._lock:
+            rows = dict(self._conn.execute(
+                f"SELECT id, payload FROM questions WHERE id IN ({placeholders})", list(ids)
+            ).fetchall())
+        questions = []
+        for qid in ids:
+            if qid in rows:
+                q = json.loads(rows[qid])
+                q["bank_id"] = qid
+                questions.append(q)
+        return questions
+
+    def available(self, bucket: Bucket) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM questions WHERE career = ? AND stream = ? AND category = ? AND difficulty = ? "
+                "AND serve_count < ?",
+                (*bucket, self.max_serves),
+            ).fetchone()
+        return count
+
+    def low_buckets(self, low_water: int = LOW_WATER,
+                    demand_window_days: float = DEMAND_WINDOW_DAYS) -> List[Tuple[Bucket, int]]:
+        """
+        Returns (bucket, available) for every bucket requested within the
+        demand window that is below the low-water mark.
+        """
+        since = time.time() - demand_window_days * 86400
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT b.career, b.stream, b.category, b.difficulty,
+                       (SELECT COUNT(*) FROM questions q
+                         WHERE q.career = b.career AND q.stream = b.stream
+                           AND q.category = b.category AND q.difficulty = b.difficulty
+                           AND q.serve_count < ?) AS available
+                FROM buckets b
+                WHERE b.last_demand > ?
+                ORDER BY b.last_demand DESC
+                """,
+                (self.max_serves, since),
+            ).fetchall()
+        return [((r[0], r[1], r[2], r[3]), r[4]) for r in rows if r[4] < low_water]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# -----------------------------------------------------------
+# ♻️ Background Refill Worker
+# -----------------------------------------------------------
+class BankRefiller:
+    """
+    Keeps requested buckets stocked between LOW_WATER and HIGH_WATER.
+    Runs as an asyncio task; `wake()` triggers an immediate pass. With
+    several workers on one bank, only the holder of the refill lease works.
+    """
+
+    LEASE = "refill"
+
+    def __init__(self, bank: QuestionBank, low_water: int = LOW_WATER, high_water: int = HIGH_WATER,
+                 interval: float = REFILL_INTERVAL_SECONDS, llm=None):
+        self.bank = bank
+        self.low_water = low_water
+        self.high_water = high_water
+        self.interval = interval
+        self.llm = llm
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease_ttl = max(REFILL_LEASE_SECONDS, interval * 2)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            await asyncio.to_thread(self.bank.release_lease, self.LEASE, self.owner)
+
+    def wake(self):
+        self._wake.set()
+
+    async def _hold_lease(self) -> bool:
+        return await asyncio.to_thread(self.bank.acquire_lease, self.LEASE, self.owner, self.lease_ttl)
+
+    async def refill_once(self) -> int:
+        """
+        Tops up every low bucket once, renewing the refill lease as it goes
+        (stops early if another worker took it). Returns the number of questions added.
+        """
+        added = 0
+        for (career, stream, category, difficulty), available in await asyncio.to_thread(self.bank.low_buckets, self.low_water):
+            if not await self._hold_lease():
+                break
+            missing = self.high_water - available
+            bucket_added = 0
+            async with aclosing(stream_valid_questions(
+                career, stream, [category], difficulty,
+                target=missing, max_attempts=missing * 3, llm=self.llm,
+            )) as pipeline:
+                async for q in pipeline:
+                    self.bank.add(career, stream, category, difficulty, q)
+                    bucket_added += 1
+                    await self._hold_lease()
+            added += bucket_added
+            print(f"🏦 Refilled bucket ({career} | {stream} | {category} | {difficulty}): +{bucket_added} questions")
+        return added
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                if await self._hold_lease():
+                    await self.refill_once()
+                    pruned = await asyncio.to_thread(self.bank.prune_served)
+                    if pruned:
+                        print(f"🧹 Pruned {pruned} served-question records older than {SERVED_RETENTION_DAYS:g} days")
+            except Exception as e:
+                print(f"⚠️ Question bank refill failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
@@ -2,14 +2,16 @@ import os
 import json
 import re
 from typing import Dict, Any
-from openai import OpenAI
 from dotenv import load_dotenv
+from utils.llm_backend import make_client, make_async_client
+from utils.llm_client import chat_completion, achat_completion, record_retry, record_failure
 
 # -----------------------------------------------------------
 # 🔧 Configuration
 # -----------------------------------------------------------
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = make_client()
+async_client = make_async_client()
 
 # Allowed analytical categories and Bloom levels
 ALLOWED_CATEGORIES = {"data_interpretation", "pattern_recognition", "case_study"}
@@ -70,19 +72,12 @@ def _theoretical_validate(item: Dict[str, Any], requested_category: str) -> None
 # -----------------------------------------------------------
 # 🧠 Question Generator Core
 # -----------------------------------------------------------
-def generate_question(career: str, stream: str, category: str, difficulty: str) -> Dict[str, Any]:
-    """
-    Generates a single analytical reasoning question targeting higher-order skills.
-    Ensures question validity via theoretical validation and structure checks.
-    Returns normalized dict or {'error': <reason>}.
-    """
+class _MalformedOutput(Exception):
+    """Raised when the LLM output cannot be parsed (retryable)."""
 
-    # Normalize category
-    category_lower = category.lower() if isinstance(category, str) else category
-    if category_lower not in ALLOWED_CATEGORIES:
-        return {"error": f"Category must be one of {ALLOWED_CATEGORIES}"}
 
-    # Prompts for LLM
+def _build_messages(career: str, stream: str, category_lower: str, difficulty: str):
+    """Builds the chat messages for a single question generation call."""
     system_prompt = (
         "You are an expert analytical reasoning question generator for career guidance assessments. "
         "You must produce higher-order analytical questions (Bloom's Analyze, Evaluate, or Create) "
@@ -118,70 +113,97 @@ JSON SCHEMA EXAMPLE:
   "stream_context": "{stream}"
 }}
 """
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _normalize_output(raw_output: str, career: str, stream: str, category_lower: str, difficulty: str) -> Dict[str, Any]:
+    """
+    Parses raw LLM text into the normalized question schema.
+    Raises _MalformedOutput when no usable JSON is present.
+    """
+    match = re.search(r"\{[\s\S]*\}", raw_output)
+    if not match:
+        raise _MalformedOutput("No valid JSON found in LLM output.")
+
+    try:
+        item = json.loads(match.group())
+    except json.JSONDecodeError as je:
+        raise _MalformedOutput(f"Failed to parse LLM JSON: {str(je)}")
+
+    # Normalize missing fields
+    item.setdefault("category", category_lower)
+    item.setdefault("career_context", career)
+    item.setdefault("stream_context", stream)
+
+    # Normalize difficulty
+    if "irt_difficulty" not in item or not isinstance(item.get("irt_difficulty"), (int, float)):
+        item["irt_difficulty"] = _map_difficulty_to_irt(difficulty)
+
+    # Normalize Bloom capitalization
+    if "bloom_level" in item and isinstance(item["bloom_level"], str):
+        item["bloom_level"] = item["bloom_level"].strip().capitalize()
+
+    # Validate theoretical correctness
+    try:
+        _theoretical_validate(item, category_lower)
+    except ValueError as ve:
+        record_failure("question_generator.generate_question", "theoretical_validation")
+        return {"error": f"Theoretical validation failed: {str(ve)}"}
+
+    # Return normalized schema
+    return {
+        "question": item["question"].strip(),
+        "options": [o.strip() for o in item["options"]],
+        "correct_answer": item["correct_answer"].strip(),
+        "explanation": item["explanation"].strip(),
+        "category": item["category"],
+        "bloom_level": item["bloom_level"],
+        "irt_difficulty": float(item["irt_difficulty"]),
+        "career_context": item["career_context"],
+        "stream_context": item["stream_context"]
+    }
+
+
+def generate_question(career: str, stream: str, category: str, difficulty: str) -> Dict[str, Any]:
+    """
+    Generates a single analytical reasoning question targeting higher-order skills.
+    Ensures question validity via theoretical validation and structure checks.
+    Returns normalized dict or {'error': <reason>}.
+    """
+
+    # Normalize category
+    category_lower = category.lower() if isinstance(category, str) else category
+    if category_lower not in ALLOWED_CATEGORIES:
+        return {"error": f"Category must be one of {ALLOWED_CATEGORIES}"}
+
+    messages = _build_messages(career, stream, category_lower, difficulty)
 
     # -----------------------------------------------------------
     # 🔄 LLM Call with Retry
     # -----------------------------------------------------------
     for attempt in range(3):
         try:
-            response = client.chat.completions.create(
+            if attempt:
+                record_retry("question_generator.generate_question")
+            response = chat_completion(
+                client, "question_generator.generate_question",
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
                 temperature=0.4,
                 max_tokens=600
             )
 
             raw_output = response.choices[0].message.content.strip()
-            match = re.search(r"\{[\s\S]*\}", raw_output)
-            if not match:
-                if attempt < 2:
-                    continue
-                return {"error": "No valid JSON found in LLM output."}
-
-            try:
-                item = json.loads(match.group())
-            except json.JSONDecodeError as je:
-                if attempt < 2:
-                    continue
-                return {"error": f"Failed to parse LLM JSON: {str(je)}"}
-
-            # Normalize missing fields
-            item.setdefault("category", category_lower)
-            item.setdefault("career_context", career)
-            item.setdefault("stream_context", stream)
-
-            # Normalize difficulty
-            if "irt_difficulty" not in item or not isinstance(item.get("irt_difficulty"), (int, float)):
-                item["irt_difficulty"] = _map_difficulty_to_irt(difficulty)
-
-            # Normalize Bloom capitalization
-            if "bloom_level" in item and isinstance(item["bloom_level"], str):
-                item["bloom_level"] = item["bloom_level"].strip().capitalize()
-
-            # Validate theoretical correctness
-            try:
-                _theoretical_validate(item, category_lower)
-            except ValueError as ve:
-                return {"error": f"Theoretical validation failed: {str(ve)}"}
-
-            # Return normalized schema
-            normalized = {
-                "question": item["question"].strip(),
-                "options": [o.strip() for o in item["options"]],
-                "correct_answer": item["correct_answer"].strip(),
-                "explanation": item["explanation"].strip(),
-                "category": item["category"],
-                "bloom_level": item["bloom_level"],
-                "irt_difficulty": float(item["irt_difficulty"]),
-                "career_context": item["career_context"],
-                "stream_context": item["stream_context"]
-            }
-
-            return normalized
+            return _normalize_output(raw_output, career, stream, category_lower, difficulty)
 
+        except _MalformedOutput as mo:
+            record_failure("question_generator.generate_question", "malformed_output")
+            if attempt < 2:
+                continue
+            return {"error": str(mo)}
         except Exception as e:
             if attempt == 2:
                 return {"error": str(e)}
@@ -190,4 +212,41 @@ JSON SCHEMA EXAMPLE:
     return {"error": "Repeated generation attempts failed."}
 
 
+async def agenerate_question(career: str, stream: str, category: str, difficulty: str, llm=None) -> Dict[str, Any]:
+    """
+    Async variant of generate_question().
+    `llm` may be any AsyncOpenAI-compatible client (defaults to the shared async client).
+    """
+    llm = llm or async_client
+
+    category_lower = category.lower() if isinstance(category, str) else category
+    if category_lower not in ALLOWED_CATEGORIES:
+        return {"error": f"Category must be one of {ALLOWED_CATEGORIES}"}
+
+    messages = _build_messages(career, stream, category_lower, difficulty)
+
+    for attempt in range(3):
+        try:
+            if attempt:
+                record_retry("question_generator.generate_question")
+            response = await achat_completion(
+                llm, "question_generator.generate_question",
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.4,
+                max_tokens=600
+            )
+
+            raw_output = response.choices[0].message.content.strip()
+            return _normalize_output(raw_output, career, stream, category_lower, difficulty)
+
+        except _MalformedOutput as mo:
+            record_failure("question_generator.generate_question", "malformed_output")
+            if attempt < 2:
+                continue
+            return {"error": str(mo)}
+        except Exception as e:
+            if attempt == 2:
+                return {"error": str(e)}
 
+    return {"error": "Repeated generation attempts failed."}
@@ -0,0 +1,114 @@
+import os
+import asyncio
+import random
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Any, List, Optional
+
+from question_generator import agenerate_question
+from validator import avalidate_question
+
+# -----------------------------------------------------------
+# 🔧 Configuration
+# -----------------------------------------------------------
+# Max number of generate→validate chains in flight per quiz start.
+DEFAULT_CONCURRENCY = int(os.getenv("QUESTION_PIPELINE_CONCURRENCY", "6"))
+DEFAULT_MAX_ATTEMPTS = 50
+
+_WORKER_DONE = object()
+
+
+# -----------------------------------------------------------
+# 🔁 Single Candidate: generate → validate
+# -----------------------------------------------------------
+async def _generate_candidate(career: str, stream: str, category: str, difficulty: str, llm=None) -> Optional[Dict[str, Any]]:
+    """Generates one question and validates it. Returns None if it was rejected."""
+    question = await agenerate_question(career, stream, category, difficulty, llm=llm)
+    if "error" in question:
+        return None
+
+    validated = await avalidate_question(question, llm=llm)
+    return validated if validated.get("is_valid") else None
+
+
+# -----------------------------------------------------------
+# 🚰 Concurrent Pipeline
+# -----------------------------------------------------------
+async def stream_valid_questions(
+    career: str,
+    stream: str,
+    categories: List[str],
+    difficulty: str = "medium",
+    target: int = 12,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    llm=None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yields validated questions as soon as each one passes validation.
+
+    Up to `concurrency` generate→validate chains run at once; at most
+    `max_attempts` candidates are generated in total. Once `target`
+    questions have been yielded (or the consumer stops iterating),
+    all in-flight LLM work is cancelled.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    state = {"attempts": 0, "accepted": 0}
+
+    async def worker():
+        try:
+            while state["attempts"] < max_attempts and state["accepted"] < target:
+                state["attempts"] += 1
+                category = random.choice(categories)
+                try:
+                    candidate = await _generate_candidate(career, stream, category, difficulty, llm=llm)
+                except Exception as e:
+                    print(f"⚠️ Question candidate failed: {e}")
+                    candidate = None
+                queue.put_nowait(candidate)
+        finally:
+            queue.put_nowait(_WORKER_DONE)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, max_attempts)))]
+    finished = 0
+
+    try:
+        while finished < len(workers) and state["accepted"] < target:
+            item = await queue.get()
+            if item is _WORKER_DONE:
+                finished += 1
+                continue
+            if item is None:
+                continue
+            state["accepted"] += 1
+            yield item
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def generate_valid_questions(
+    career: str,
+    stream: str,
+    categories: List[str],
+    difficulty: str = "medium",
+    target: int = 12,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    llm=None,
+) -> List[Dict[str, Any]]:
+    """
+    Collects `target` validated questions from the concurrent pipeline.
+    Raises ValueError if the attempt budget runs out first.
+    """
+    questions = []
+    async with aclosing(stream_valid_questions(
+        career, stream, categories, difficulty,
+        target=target, max_attempts=max_attempts, concurrency=concurrency, llm=llm,
+    )) as pipeline:
+        async for q in pipeline:
+            questions.append(q)
+
+    if len(questions) < target:
+        raise ValueError("Not enough valid questions generated after multiple attempts.")
+    return questions
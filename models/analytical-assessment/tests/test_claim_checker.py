@@ -0,0 +1,82 @@
+"""
+Numeric claim extraction (utils/claim_checker.py) and the math layer of
+the validator that uses it. Run from the service directory:
+    python -m pytest tests
+"""
+
+import pytest
+
+from utils.claim_checker import check_question_claims, extract_claims
+from validator import math_validation
+
+
+def _claims(text):
+    return [(c["claim"], c["ok"]) for c in extract_claims(text)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("40/50 = 0.8 = 80%", [("40/50 = 0.8", True), ("0.8 = 80%", True)]),
+    ("The ratio 3:4 = 0.75.", [("3:4 = 0.75", True)]),
+    ("A:B = 3 : 4 = 0.75", [("3 : 4 = 0.75", True)]),
+    ("25% of 80 is 20", [("25% of 80 = 20", True)]),
+    ("25% of 80 is 25", [("25% of 80 = 25", False)]),
+    ("(100/200)*100 = 50%", [("(100/200)*100 = 50%", True)]),
+    ("2020 - 1990 = 30", [("2020 - 1990 = 30", True)]),
+    ("2(x + 3) = 2x + 6", [("2(x + 3) = 2x + 6", True)]),
+    ("x + 2 = x + 3", [("x + 2 = x + 3", False)]),
+])
+def test_checkable_claims(text, expected):
+    assert _claims(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    # step labels are not ratios
+    ("Step 1: 250 - 200 = 50. Step 2: 50/200 = 0.25 = 25%.",
+     [("250 - 200 = 50", True), ("50/200 = 0.25", True), ("0.25 = 25%", True)]),
+    ("Option 2: 3:4 = 0.75", [("3:4 = 0.75", True)]),
+    # abbreviations are not variables, and % stays attached
+    ("i.e. 50/200 = 0.25 = 25%.", [("50/200 = 0.25", True), ("0.25 = 25%", True)]),
+    ("e.g. 40/50 = 0.8 = 80%", [("40/50 = 0.8", True), ("0.8 = 80%", True)]),
+    # year ranges are not subtractions
+    ("Revenue grew 2019-2020 = 12%.", []),
+    # labels and units next to numbers are not operands
+    ("Week 1 = 120 and Week 2 = 150", []),
+    ("Total = 4 hours x 15 = 60 units", []),
+    ("Region 1 = 40%", []),
+    ("Total cost = $1,200 = 12 x $100", [("1200 = 12*100", True)]),
+    ("Total = 120 x 2 units = 240", []),
+])
+def test_prose_is_not_misread(text, expected):
+    assert _claims(text) == expected
+
+
+def test_percent_literal_keeps_its_own_precision():
+    assert _claims("3 = 40%") == [("3 = 40%", False)]
+    assert _claims("0.4 = 40%") == [("0.4 = 40%", True)]
+
+
+@pytest.mark.parametrize("text", [
+    "Week 1 = 120 and Week 2 = 150",
+    "Total = 4 hours x 15 = 60 units",
+    "Total cost = $1,200 = 12 x $100",
+    "Step 1: 250 - 200 = 50. Step 2: 50/200 = 0.25 = 25%.",
+])
+def test_math_validation_accepts_data_interpretation_prose(text):
+    assert math_validation({"question": text}) is True
+
+
+def test_math_validation_rejects_wrong_arithmetic():
+    question = {"question": "Sales rose from 200 to 250.", "explanation": "250 - 200 = 60"}
+    assert math_validation(question) is False
+    assert "250 - 200 = 60" in question["math_error"]
+
+
+def test_explanation_pointing_at_another_option_is_flagged():
+    result = check_question_claims({
+        "question": "What share of 200 is 50?",
+        "options": ["20%", "25%", "30%", "35%"],
+        "correct_answer": "30%",
+        "explanation": "50/200 = 0.25 = 25%",
+    })
+    assert not result["ok"]
+    assert any("different option" in f for f in result["failures"])
@@ -0,0 +1,44 @@
+"""
+QuestionBank (question_bank.py): draw() edge cases, the demand window
+that retires idle buckets, and the single-refiller lease.
+"""
+
+import time
+
+import pytest
+
+from question_bank import QuestionBank, bucket_key
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = QuestionBank(tmp_path / "bank.sqlite3")
+    yield bank
+    bank.close()
+
+
+def test_draw_with_no_categories_is_empty(bank):
+    bank.add("Engineer", "Maths", "logic", "easy", {"question": "q"})
+    assert bank.draw("u1", "Engineer", "Maths", [], "easy", 5) == []
+    assert len(bank.draw("u1", "Engineer", "Maths", ["Logic"], "easy", 5)) == 1
+
+
+def test_low_buckets_skips_buckets_outside_demand_window(bank):
+    fresh = bucket_key("Engineer", "Maths", "logic", "easy")
+    stale = bucket_key("Engineer", "Maths", "patterns", "easy")
+    bank.register_demand([fresh, stale])
+    bank._conn.execute(
+        "UPDATE buckets SET last_demand = ? WHERE category = ?", (time.time() - 30 * 86400, "patterns")
+    )
+    assert bank.low_buckets(low_water=10, demand_window_days=14) == [(fresh, 0)]
+    assert len(bank.low_buckets(low_water=10, demand_window_days=60)) == 2
+
+
+def test_refill_lease_has_one_holder(bank):
+    assert bank.acquire_lease("refill", "a", ttl=60)
+    assert not bank.acquire_lease("refill", "b", ttl=60)
+    assert bank.acquire_lease("refill", "a", ttl=60)
+    bank.release_lease("refill", "a")
+    assert bank.acquire_lease("refill", "b", ttl=0.01)
+    time.sleep(0.02)
+    assert bank.acquire_lease("refill", "a", ttl=60)
@@ -0,0 +1,51 @@
+"""
+ValidationCache (utils/validation_cache.py): batched last_access updates
+and the async get/put used by the validators.
+"""
+
+import asyncio
+import time
+
+from utils.validation_cache import ValidationCache
+
+
+def _last_access(cache, key):
+    (at,) = cache._conn.execute("SELECT last_access FROM cache WHERE kind = 'logic' AND key = ?", (key,)).fetchone()
+    return at
+
+
+def test_hits_update_last_access_in_batches(tmp_path):
+    cache = ValidationCache(tmp_path / "cache.sqlite3", max_entries=100, touch_batch=3)
+    cache.put("logic", "a", {"is_valid": True})
+    written = _last_access(cache, "a")
+
+    assert cache.get("logic", "a") == {"is_valid": True}
+    assert cache.get("logic", "a") == {"is_valid": True}
+    assert _last_access(cache, "a") == written
+    time.sleep(0.01)
+    assert cache.get("logic", "a") == {"is_valid": True}
+    assert _last_access(cache, "a") > written
+    assert cache.stats()["hits"] == 3
+
+
+def test_eviction_sees_pending_hits(tmp_path):
+    cache = ValidationCache(tmp_path / "cache.sqlite3", max_entries=3, touch_batch=100)
+    for n, key in enumerate(["old", "b", "c"]):
+        cache.put("logic", key, {"n": n})
+        time.sleep(0.01)
+    assert cache.get("logic", "old") == {"n": 0}
+    cache.put("logic", "d", {"n": 3})
+    assert cache.get("logic", "old") == {"n": 0}
+    assert cache.get("logic", "b") is None
+    assert cache.get("logic", "c") is None
+
+
+def test_async_get_and_put(tmp_path):
+    cache = ValidationCache(tmp_path / "cache.sqlite3", max_entries=100)
+
+    async def run():
+        assert await cache.aget("bloom", "k") is None
+        await cache.aput("bloom", "k", {"bloom_level": "Analyze"})
+        return await cache.aget("bloom", "k")
+
+    assert asyncio.run(run()) == {"bloom_level": "Analyze"}
@@ -1,13 +1,12 @@
-import openai
-import os
 from dotenv import load_dotenv
+from utils.llm_backend import make_client, make_async_client
+from utils.llm_client import chat_completion, achat_completion
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+client = make_client()
+async_client = make_async_client()
 
-def classify_bloom_level(question_text: str):
-    """
-    Classifies the question into a Bloom's Taxonomy cognitive level.
-    """
+
+def _bloom_messages(question_text: str):
     prompt = f"""
     Classify the following question according to Bloom's Taxonomy.
     Question: {question_text}
@@ -16,15 +15,37 @@ def classify_bloom_level(question_text: str):
 
     Reply only with the level name.
     """
+    return [
+        {"role": "system", "content": "You are a Bloom's taxonomy classifier."},
+        {"role": "user", "content": prompt}
+    ]
 
-    response = openai.chat.completions.create(
+
+def classify_bloom_level(question_text: str):
+    """
+    Classifies the question into a Bloom's Taxonomy cognitive level.
+    """
+    response = chat_completion(
+        client, "bloom_classifier.classify_bloom_level",
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a Bloom's taxonomy classifier."},
-            {"role": "user", "content": prompt}
-        ],
+        messages=_bloom_messages(question_text),
         temperature=0,
         max_tokens=20
     )
 #change
     return response.choices[0].message.content.strip()
+
+
+async def aclassify_bloom_level(question_text: str, llm=None):
+    """
+    Async variant of classify_bloom_level().
+    """
+    llm = llm or async_client
+    response = await achat_completion(
+        llm, "bloom_classifier.classify_bloom_level",
+        model="gpt-4o-mini",
+        messages=_bloom_messages(question_text),
+        temperature=0,
+        max_tokens=20
+    )
+    return response.choices[0].message.content.strip()
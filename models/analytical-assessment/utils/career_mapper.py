@@ -1,15 +1,30 @@
-import json, os, re
+import json, os, re, asyncio, tempfile, threading
+from concurrent.futures import Future
 from pathlib import Path
-from openai import OpenAI
 from dotenv import load_dotenv
+from utils.llm_backend import make_client
+from utils.llm_client import chat_completion
+
+try:
+    import fcntl  # POSIX only; used to serialize writers across worker processes
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = make_client()
 
 MAP_PATH = Path(__file__).parent / "career_category_map.json"
+LOCK_PATH = MAP_PATH.with_suffix(".lock")
 DEFAULT_CATEGORIES = ["data_interpretation", "pattern_recognition", "case_study"]
 
-def load_career_mapping():
+# In-process copy of career_category_map.json, loaded once
+_mapping = None
+_mapping_lock = threading.Lock()
+# career -> Future shared by concurrent lookups of the same unseen career
+_inflight = {}
+
+
+def _read_map_file():
     if MAP_PATH.exists():
         try:
             with open(MAP_PATH, "r") as f:
@@ -18,6 +33,59 @@ def load_career_mapping():
             return {}
     return {}
 
+
+def load_career_mapping():
+    """Returns the in-memory career map, reading the file on first use only."""
+    global _mapping
+    if _mapping is None:
+        with _mapping_lock:
+            if _mapping is None:
+                _mapping = _read_map_file()
+    return _mapping
+
+
+class _FileLock:
+    """Process lock around the map file (no-op where fcntl is unavailable)."""
+
+    def __enter__(self):
+        self._fh = open(LOCK_PATH, "a")
+        if fcntl:
+            fcntl.flock(self._fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+        self._fh.close()
+
+
+def _persist_mapping(career: str, categories):
+    """
+    Merges one career into the map file atomically: re-read under the lock
+    (another process may have written), write a temp file, then rename over.
+    """
+    global _mapping
+    with _mapping_lock, _FileLock():
+        mapping = _read_map_file()
+        mapping.update(_mapping or {})
+        mapping[career] = categories
+
+        fd, tmp_path = tempfile.mkstemp(dir=MAP_PATH.parent, prefix=".career_map_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(mapping, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, MAP_PATH)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Swap in a new dict so readers never see a half-updated one
+        _mapping = mapping
+
+
 def generate_dynamic_mapping(career: str):
     prompt = f"""
     You are an expert in analytical skill mapping.
@@ -27,7 +95,8 @@ def generate_dynamic_mapping(career: str):
     """
 
     try:
-        response = client.chat.completions.create(
+        response = chat_completion(
+            client, "career_mapper.generate_dynamic_mapping",
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You map careers to analytical skill categories."},
@@ -45,18 +114,46 @@ def generate_dynamic_mapping(career: str):
         print(f"⚠️ LLM mapping error for '{career}': {e}")
         categories = DEFAULT_CATEGORIES
 
-    mapping = load_career_mapping()
-    mapping[career] = categories
-    with open(MAP_PATH, "w") as f:
-        json.dump(mapping, f, indent=2)
-
+    _persist_mapping(career, categories)
     return categories
 
+
 def get_categories_for_career(career: str):
     mapping = load_career_mapping()
     if career in mapping:
-        print(f"✅ Loaded cached mapping for career: {career}")
         return mapping[career]
-    else:
-        print(f"🤖 Generating new mapping for unseen career: {career}")
-        return generate_dynamic_mapping(career)
+
+    # Single-flight: only the first caller for an unseen career hits the LLM
+    with _mapping_lock:
+        if career in _mapping:
+            return _mapping[career]
+        future = _inflight.get(career)
+        owner = future is None
+        if owner:
+            future = _inflight[career] = Future()
+
+    if not owner:
+        return future.result()
+
+    print(f"🤖 Generating new mapping for unseen career: {career}")
+    try:
+        categories = generate_dynamic_mapping(career)
+        future.set_result(categories)
+        return categories
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _mapping_lock:
+            _inflight.pop(career, None)
+
+
+async def aget_categories_for_career(career: str):
+    """
+    Async wrapper: cached careers are answered inline; unseen careers are
+    mapped in a worker thread so the event loop is not blocked by the LLM call.
+    """
+    mapping = load_career_mapping()
+    if career in mapping:
+        return mapping[career]
+    return await asyncio.to_thread(get_categories_for_career, career)
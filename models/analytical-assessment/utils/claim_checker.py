@@ -0,0 +1,267 @@
+"""
+Numeric claim extraction and checking for generated questions.
+
+Pulls arithmetic equalities ("40/50 = 0.8 = 80%"), percentage claims
+("25% of 80 is 20") and ratios ("3:4 = 0.75") out of the question,
+options and explanation, and evaluates them with a restricted AST
+evaluator. SymPy is only imported for claims that contain variables.
+"""
+
+import re
+import ast
+import operator
+from typing import Any, Dict, List, Optional
+
+# -----------------------------------------------------------
+# 🔎 Extraction Patterns
+# -----------------------------------------------------------
+_NUM = r"\d+(?:\.\d+)?"
+# Maximal run of arithmetic characters containing "=", not glued to a preceding word (e.g. "Q1 = 40")
+_NUMERIC_RUN = re.compile(r"(?<![A-Za-z_\d])[\d.%+\-*/×÷^():\s]*\d[\d.%+\-*/×÷^():\s]*(?:=[\d.%+\-*/×÷^():\s]+)+")
+# A lone lowercase letter is a variable, unless it is part of an abbreviation ("i.e.", "e.g.")
+_VARIABLE = r"(?<![A-Za-z.])[a-z](?![A-Za-z]|\.[A-Za-z])"
+_SYMBOLIC_RUN = re.compile(rf"(?:{_VARIABLE}|[\d.%+\-*/^()\s])+(?:=(?:{_VARIABLE}|[\d.%+\-*/^()\s])+)+")
+_PERCENT_OF = re.compile(
+    rf"({_NUM})\s*%\s+of\s+({_NUM})\s*(?:=|is|equals|gives)\s*({_NUM}%?)", re.IGNORECASE
+)
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_TIMES_X = re.compile(r"(?<=\d)\s*[xX]\s*(?=\d)")
+_CURRENCY = re.compile(r"[$€£₹](?=\d)")
+# "= 12 x $100", "= 120 and Week 2": a word between the run's last number and the next one
+_WORD_THEN_NUMBER = re.compile(r"\s*[A-Za-z]+\.?\s*[-+(]?\d")
+_NUMERIC_LITERAL = re.compile(rf"^\s*-?{_NUM}\s*%?\s*$")
+# "3:4", "3 : 4" — a colon between two bare numbers with even spacing
+_RATIO_COLON = re.compile(rf"(?<![A-Za-z_\d.]){_NUM}(\s*):(\s*)(?=\d)")
+# "Step 1: 250 - 200 = 50" — the colon ends a label, it is not a ratio
+_LABEL_WORD = re.compile(
+    r"\b(?:step|part|case|option|question|stage|phase|method|example|rule|item|line|round|year|day|week)\s*#?\s*$",
+    re.IGNORECASE,
+)
+# "2019-2020 = 12%" — a span of years, not a subtraction
+_YEAR_RANGE = re.compile(r"(?<![\d.])((?:19|20)\d\d)\s*[-–]\s*((?:19|20)\d\d)(?![\d.])")
+
+_MAX_EXPONENT = 12
+
+
+# -----------------------------------------------------------
+# 🧮 Restricted Evaluator
+# -----------------------------------------------------------
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def _eval_node(node) -> float:
+    if isinstance(node, ast.Expression):
+        return _eval_node(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        left, right = _eval_node(node.left), _eval_node(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > _MAX_EXPONENT:
+            raise ValueError("Exponent too large.")
+        return _BIN_OPS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return _UNARY_OPS[type(node.op)](_eval_node(node.operand))
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+
+def _to_python(expr: str) -> str:
+    expr = expr.replace("×", "*").replace("÷", "/").replace("^", "**").replace(":", "/")
+    return re.sub(r"%", "/100", expr)
+
+
+def evaluate_arithmetic(expr: str) -> Optional[float]:
+    """
+    Evaluates a plain arithmetic expression (numbers, + - * / ^, %, ratios, parentheses).
+    Returns None if the text is not a well-formed arithmetic expression.
+    """
+    candidate = expr.strip().rstrip(".").strip(": ")
+    # Runs cut out of prose may carry an unmatched bracket at either end
+    for _ in range(3):
+        if not candidate or not any(c.isdigit() for c in candidate):
+            return None
+        try:
+            return _eval_node(ast.parse(_to_python(candidate), mode="eval"))
+        except ZeroDivisionError:
+            return float("nan")
+        except (SyntaxError, ValueError, OverflowError):
+            if candidate.startswith("(") and candidate.count("(") > candidate.count(")"):
+                candidate = candidate[1:].strip()
+            elif candidate.endswith(")") and candidate.count(")") > candidate.count("("):
+                candidate = candidate[:-1].strip()
+            else:
+                return None
+    return None
+
+
+def _tolerance(part: str, value: float) -> float:
+    """Accepts rounding to the precision the text states (e.g. 1/3 = 0.33)."""
+    literal = part.strip().rstrip(".").strip()
+    if _NUMERIC_LITERAL.match(literal):
+        digits = literal.rstrip("%").strip()
+        decimals = len(digits.split(".")[1]) if "." in digits else 0
+        unit = 10 ** -decimals
+        if literal.endswith("%"):
+            unit /= 100
+        return unit / 2 + 1e-9
+    return max(abs(value) * 1e-6, 1e-9)
+
+
+def _close(a_part: str, a: float, b_part: str, b: float) -> bool:
+    if a != a or b != b:  # NaN from division by zero
+        return False
+    if abs(a - b) <= max(_tolerance(a_part, a), _tolerance(b_part, b)):
+        return True
+    # "(100/200)*100 = 50%" — a percent literal may also stand for its plain number,
+    # at the precision the percent states (so "3 = 40%" is still wrong)
+    for part, value, other in ((a_part, a, b), (b_part, b, a)):
+        if part.strip().rstrip(".").endswith("%") and abs(value * 100 - other) <= _tolerance(part, value) * 100:
+            return True
+    return False
+
+
+# -----------------------------------------------------------
+# 📜 Claim Extraction + Checking
+# -----------------------------------------------------------
+def _normalize_text(text: str) -> str:
+    text = _CURRENCY.sub("", _THOUSANDS.sub("", text))
+    text = _YEAR_RANGE.sub(lambda m: "years" if int(m.group(2)) > int(m.group(1)) else m.group(), text)
+    if ":" in text:
+        text = _label_colons(text)
+    return _TIMES_X.sub("*", text)
+
+
+def _label_colons(text: str) -> str:
+    """Keeps ":" only where it reads as a ratio; other colons become ";", which ends a numeric run."""
+    ratios = {
+        m.end(1) for m in _RATIO_COLON.finditer(text)
+        if m.group(1) == m.group(2) and not _LABEL_WORD.search(text, 0, m.start())
+    }
+    return re.sub(":", lambda m: ":" if m.start() in ratios else ";", text)
+
+
+_OPERATORS = "+-*/×÷^"
+
+
+def _numeric_chains(text: str) -> List[Dict[str, Any]]:
+    claims = []
+    for match in _NUMERIC_RUN.finditer(text):
+        parts = match.group().split("=")
+        values = [evaluate_arithmetic(p) for p in parts]
+
+        # Ends that belong to surrounding prose are not claims:
+        #   "2x + 1 = 7", "= 2x + 6"          cut out of a symbolic expression
+        #   "Week 1 = 120", "4 hours x 15 = 60"  a label or unit right before a bare number
+        #   "= 12 x $100", "= 120 and Week 2"    a word between the last number and the next
+        before = text[:match.start()].rstrip()
+        first = parts[0].strip()
+        if before[-1:].isalpha() and (first[:1] in tuple(_OPERATORS) or _NUMERIC_LITERAL.match(first)):
+            values[0] = None
+        after = text[match.end():]
+        glued = not match.group()[-1:].isspace() and after[:1].isalpha()
+        ends_sentence = match.group().rstrip().endswith(".")
+        if glued or parts[-1].strip()[-1:] in tuple(_OPERATORS) or (
+            not ends_sentence and _WORD_THEN_NUMBER.match(after)
+        ):
+            values[-1] = None
+
+        for i in range(len(parts) - 1):
+            if values[i] is None or values[i + 1] is None:
+                continue
+            claims.append({
+                "claim": f"{parts[i].strip()} = {parts[i + 1].strip().rstrip('.')}",
+                "value": values[i + 1],
+                "ok": _close(parts[i], values[i], parts[i + 1], values[i + 1]),
+            })
+    return claims
+
+
+def _percent_claims(text: str) -> List[Dict[str, Any]]:
+    claims = []
+    for pct, base, result in _PERCENT_OF.findall(text):
+        expected = float(pct) / 100 * float(base)
+        stated = evaluate_arithmetic(result)
+        if stated is None:
+            continue
+        if result.endswith("%"):
+            continue  # "x% of y is z%" compares different units; not a checkable claim
+        claims.append({
+            "claim": f"{pct}% of {base} = {result}",
+            "value": stated,
+            "ok": _close(f"{pct}*{base}", expected, result, stated),
+        })
+    return claims
+
+
+def _symbolic_claims(text: str) -> List[Dict[str, Any]]:
+    """Claims with variables (e.g. "2(x + 3) = 2x + 6"); the only path that needs SymPy."""
+    runs = [m.group() for m in _SYMBOLIC_RUN.finditer(text)]
+    runs = [r for r in runs if re.search(_VARIABLE, r) and re.search(r"[\d+\-*/^]", r)]
+    if not runs:
+        return []
+
+    from utils.sympy_checker import check_symbolic_equality
+
+    claims = []
+    for run in runs:
+        parts = run.split("=")
+        for i in range(len(parts) - 1):
+            # Purely numeric steps ("0.25 = 25%") are the numeric checker's job
+            if not (re.search(_VARIABLE, parts[i]) or re.search(_VARIABLE, parts[i + 1])):
+                continue
+            ok = check_symbolic_equality(parts[i].replace("%", "/100"), parts[i + 1].replace("%", "/100"))
+            if ok is None:
+                continue
+            claims.append({"claim": f"{parts[i].strip()} = {parts[i + 1].strip()}", "value": None, "ok": ok})
+    return claims
+
+
+def extract_claims(text: str) -> List[Dict[str, Any]]:
+    """Returns every checkable numeric or symbolic claim found in `text`."""
+    if not text or not any(c.isdigit() for c in text):
+        return []
+    text = _normalize_text(text)
+    percent = _percent_claims(text)
+    # Blank out "x% of y = z" spans so the chain scanner doesn't read "y = z" on its own
+    remaining = _PERCENT_OF.sub(lambda m: " " * len(m.group()), text)
+    return _numeric_chains(remaining) + percent + _symbolic_claims(remaining)
+
+
+def check_question_claims(question_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Checks numeric claims across the question, options and explanation.
+
+    Also flags an answer mismatch: when every option is a number and the
+    explanation's computations land on a different option than the
+    provided correct answer.
+
+    Returns {"ok": bool, "claims": [...], "failures": [str, ...]}.
+    """
+    texts = [question_data.get("question") or "", question_data.get("explanation") or ""]
+    texts += [str(o) for o in question_data.get("options") or []]
+
+    claims = []
+    for text in texts:
+        claims.extend(extract_claims(text))
+    failures = [c["claim"] for c in claims if not c["ok"]]
+
+    options = [str(o) for o in question_data.get("options") or []]
+    answer = str(question_data.get("correct_answer") or "")
+    if options and all(_NUMERIC_LITERAL.match(o) for o in options) and _NUMERIC_LITERAL.match(answer):
+        computed = [c for c in extract_claims(question_data.get("explanation") or "") if c["ok"] and c["value"] is not None]
+        if computed:
+            def supported(option: str) -> bool:
+                value = evaluate_arithmetic(option)
+                return any(_close(option, value, "", c["value"]) for c in computed)
+
+            if not supported(answer) and any(supported(o) for o in options if o.strip() != answer.strip()):
+                failures.append(f"Explanation computes a different option than the correct answer '{answer}'.")
+
+    return {"ok": not failures, "claims": claims, "failures": failures}
+
@@ -0,0 +1,71 @@
+"""
+LLM backend selection.
+
+Modules build their chat clients through make_client() / make_async_client()
+instead of constructing OpenAI clients directly, so the whole service can be
+switched to the local deterministic stand-in (utils.fake_llm) for offline
+load tests:
+
+    LLM_BACKEND=fake FAKE_LLM_LATENCY=0.3 FAKE_LLM_FAILURE_RATE=0.02 uvicorn app:app
+
+With the fake backend no OpenAI client is created, so no API key is needed.
+
+Shared module: identical copies live in each service's utils/ (services
+run and ship independently); edit the analytical-assessment copy and run
+models/sync_shared_utils.py.
+"""
+
+import os
+import threading
+from dotenv import load_dotenv
+from utils.fake_llm import FakeLLM, FakeOpenAI, FakeAsyncOpenAI
+
+load_dotenv()
+
+# -----------------------------------------------------------
+# 🔧 Configuration
+# -----------------------------------------------------------
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").strip().lower()
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.2"))
+FAKE_LLM_JITTER = float(os.getenv("FAKE_LLM_JITTER", "0.0"))
+FAKE_LLM_FAILURE_RATE = float(os.getenv("FAKE_LLM_FAILURE_RATE", "0.0"))
+FAKE_LLM_INVALID_RATE = float(os.getenv("FAKE_LLM_INVALID_RATE", "0.0"))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "42"))
+
+_fake = None
+_fake_lock = threading.Lock()
+
+
+def using_fake_backend() -> bool:
+    return LLM_BACKEND == "fake"
+
+
+def get_fake_llm() -> FakeLLM:
+    """The process-wide fake, shared by every client so call counts add up."""
+    global _fake
+    with _fake_lock:
+        if _fake is None:
+            _fake = FakeLLM(
+                latency=FAKE_LLM_LATENCY,
+                invalid_rate=FAKE_LLM_INVALID_RATE,
+                seed=FAKE_LLM_SEED,
+                jitter=FAKE_LLM_JITTER,
+                failure_rate=FAKE_LLM_FAILURE_RATE,
+            )
+        return _fake
+
+
+def make_client():
+    """Sync chat client for the configured backend."""
+    if using_fake_backend():
+        return FakeOpenAI(fake=get_fake_llm())
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def make_async_client():
+    """Async chat client for the configured backend."""
+    if using_fake_backend():
+        return FakeAsyncOpenAI(fake=get_fake_llm())
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
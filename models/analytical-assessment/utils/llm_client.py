@@ -0,0 +1,92 @@
+"""
+Instrumented wrapper around OpenAI-compatible chat completion calls.
+
+Every LLM call site goes through chat_completion() / achat_completion(),
+which record per call site and per endpoint:
+  - latency histogram (by outcome)
+  - prompt / completion token counters
+  - retries and failure reasons
+The endpoint label comes from a context variable set by the app's HTTP
+middleware; work started outside a request is labelled "background".
+
+Shared module: identical copies live in each service's utils/ (services
+run and ship independently); edit the analytical-assessment copy and run
+models/sync_shared_utils.py.
+"""
+
+import time
+import asyncio
+from contextvars import ContextVar
+
+from utils.metrics import REGISTRY
+
+current_endpoint: ContextVar[str] = ContextVar("llm_endpoint", default="background")
+
+LLM_LATENCY = REGISTRY.histogram(
+    "llm_request_duration_seconds", "LLM call latency by call site, endpoint and outcome."
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "llm_requests_total", "LLM calls by call site, endpoint and outcome."
+)
+LLM_PROMPT_TOKENS = REGISTRY.counter(
+    "llm_prompt_tokens_total", "Prompt tokens spent by call site and endpoint."
+)
+LLM_COMPLETION_TOKENS = REGISTRY.counter(
+    "llm_completion_tokens_total", "Completion tokens spent by call site and endpoint."
+)
+LLM_RETRIES = REGISTRY.counter(
+    "llm_retries_total", "LLM call retries by call site and endpoint."
+)
+LLM_FAILURES = REGISTRY.counter(
+    "llm_failures_total", "LLM call failures by call site, endpoint and reason."
+)
+
+
+def _observe(call_site: str, started: float, outcome: str, response=None, reason: str = None):
+    endpoint = current_endpoint.get()
+    LLM_LATENCY.observe(time.perf_counter() - started, call_site=call_site, endpoint=endpoint, outcome=outcome)
+    LLM_REQUESTS.inc(call_site=call_site, endpoint=endpoint, outcome=outcome)
+    if reason:
+        LLM_FAILURES.inc(call_site=call_site, endpoint=endpoint, reason=reason)
+
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        LLM_PROMPT_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, call_site=call_site, endpoint=endpoint)
+        LLM_COMPLETION_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, call_site=call_site, endpoint=endpoint)
+
+
+def chat_completion(client, call_site: str, **kwargs):
+    """Calls client.chat.completions.create(**kwargs) and records metrics for `call_site`."""
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(**kwargs)
+    except Exception as e:
+        _observe(call_site, started, "error", reason=type(e).__name__)
+        raise
+    _observe(call_site, started, "ok", response=response)
+    return response
+
+
+async def achat_completion(client, call_site: str, **kwargs):
+    """Async variant of chat_completion() for AsyncOpenAI-compatible clients."""
+    started = time.perf_counter()
+    try:
+        response = await client.chat.completions.create(**kwargs)
+    except asyncio.CancelledError:
+        # Pipelines cancel surplus in-flight work; count it so wasted spend is visible
+        _observe(call_site, started, "cancelled")
+        raise
+    except Exception as e:
+        _observe(call_site, started, "error", reason=type(e).__name__)
+        raise
+    _observe(call_site, started, "ok", response=response)
+    return response
+
+
+def record_retry(call_site: str):
+    LLM_RETRIES.inc(call_site=call_site, endpoint=current_endpoint.get())
+
+
+def record_failure(call_site: str, reason: str):
+    """Records a failure detected after a successful call (e.g. unparseable output)."""
+    LLM_FAILURES.inc(call_site=call_site, endpoint=current_endpoint.get(), reason=reason)
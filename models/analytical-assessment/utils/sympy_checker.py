@@ -1,11 +1,41 @@
-import sympy
-
 def verify_math_expression(expression: str):
     """
     Tries to simplify a mathematical expression to check for validity.
     """
+    # Imported lazily: SymPy adds noticeable startup time to every worker
+    import sympy
+
     try:
         expr = sympy.sympify(expression)
         return True if expr is not None else False
     except Exception:
         return False
+
+
+def check_symbolic_equality(lhs: str, rhs: str):
+    """
+    Checks a symbolic claim "lhs = rhs".
+
+    Returns False only when the two sides differ by a non-zero constant
+    (a contradiction such as "x + 2 = x + 3"), True when they are identical,
+    and None when the claim is an equation to solve or cannot be parsed.
+    """
+    import sympy
+    from sympy.parsing.sympy_parser import (
+        parse_expr, standard_transformations, implicit_multiplication_application, convert_xor
+    )
+
+    transformations = standard_transformations + (implicit_multiplication_application, convert_xor)
+    try:
+        difference = sympy.simplify(
+            parse_expr(lhs.strip(), transformations=transformations)
+            - parse_expr(rhs.strip().rstrip("."), transformations=transformations)
+        )
+    except Exception:
+        return None
+
+    if difference == 0:
+        return True
+    if not difference.free_symbols:
+        return False
+    return None
@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# -----------------------------------------------------------
+# 🔧 Configuration
+# -----------------------------------------------------------
+CACHE_PATH = Path(os.getenv(
+    "VALIDATION_CACHE_PATH",
+    Path(__file__).parent.parent / "data" / "validation_cache.sqlite3"
+))
+CACHE_MAX_ENTRIES = int(os.getenv("VALIDATION_CACHE_MAX_ENTRIES", "50000"))
+CACHE_TTL_SECONDS = float(os.getenv("VALIDATION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+CACHE_ENABLED = os.getenv("VALIDATION_CACHE_ENABLED", "true").lower() == "true"
+# Hits record their access time in memory; the rows are updated in one batch
+TOUCH_BATCH = int(os.getenv("VALIDATION_CACHE_TOUCH_BATCH", "256"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    kind        TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache (last_access);
+"""
+
+
+# -----------------------------------------------------------
+# 🔑 Content-addressed Keys
+# -----------------------------------------------------------
+def _normalize(text: Any) -> str:
+    return re.sub(r"\s+", " ", str(text or "")).strip().lower()
+
+
+def question_key(question_data: Dict[str, Any]) -> str:
+    """Hash of the normalized question, options (order-independent) and answer."""
+    payload = [
+        _normalize(question_data.get("question")),
+        sorted(_normalize(o) for o in question_data.get("options") or []),
+        _normalize(question_data.get("correct_answer")),
+    ]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def text_key(text: str) -> str:
+    """Hash of normalized question text only (Bloom level depends on nothing else)."""
+    return hashlib.sha256(_normalize(text).encode("utf-8")).hexdigest()
+
+
+# -----------------------------------------------------------
+# 🗄️ Validation Cache (SQLite, LRU + TTL)
+# -----------------------------------------------------------
+class ValidationCache:
+    """
+    Persistent cache of LLM validation verdicts.
+
+    Entries expire after `ttl` seconds; once more than `max_entries`
+    are stored the least recently used ones are evicted. Hits don't write:
+    their access times are flushed every `touch_batch` hits or before an
+    eviction. Async code uses aget()/aput(), which run SQLite in a thread.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES,
+                 ttl: float = CACHE_TTL_SECONDS, enabled: bool = CACHE_ENABLED,
+                 touch_batch: int = TOUCH_BATCH):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.touch_batch = touch_batch
+        self._touched: Dict[tuple, float] = {}
+        self._touch_hits = 0
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._evictions = 0
+        self._conn = None
+        self._size = 0
+        if enabled:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            (self._size,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+
+    def _count(self, kind: str, outcome: str):
+        bucket = self._counters.setdefault(kind, {"hits": 0, "misses": 0})
+        bucket[outcome] += 1
+
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None:
+                self._count(kind, "misses")
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM cache WHERE kind = ? AND key = ?", (kind, key))
+                self._size -= 1
+                self._count(kind, "misses")
+                return None
+            self._touched[(kind, key)] = now
+            self._touch_hits += 1
+            if self._touch_hits >= self.touch_batch:
+                self._flush_touched_locked()
+            self._count(kind, "hits")
+        return json.loads(value)
+
+    async def aget(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """Async get(): the SQLite lookup runs in a thread."""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.get, kind, key)
+
+    def _flush_touched_locked(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE cache SET last_access = ? WHERE kind = ? AND key = ?",
+                [(at, kind, key) for (kind, key), at in self._touched.items()],
+            )
+            self._touched.clear()
+        self._touch_hits = 0
+
+    def put(self, kind: str, key: str, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            existed = self._conn.execute(
+                "SELECT 1 FROM cache WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (kind, key, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, json.dumps(value), now, now),
+            )
+            self._touched.pop((kind, key), None)
+            if not existed:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict_locked(now)
+
+    async def aput(self, kind: str, key: str, value: Dict[str, Any]):
+        if self.enabled:
+            await asyncio.to_thread(self.put, kind, key, value)
+
+    def _evict_locked(self, now: float):
+        # Expired first, then least recently used down to 90% of capacity
+        self._flush_touched_locked()
+        cur = self._conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl,))
+        evicted = max(cur.rowcount, 0)
+        target = int(self.max_entries * 0.9)
+        (size,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if size > target:
+            cur = self._conn.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY last_access LIMIT ?)",
+                (size - target,),
+            )
+            evicted += max(cur.rowcount, 0)
+            size -= max(cur.rowcount, 0)
+        self._size = size
+        self._evictions += evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = {k: dict(v) for k, v in self._counters.items()}
+        hits = sum(v["hits"] for v in kinds.values())
+        misses = sum(v["misses"] for v in kinds.values())
+        return {
+            "enabled": self.enabled,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "evictions": self._evictions,
+            "by_kind": kinds,
+        }
+
+
+validation_cache = ValidationCache()
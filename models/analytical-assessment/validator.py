@@ -1,16 +1,25 @@
 import os
 import json
 import re
+import asyncio
 from dotenv import load_dotenv
-from openai import OpenAI
-from utils.sympy_checker import verify_math_expression
-from utils.bloom_classifier import classify_bloom_level
+from utils.claim_checker import check_question_claims
+from utils.bloom_classifier import classify_bloom_level, aclassify_bloom_level
+from utils.llm_backend import make_client, make_async_client
+from utils.llm_client import chat_completion, achat_completion
+from utils.validation_cache import validation_cache, question_key, text_key
 
 # -----------------------------------------------------------
 # 🔧 Setup
 # -----------------------------------------------------------
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = make_client()
+async_client = make_async_client()
+
+# "combined" → one structured-output call returns logic verdict + Bloom level
+# "split"    → separate logic_validation and classify_bloom_level calls
+VALIDATION_MODE = os.getenv("ANALYTICAL_VALIDATION_MODE", "combined").lower()
+BLOOM_LEVELS = ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]
 
 # -----------------------------------------------------------
 # 🧩 STRUCTURE VALIDATION
@@ -36,10 +45,8 @@ def structure_validation(question_data: dict):
 # -----------------------------------------------------------
 # 🧠 LOGICAL VALIDATION (LLM verification)
 # -----------------------------------------------------------
-def logic_validation(question_data: dict):
-    """Verifies if the provided answer logically follows from the question."""
-    try:
-        prompt = f"""
+def _logic_messages(question_data: dict):
+    prompt = f"""
         Verify if the following analytical reasoning question and its correct answer are logically valid.
 
         Question: {question_data['question']}
@@ -53,32 +60,71 @@ def logic_validation(question_data: dict):
             "solution_steps": "string"
         }}
         """
+    return [
+        {"role": "system", "content": "You are a reasoning verifier that checks logical correctness of analytical questions."},
+        {"role": "user", "content": prompt}
+    ]
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a reasoning verifier that checks logical correctness of analytical questions."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=300
-        )
 
-        result_text = response.choices[0].message.content.strip()
+def _parse_logic_result(result_text: str) -> dict:
+    # Extract valid JSON from model output
+    json_match = re.search(r"\{[\s\S]*\}", result_text)
+    if json_match:
+        return json.loads(json_match.group())
+    raise ValueError("Invalid JSON returned from LLM verifier.")
 
-        # Extract valid JSON from model output
-        json_match = re.search(r"\{[\s\S]*\}", result_text)
-        if json_match:
-            logic_result = json.loads(json_match.group())
-        else:
-            raise ValueError("Invalid JSON returned from LLM verifier.")
 
-        if not logic_result.get("is_valid", False):
-            raise ValueError(f"Logic check failed: {logic_result.get('reason', 'Unknown reason')}")
+def _apply_logic_result(question_data: dict, logic_result: dict):
+    """Attaches reason/solution steps to the question, raising if the verdict is invalid."""
+    if not logic_result.get("is_valid", False):
+        raise ValueError(f"Logic check failed: {logic_result.get('reason', 'Unknown reason')}")
 
-        question_data["logic_reason"] = logic_result.get("reason")
-        question_data["solution_steps"] = logic_result.get("solution_steps")
-        return True
+    question_data["logic_reason"] = logic_result.get("reason")
+    question_data["solution_steps"] = logic_result.get("solution_steps")
+    return True
+
+
+def logic_validation(question_data: dict):
+    """Verifies if the provided answer logically follows from the question."""
+    try:
+        key = question_key(question_data)
+        logic_result = validation_cache.get("logic", key)
+        if logic_result is None:
+            response = chat_completion(
+                client, "validator.logic_validation",
+                model="gpt-4o-mini",
+                messages=_logic_messages(question_data),
+                temperature=0.3,
+                max_tokens=300
+            )
+            logic_result = _parse_logic_result(response.choices[0].message.content.strip())
+            validation_cache.put("logic", key, logic_result)
+
+        return _apply_logic_result(question_data, logic_result)
+
+    except Exception as e:
+        question_data["logic_error"] = str(e)
+        return False
+
+
+async def alogic_validation(question_data: dict, llm=None):
+    """Async variant of logic_validation()."""
+    llm = llm or async_client
+    try:
+        key = question_key(question_data)
+        logic_result = await validation_cache.aget("logic", key)
+        if logic_result is None:
+            response = await achat_completion(
+                llm, "validator.logic_validation",
+                model="gpt-4o-mini",
+                messages=_logic_messages(question_data),
+                temperature=0.3,
+                max_tokens=300
+            )
+            logic_result = _parse_logic_result(response.choices[0].message.content.strip())
+            await validation_cache.aput("logic", key, logic_result)
+
+        return _apply_logic_result(question_data, logic_result)
 
     except Exception as e:
         question_data["logic_error"] = str(e)
@@ -88,54 +134,167 @@ def logic_validation(question_data: dict):
 # -----------------------------------------------------------
 # 🎓 BLOOM’S LEVEL VALIDATION
 # -----------------------------------------------------------
+def _check_bloom_level(level: str):
+    if level not in ["Analyze", "Evaluate", "Create"]:
+        raise ValueError(f"Question not aligned with analytical Bloom levels. Detected: {level}")
+    return level
+
+
 def bloom_validation(question_text: str):
     """Validates the Bloom’s Taxonomy level for the given question."""
     try:
-        level = classify_bloom_level(question_text)
-        if level not in ["Analyze", "Evaluate", "Create"]:
-            raise ValueError(f"Question not aligned with analytical Bloom levels. Detected: {level}")
-        return level
+        key = text_key(question_text)
+        cached = validation_cache.get("bloom", key)
+        if cached is None:
+            cached = {"bloom_level": classify_bloom_level(question_text)}
+            validation_cache.put("bloom", key, cached)
+        return _check_bloom_level(cached["bloom_level"])
+    except Exception as e:
+        print(f"⚠️ Bloom validation failed: {e}")
+        return None
+
+
+async def abloom_validation(question_text: str, llm=None):
+    """Async variant of bloom_validation()."""
+    try:
+        key = text_key(question_text)
+        cached = await validation_cache.aget("bloom", key)
+        if cached is None:
+            cached = {"bloom_level": await aclassify_bloom_level(question_text, llm=llm)}
+            await validation_cache.aput("bloom", key, cached)
+        return _check_bloom_level(cached["bloom_level"])
     except Exception as e:
         print(f"⚠️ Bloom validation failed: {e}")
         return None
 
 
 # -----------------------------------------------------------
-# 🧮 MATHEMATICAL VALIDATION
+# 🔗 COMBINED LOGIC + BLOOM VALIDATION (single LLM call)
 # -----------------------------------------------------------
-def math_validation(question_text: str):
-    """Symbolically verifies any mathematical expressions if detected."""
+COMBINED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "question_validation",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "is_valid": {"type": "boolean"},
+                "reason": {"type": "string"},
+                "solution_steps": {"type": "string"},
+                "bloom_level": {"type": "string", "enum": BLOOM_LEVELS}
+            },
+            "required": ["is_valid", "reason", "solution_steps", "bloom_level"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+def _combined_messages(question_data: dict):
+    prompt = f"""
+        Verify if the following analytical reasoning question and its correct answer are logically valid,
+        and classify the question according to Bloom's Taxonomy
+        (Remember, Understand, Apply, Analyze, Evaluate, Create).
+
+        Question: {question_data['question']}
+        Options: {question_data['options']}
+        Provided Answer: {question_data['correct_answer']}
+        """
+    return [
+        {"role": "system", "content": "You are a reasoning verifier and Bloom's taxonomy classifier for analytical questions."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _apply_combined_result(question_data: dict, result: dict):
+    """Returns (logic_pass, bloom_level) from the structured verifier output."""
+    logic_pass = bool(result.get("is_valid", False))
+    if logic_pass:
+        question_data["logic_reason"] = result.get("reason")
+        question_data["solution_steps"] = result.get("solution_steps")
+    else:
+        question_data["logic_error"] = f"Logic check failed: {result.get('reason', 'Unknown reason')}"
+
     try:
-        if any(char.isdigit() for char in question_text):
-            valid = verify_math_expression(question_text)
-            if not valid:
-                raise ValueError("Mathematical expression failed symbolic verification.")
-        return True
+        bloom_level = _check_bloom_level(result.get("bloom_level"))
+    except ValueError as e:
+        print(f"⚠️ Bloom validation failed: {e}")
+        bloom_level = None
+    return logic_pass, bloom_level
+
+
+def combined_validation(question_data: dict):
+    """Logic check and Bloom classification from one JSON-schema-constrained call."""
+    try:
+        key = question_key(question_data)
+        result = validation_cache.get("combined", key)
+        if result is None:
+            response = chat_completion(
+                client, "validator.combined_validation",
+                model="gpt-4o-mini",
+                messages=_combined_messages(question_data),
+                response_format=COMBINED_RESPONSE_FORMAT,
+                temperature=0.3,
+                max_tokens=350
+            )
+            result = json.loads(response.choices[0].message.content.strip())
+            validation_cache.put("combined", key, result)
+        return _apply_combined_result(question_data, result)
     except Exception as e:
-        print(f"⚠️ Math validation failed: {e}")
-        return False
+        question_data["logic_error"] = str(e)
+        return False, None
+
+
+async def acombined_validation(question_data: dict, llm=None):
+    """Async variant of combined_validation()."""
+    llm = llm or async_client
+    try:
+        key = question_key(question_data)
+        result = await validation_cache.aget("combined", key)
+        if result is None:
+            response = await achat_completion(
+                llm, "validator.combined_validation",
+                model="gpt-4o-mini",
+                messages=_combined_messages(question_data),
+                response_format=COMBINED_RESPONSE_FORMAT,
+                temperature=0.3,
+                max_tokens=350
+            )
+            result = json.loads(response.choices[0].message.content.strip())
+            await validation_cache.aput("combined", key, result)
+        return _apply_combined_result(question_data, result)
+    except Exception as e:
+        question_data["logic_error"] = str(e)
+        return False, None
 
 
 # -----------------------------------------------------------
-# ✅ MASTER VALIDATOR FUNCTION
+# 🧮 MATHEMATICAL VALIDATION
 # -----------------------------------------------------------
-def validate_question(question_data: dict):
+def math_validation(question_data):
     """
-    Runs all validation layers sequentially.
-    Invalid questions are marked as is_valid=False (not raised).
+    Checks the arithmetic claims (expressions, percentages, ratios) made in the
+    question, options and explanation. Accepts a question dict or plain text.
     """
+    if isinstance(question_data, str):
+        question_data = {"question": question_data}
     try:
-        structure_validation(question_data)
+        result = check_question_claims(question_data)
+        if not result["ok"]:
+            raise ValueError(f"Numeric claim check failed: {'; '.join(result['failures'])}")
+        return True
     except Exception as e:
-        question_data["is_valid"] = False
-        question_data["validation_error"] = f"Structure error: {e}"
-        return question_data
+        print(f"⚠️ Math validation failed: {e}")
+        question_data["math_error"] = str(e)
+        return False
 
-    # Run each layer safely
-    logic_pass = logic_validation(question_data)
-    math_pass = math_validation(question_data.get("question", ""))
-    bloom_level = bloom_validation(question_data.get("question", ""))
 
+# -----------------------------------------------------------
+# ✅ MASTER VALIDATOR FUNCTION
+# -----------------------------------------------------------
+def _finalize_validation(question_data: dict, logic_pass: bool, math_pass: bool, bloom_level):
+    """Combines per-layer outcomes into the final is_valid verdict."""
     # Attach Bloom level
     if bloom_level:
         question_data["bloom_level"] = bloom_level
@@ -147,7 +306,65 @@ def validate_question(question_data: dict):
         question_data["is_valid"] = False
         question_data["validation_error"] = (
             question_data.get("logic_error")
+            or question_data.get("math_error")
             or "Math or Bloom validation failed."
         )
 
     return question_data
+
+
+def _structure_or_reject(question_data: dict):
+    try:
+        structure_validation(question_data)
+        return True
+    except Exception as e:
+        question_data["is_valid"] = False
+        question_data["validation_error"] = f"Structure error: {e}"
+        return False
+
+
+def validate_question(question_data: dict, mode: str = None):
+    """
+    Runs all validation layers sequentially.
+    Invalid questions are marked as is_valid=False (not raised).
+    `mode` overrides VALIDATION_MODE ("combined" or "split").
+    """
+    if not _structure_or_reject(question_data):
+        return question_data
+
+    # Run each layer safely
+    if (mode or VALIDATION_MODE) == "combined":
+        math_pass = math_validation(question_data)
+        logic_pass, bloom_level = combined_validation(question_data) if math_pass else (False, None)
+        return _finalize_validation(question_data, logic_pass, math_pass, bloom_level)
+
+    logic_pass = logic_validation(question_data)
+    math_pass = math_validation(question_data)
+    bloom_level = bloom_validation(question_data.get("question", ""))
+
+    return _finalize_validation(question_data, logic_pass, math_pass, bloom_level)
+
+
+async def avalidate_question(question_data: dict, llm=None, mode: str = None):
+    """
+    Async variant of validate_question().
+    In split mode the logic and Bloom LLM calls are independent, so they run concurrently.
+    """
+    if not _structure_or_reject(question_data):
+        return question_data
+
+    math_pass = math_validation(question_data)
+    if not math_pass:
+        # No point paying for LLM round trips on a question that is already rejected
+        return _finalize_validation(question_data, False, False, None)
+
+    if (mode or VALIDATION_MODE) == "combined":
+        logic_pass, bloom_level = await acombined_validation(question_data, llm=llm)
+        return _finalize_validation(question_data, logic_pass, math_pass, bloom_level)
+
+    logic_pass, bloom_level = await asyncio.gather(
+        alogic_validation(question_data, llm=llm),
+        abloom_validation(question_data.get("question", ""), llm=llm),
+    )
+
+    return _finalize_validation(question_data, logic_pass, math_pass, bloom_level)
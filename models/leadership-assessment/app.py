@@ -1,18 +1,70 @@
-from fastapi import FastAPI, Body
-from logic.engine import SBREEngine
+from fastapi import FastAPI, Body, Request, Response
+from logic.engine import engine_class, cancel_session_prefetch
+from logic.question_pool import get_question_pool
+from utils.llm_client import current_endpoint
+from utils.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from utils.personalization_cache import personalization_cache
+from utils.session_store import make_session_store
+from contextlib import asynccontextmanager
 from uuid import uuid4
 
+# idle sessions expire after LEADERSHIP_SESSION_TTL_SECONDS; at most LEADERSHIP_MAX_SESSIONS are kept.
+# SESSION_BACKEND=sqlite|redis stores compact engine state outside the process (multi-worker).
+# LEADERSHIP_ENGINE=dict|array picks the session engine implementation
+Engine = engine_class()
+sessions = make_session_store(
+    dumps=Engine.to_state,
+    loads=Engine.from_state,
+    sizeof=Engine.approx_bytes,
+    on_evict=cancel_session_prefetch,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sessions.start()
+    yield
+    await sessions.stop()
+
+
 app = FastAPI(
     title="SBRE Leadership Engine",
     description="Adaptive Leadership Assessment API (Production Version)",
-    version="3.0"
+    version="3.0",
+    lifespan=lifespan
 )
 
-sessions = {}
+# parse + validate the question pool once at startup; engines share it
+get_question_pool()
+
+
+# label personalization LLM calls with the route that triggered them
+@app.middleware("http")
+async def tag_llm_endpoint(request: Request, call_next):
+    token = current_endpoint.set(request.url.path)
+    try:
+        return await call_next(request)
+    finally:
+        current_endpoint.reset(token)
+
+
+# LLM latency / token / failure metrics in Prometheus text format
+@app.get("/metrics")
+def metrics():
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# personalization cache hit/miss counters
+@app.get("/stats")
+def stats():
+    return {
+        "personalization_cache": personalization_cache.stats(),
+        "sessions": {"live": len(sessions), "ttl_seconds": sessions.ttl, "max_sessions": sessions.max_sessions},
+    }
 
 # start a new adaptive leadership quiz session
 @app.post("/start")
-def start_session(data: dict = Body(...)):
+async def start_session(data: dict = Body(...)):
 
     al_stream = data.get("al_stream")
     career = data.get("career")
@@ -24,11 +76,11 @@ def start_session(data: dict = Body(...)):
     session_id = str(uuid4())
 
     # Initialize engine
-    engine = SBREEngine(al_stream, career, total_questions)
-    sessions[session_id] = engine
+    engine = Engine(al_stream, career, total_questions, session_id=session_id)
 
     # Return the first adaptive question
-    first_question = engine.get_next_adaptive_question()
+    first_question = await engine.aget_next_adaptive_question()
+    await sessions.aput(session_id, engine)
     return {
         "session_id": session_id,
         "first_question": first_question,
@@ -38,7 +90,7 @@ def start_session(data: dict = Body(...)):
 
 # submit answer weights and get next question or final results
 @app.post("/answer")
-def answer_and_next(data: dict = Body(...)):
+async def answer_and_next(data: dict = Body(...)):
 
     session_id = data.get("session_id")
     weights = data.get("weights", {})
@@ -46,31 +98,30 @@ def answer_and_next(data: dict = Body(...)):
     if not session_id or not weights:
         return {"error": "Missing session_id or weights"}
 
-    engine = sessions.get(session_id)
+    def answer(engine):
+        engine.evaluate_response(weights)
+        # Check if quiz completed (LEADERSHIP_SELECTION=info may stop early once confident)
+        done = engine.asked_count >= engine.total_questions or engine.should_stop()
+        picked[:] = [None if done else engine.select_next_question()]
+        return engine
+
+    # Atomic read-modify-write: a concurrent answer for the same session can't be lost
+    picked = []
+    engine = await sessions.aupdate(session_id, answer)
     if not engine:
         return {"error": "Invalid or expired session_id"}
 
-    # Update trait scores
-    engine.evaluate_response(weights)
-
-    # Check if quiz completed
-    if len(engine.asked_ids) >= engine.total_questions:
-        results = engine.evaluate_final_results()
-        del sessions[session_id] 
-        return {
-            "results": results,
-            "message": "Leadership assessment completed successfully"
-        }
-
-    next_question = engine.get_next_adaptive_question()
+    next_question = await engine.apersonalize_next(picked[0])
     if not next_question:
         results = engine.evaluate_final_results()
-        del sessions[session_id]
+        await sessions.apop(session_id)
         return {
             "results": results,
             "message": "Leadership assessment completed successfully"
         }
 
+    # Store the new prefetch plan without overwriting anything recorded meanwhile
+    await sessions.aupdate(session_id, engine.share_plan)
     return {"next_question": next_question}
 
 
@@ -0,0 +1,121 @@
+"""
+Compares the dict-backed SBREEngine with the array-backed ArraySBREEngine.
+
+Runs many concurrent simulated sessions through the selection/scoring path
+(personalization is skipped), answering in round-robin order like a busy
+worker would. Reports time per answer, live memory per session and the
+cost of a to_state()/from_state() round trip, after checking that both
+engines pick the same questions and results for the same seeds.
+
+Run from the service directory:
+    python benchmarks/engine_benchmark.py
+    python benchmarks/engine_benchmark.py --sessions 20000 --questions 12
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic.engine import engine_class
+from logic.question_pool import get_question_pool
+
+ENGINES = {"dict": engine_class("dict"), "array": engine_class("array")}
+
+
+def play(engine, chooser):
+    """One answer: pick the next question, plan prefetch traits, score a random option."""
+    q = engine.select_question(engine._next_trait())
+    if q is None:
+        return None
+    engine._likely_next_traits(q)
+    option = chooser.choice(q["options"])
+    engine.evaluate_response(option["weights"])
+    return q["id"]
+
+
+def check_parity(seeds, total_questions):
+    for seed in range(seeds):
+        runs = []
+        for cls in ENGINES.values():
+            random.seed(seed)
+            chooser = random.Random(seed)
+            engine = cls("Science", "Software Engineer", total_questions)
+            asked, planned = [], []
+            for _ in range(total_questions):
+                qid = play(engine, chooser)
+                asked.append(qid)
+                if qid is not None:
+                    planned.append(engine._likely_next_traits(engine.pool.by_id[qid]))
+            runs.append((asked, planned, engine.evaluate_final_results()))
+        if runs[0] != runs[1]:
+            raise SystemExit(f"engines diverge for seed {seed}:\n  dict:  {runs[0]}\n  array: {runs[1]}")
+    print(f"parity: identical questions, prefetch traits and results for {seeds} seeds")
+
+
+def bench(name, cls, sessions, total_questions):
+    random.seed(1)
+    chooser = random.Random(1)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    engines = [cls("Science", "Software Engineer", total_questions) for _ in range(sessions)]
+    create_s = time.perf_counter() - started
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / sessions
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    answers = 0
+    for _ in range(total_questions):
+        for engine in engines:
+            if play(engine, chooser) is not None:
+                answers += 1
+    answer_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for engine in engines:
+        engine.evaluate_final_results()
+    results_s = time.perf_counter() - started
+
+    sample = engines[:min(len(engines), 2000)]
+    started = time.perf_counter()
+    for engine in sample:
+        cls.from_state(engine.session_id, engine.to_state())
+    roundtrip_s = time.perf_counter() - started
+
+    return {
+        "engine": name,
+        "create_us": create_s / sessions * 1e6,
+        "answer_us": answer_s / answers * 1e6,
+        "results_us": results_s / sessions * 1e6,
+        "roundtrip_us": roundtrip_s / len(sample) * 1e6,
+        "bytes_per_session": per_session,
+        "answers_per_s": answers / answer_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000, help="concurrent sessions per engine")
+    parser.add_argument("--questions", type=int, default=12, help="questions per session")
+    parser.add_argument("--parity-seeds", type=int, default=200)
+    args = parser.parse_args()
+
+    pool = get_question_pool()
+    print(f"pool: {len(pool)} questions; {args.sessions} sessions x {args.questions} questions\n")
+    check_parity(args.parity_seeds, args.questions)
+
+    rows = [bench(name, cls, args.sessions, args.questions) for name, cls in ENGINES.items()]
+    print(f"\n{'engine':<8}{'create':>10}{'answer':>10}{'results':>10}{'state io':>10}{'bytes/sess':>12}{'answers/s':>12}")
+    for r in rows:
+        print(f"{r['engine']:<8}{r['create_us']:>8.1f}us{r['answer_us']:>8.1f}us{r['results_us']:>8.1f}us"
+              f"{r['roundtrip_us']:>8.1f}us{r['bytes_per_session']:>12.0f}{r['answers_per_s']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
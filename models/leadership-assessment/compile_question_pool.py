@@ -0,0 +1,57 @@
+"""
+Validates questions/question_pool.json once and writes the compiled pool
+(questions/question_pool.npz) that the service loads at startup without
+per-question validation. Needs numpy.
+
+The artifact records the SHA-256 of the JSON it was built from; if the JSON
+changes and the artifact is not rebuilt, the service ignores the stale
+artifact and validates the JSON as before.
+
+Run from the service directory:
+    python compile_question_pool.py
+    python compile_question_pool.py --check    # exit 1 if missing or stale
+"""
+
+import argparse
+import sys
+
+from logic.question_pool import QUESTION_POOL_FILE, QuestionPool
+from utils.loader import (
+    load_question_pool, load_compiled_pool, save_compiled_pool, compiled_path, file_sha256
+)
+
+
+def compile_pool(source=QUESTION_POOL_FILE, out=None):
+    out = out or compiled_path(source)
+    source_sha256 = file_sha256(source)
+    if source_sha256 is None:
+        raise SystemExit(f"Question pool not found: {source}")
+    questions = load_question_pool(source)
+    if not questions:
+        raise SystemExit("No valid questions; nothing written.")
+    pool = QuestionPool(questions)
+    save_compiled_pool(out, list(pool.questions), source_sha256, pool.per_trait_max, pool.profiles)
+    print(f"Wrote {len(questions)} questions to {out} (source sha256 {source_sha256[:12]}).")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=QUESTION_POOL_FILE)
+    parser.add_argument("--out", help="artifact path (default: next to the source, .npz)")
+    parser.add_argument("--check", action="store_true", help="only verify the artifact is present and current")
+    args = parser.parse_args()
+
+    if args.check:
+        out = args.out or compiled_path(args.source)
+        compiled = load_compiled_pool(out, source_path=args.source)
+        if compiled is None:
+            print(f"{out} is missing or stale; run python compile_question_pool.py")
+            sys.exit(1)
+        print(f"{out} is current ({len(compiled['ids'])} questions).")
+        return
+    compile_pool(args.source, args.out)
+
+
+if __name__ == "__main__":
+    main()
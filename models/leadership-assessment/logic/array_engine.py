@@ -0,0 +1,220 @@
+"""
+Array-backed SBRE engine (LEADERSHIP_ENGINE=array, needs numpy).
+
+The pool is compiled once into NumPy arrays shared by every session:
+option weights as a (questions x options x traits) tensor and, per trait,
+an index array of its question rows (np.flatnonzero). A session then holds
+only a 4-float score vector and a bool array of asked rows, so selection
+and scoring are a few array operations instead of dict/list rebuilds:
+picking an unasked question on a trait is one fancy-index over the trait's
+rows plus a direct random index into the result. The per-session
+score vector is a plain list: at four traits a NumPy call costs more than
+the arithmetic it would replace.
+
+Random draws go through `random` in the same order as SBREEngine, so with
+the same seed both engines pick the same questions and produce identical
+results (benchmarks/engine_benchmark.py checks this).
+"""
+
+import random
+import sys
+import threading
+from weakref import WeakKeyDictionary
+from utils.constant import TRAITS
+from utils.utils import feedback
+from logic.engine import SBREEngine
+from logic.question_pool import question_pool_version
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("LEADERSHIP_ENGINE=array requires numpy (pip install numpy).") from e
+
+EPS = 1e-6
+N_TRAITS = len(TRAITS)
+
+
+class PoolArrays:
+    """Read-only array view of one QuestionPool version."""
+
+    def __init__(self, pool):
+        self.ids = pool.ids
+        self.row_of = pool.row_of
+        n = len(self.ids)
+
+        # weights[row, option, trait]; missing options/traits stay 0. A compiled pool ships it prebuilt
+        if pool.weights is not None:
+            self.weights = pool.weights
+        else:
+            questions = pool.questions
+            self.weights = np.zeros((n, max(pool.option_counts, default=0), N_TRAITS), dtype=np.float64)
+            for i, q in enumerate(questions):
+                for j, o in enumerate(q.get("options", [])):
+                    w = o.get("weights", {})
+                    self.weights[i, j] = [float(w.get(t, 0)) for t in TRAITS]
+        self.option_counts = pool.option_counts
+        self._option_rows = [None] * n
+
+        # trait_rows[k]: rows of TRAITS[k]'s questions, in pool order
+        codes = np.asarray(pool.trait_codes, dtype=np.int64)
+        self.trait_rows = [np.flatnonzero(codes == k) for k in range(N_TRAITS)]
+        self.size = n
+
+        self.per_trait_max = tuple(float(pool.per_trait_max[t]) for t in TRAITS)
+
+    def option_rows(self, row):
+        """A question's real options as weight tuples, for the per-answer prefetch look-ahead."""
+        rows = self._option_rows[row]
+        if rows is None:
+            rows = self._option_rows[row] = tuple(map(tuple, self.weights[row, :self.option_counts[row]].tolist()))
+        return rows
+
+
+_arrays = WeakKeyDictionary()
+_arrays_lock = threading.Lock()
+
+
+def pool_arrays(pool):
+    """Compiles `pool` on first use; later calls (from any session) reuse the result."""
+    arrays = _arrays.get(pool)
+    if arrays is None:
+        with _arrays_lock:
+            arrays = _arrays.get(pool)
+            if arrays is None:
+                arrays = _arrays[pool] = PoolArrays(pool)
+    return arrays
+
+
+class ArraySBREEngine(SBREEngine):
+    """SBREEngine with its per-session state held in arrays."""
+
+    __slots__ = ("arrays", "scores", "asked", "_asked_count")
+
+    def __init__(self, al_stream, career, total_questions=12, session_id=None, strategy=None):
+        super().__init__(al_stream, career, total_questions, session_id=session_id, strategy=strategy)
+        self._init_arrays()
+
+    def _init_arrays(self):
+        self.arrays = pool_arrays(self.pool)
+        self.scores = [0.0] * N_TRAITS
+        self.asked = np.zeros(self.arrays.size, dtype=bool)
+        self._asked_count = 0
+        # the dict engine's fields are not used
+        self.trait_scores = None
+        self.asked_ids = None
+
+    @property
+    def asked_count(self):
+        return self._asked_count
+
+    def _is_asked(self, question_id):
+        return bool(self.asked[self.arrays.row_of[question_id]])
+
+    def _mark_asked(self, question_id):
+        row = self.arrays.row_of[question_id]
+        if not self.asked[row]:
+            self.asked[row] = True
+            self._asked_count += 1
+
+    def asked_question_ids(self):
+        ids = self.arrays.ids
+        return [ids[i] for i in np.flatnonzero(self.asked).tolist()]
+
+    def _unasked(self):
+        questions = self.questions
+        return [questions[i] for i in np.flatnonzero(~self.asked).tolist()]
+
+    def _pick_unasked(self, trait):
+        if trait not in TRAITS:
+            return None
+        rows = self.arrays.trait_rows[TRAITS.index(trait)]
+        free = rows[~self.asked[rows]]
+        if not len(free):
+            return None
+        # free rows are in pool order, so this is what random.choice() picks from the filtered list
+        return self.questions[int(free[random.randrange(len(free))])]
+
+    def _next_trait(self):
+        if not self._asked_count:
+            return self.get_next_trait(first=True)
+        low = min(self.scores)
+        return TRAITS[random.choice([k for k, v in enumerate(self.scores) if v == low])]
+
+    def get_next_trait(self, first=False):
+        if first: return random.choice(TRAITS)
+        inv = [1.0 / (v + EPS) for v in self.scores]
+        total = sum(inv) or 1.0
+        return random.choices(TRAITS, weights=[x / total for x in inv], k=1)[0]
+
+    def _likely_next_traits(self, question):
+        # weakest trait after each option: (options x traits) scores, min per row
+        row = self.arrays.row_of.get(question["id"])
+        if row is None:
+            return set(TRAITS)
+        traits = set()
+        for w in self.arrays.option_rows(row):
+            after = [s + x for s, x in zip(self.scores, w)]
+            low = min(after)
+            traits.update(TRAITS[k] for k, v in enumerate(after) if v == low)
+        return traits or set(TRAITS)
+
+    def evaluate_response(self, weights):
+        if self._obs is not None:
+            self._observe(weights, self._obs)
+        s = self.scores
+        for k, t in enumerate(TRAITS):
+            if t in weights:
+                s[k] += float(weights[t])
+
+    def evaluate_final_results(self):
+        scale = self._score_scale()
+        results = {t: int(round((s * scale / m) * 10))
+                   for t, s, m in zip(TRAITS, self.scores, self.arrays.per_trait_max)}
+        overall = int(round(sum(results.values()) / len(TRAITS)))
+        level, fb = feedback(overall * 10, {k: v * 10 for k, v in results.items()})
+        return {
+            "decision_making": results["DM"],
+            "empathy": results["EC"],
+            "conflict_management": results["CM"],
+            "strategic_thinking": results["ST"],
+            "overall_score": overall,
+            "leadership_level": level,
+            "feedback": fb
+        }
+
+    def approx_bytes(self):
+        size = sys.getsizeof(self) + sys.getsizeof(self.al_stream) + sys.getsizeof(self.career)
+        size += sys.getsizeof(self.scores) + sys.getsizeof(self.asked) + sys.getsizeof(self._planned)
+        return size
+
+    def to_state(self):
+        """Same compact format as SBREEngine.to_state(), so the two are interchangeable."""
+        return {
+            "s": self.al_stream,
+            "c": self.career,
+            "n": self.total_questions,
+            "ts": list(self.scores),
+            "a": self.asked_question_ids(),
+            "p": self._planned,
+            "st": self.strategy,
+            "q": self._current,
+            "o": self._obs,
+            "pv": self.pool.mtime,
+        }
+
+    @classmethod
+    def from_state(cls, session_id, state):
+        engine = cls.__new__(cls)
+        engine.session_id = session_id
+        engine.al_stream = state["s"]
+        engine.career = state["c"]
+        engine.total_questions = state["n"]
+        engine.pool = question_pool_version(state.get("pv"))
+        engine._planned = dict(state.get("p") or {})
+        engine._restore_selection(state)
+        engine._init_arrays()
+        engine.scores[:] = map(float, state["ts"])
+        rows = {engine.arrays.row_of[qid] for qid in state["a"] if qid in engine.arrays.row_of}
+        engine.asked[list(rows)] = True
+        engine._asked_count = len(rows)
+        return engine
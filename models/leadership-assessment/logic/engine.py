@@ -1,54 +1,323 @@
+import os
+import math
 import random
+import asyncio
+import sys
+from collections import OrderedDict
 from utils.constant import TRAITS
 from utils.utils import inverse_weight_probs, feedback
-from utils.loader import load_question_pool
-from utils.personalization import personalize_scenario
-import os
+from utils.personalization import personalize_scenario, apersonalize_scenario
+from logic.question_pool import get_question_pool, question_pool_version
+from uuid import uuid4
+
+# session_id -> {question_id: personalization task}. Kept outside the engine so
+# prefetches survive engines being rebuilt from an external session backend.
+_PREFETCH = OrderedDict()
+PREFETCH_MAX_SESSIONS = 10000
+
+# LEADERSHIP_SELECTION=weakest asks a random question on the weakest trait for all
+# total_questions; =info asks the question that best separates respondents on the
+# least certain traits and stops once every trait's standard error <= LEADERSHIP_STOP_SE
+SELECTION_STRATEGY = os.getenv("LEADERSHIP_SELECTION", "weakest").strip().lower()
+MIN_QUESTIONS = int(os.getenv("LEADERSHIP_MIN_QUESTIONS", "6"))
+STOP_SE = float(os.getenv("LEADERSHIP_STOP_SE", "0.05"))
+
+
+def cancel_session_prefetch(session_id):
+    """Cancels a session's pending prefetches in this process (session ended or expired)."""
+    for task in _PREFETCH.pop(session_id, {}).values():
+        task.cancel()
 
-QUESTION_POOL_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "questions", "question_pool.json")
 
 class SBREEngine:
+    # Per-session state only; the question pool is shared process-wide
+    __slots__ = ("session_id", "al_stream", "career", "total_questions", "pool", "trait_scores", "asked_ids",
+                 "_planned", "strategy", "_current", "_obs")
+
+    def _next_trait(self):
+        if not self.asked_count:
+            return self.get_next_trait(first=True)
+        min_score = min(self.trait_scores.values())
+        weakest_traits = [t for t, v in self.trait_scores.items() if v == min_score]
+        return random.choice(weakest_traits)
+
+    def _select_next(self, prefer=()):
+        if self.strategy == "info":
+            return self.select_informative(prefer)
+        return self.select_question(self._next_trait())
 
     def get_next_adaptive_question(self):
-        if not self.asked_ids:
-            trait = self.get_next_trait(first=True)
-        else:
-            min_score = min(self.trait_scores.values())
-            weakest_traits = [t for t, v in self.trait_scores.items() if v == min_score]
-            trait = random.choice(weakest_traits)
-        q = self.select_question(trait)
+        q = self._select_next()
         if q:
-            q["scenario"] = personalize_scenario(q["scenario"], self.al_stream, self.career)
+            q["scenario"] = personalize_scenario(q["scenario"], self.al_stream, self.career, question_id=q["id"])
+        return q
+
+    async def aget_next_adaptive_question(self):
+        """
+        Async variant of get_next_adaptive_question(). Uses the personalization
+        prefetched while the previous question was on screen when the pick was
+        predicted, cancels the other prefetches, then starts prefetching for
+        the question being returned.
+        """
+        return await self.apersonalize_next(self.select_next_question())
+
+    def select_next_question(self):
+        """Picks (and marks asked) the next question, preferring prefetched picks; None when none is left."""
+        return self._select_next(prefer=_PREFETCH.get(self.session_id, ()))
+
+    async def apersonalize_next(self, q):
+        """Personalizes a select_next_question() pick and starts prefetching for the one after it."""
+        if not q:
+            self.cancel_prefetch()
+            return None
+
+        task = _PREFETCH.get(self.session_id, {}).pop(q["id"], None)
+        self.cancel_prefetch()
+        scenario = await self._prefetched(task) if task is not None else None
+        if scenario is None:
+            scenario = await apersonalize_scenario(q["scenario"], self.al_stream, self.career, question_id=q["id"])
+        q["scenario"] = scenario
+        self._start_prefetch(q)
         return q
 
-    def __init__(self, al_stream, career, total_questions=12):
+    @staticmethod
+    async def _prefetched(task):
+        """Result of a prefetch task, or None if it was cancelled or failed (the caller personalizes inline)."""
+        try:
+            # Shielded so a cancelled prefetch (PREFETCH_MAX_SESSIONS overflow, session
+            # close) can be told apart from this request being cancelled
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                task.cancel()
+                raise
+            return None
+        except Exception:
+            return None
+
+    def _likely_next_traits(self, question):
+        # The next trait is the weakest after this answer; try each option's weights
+        traits = set()
+        for o in question.get("options", []):
+            w = o.get("weights", {})
+            scores = {t: v + float(w.get(t, 0)) for t, v in self.trait_scores.items()}
+            low = min(scores.values())
+            traits.update(t for t, v in scores.items() if v == low)
+        return traits or set(TRAITS)
+
+    def _start_prefetch(self, question):
+        if self.asked_count >= self.total_questions:
+            return
+        tasks = _PREFETCH.setdefault(self.session_id, {})
+        _PREFETCH.move_to_end(self.session_id)
+        while len(_PREFETCH) > PREFETCH_MAX_SESSIONS:
+            for task in _PREFETCH.popitem(last=False)[1].values():
+                task.cancel()
+        if self.strategy == "info":
+            candidates = self._likely_next_questions(question)
+        else:
+            candidates = []
+            for trait in self._likely_next_traits(question):
+                candidate = self._pick_unasked(trait)
+                if candidate is None: continue
+                self._planned[trait] = candidate["id"]
+                candidates.append(candidate)
+        for candidate in candidates:
+            if candidate["id"] in tasks: continue
+            tasks[candidate["id"]] = asyncio.create_task(apersonalize_scenario(
+                candidate["scenario"], self.al_stream, self.career, question_id=candidate["id"]
+            ))
+
+    def share_plan(self, other):
+        """Copies this engine's prefetch plan onto `other`, a fresher copy of the same session; returns other."""
+        other._planned = dict(self._planned)
+        return other
+
+    def approx_bytes(self):
+        """Memory held by this session's own state (the shared pool is not counted)."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.al_stream) + sys.getsizeof(self.career)
+        size += sys.getsizeof(self.trait_scores) + sys.getsizeof(self.asked_ids)
+        size += sum(sys.getsizeof(i) for i in self.asked_ids)
+        size += sys.getsizeof(self._planned)
+        return size
+
+    def cancel_prefetch(self):
+        """Drops pending prefetches (call when the session ends)."""
+        cancel_session_prefetch(self.session_id)
+        self._planned.clear()
+
+    def to_state(self):
+        """Compact, JSON-serializable session state (IDs and scores only)."""
+        return {
+            "s": self.al_stream,
+            "c": self.career,
+            "n": self.total_questions,
+            "ts": [self.trait_scores[t] for t in TRAITS],
+            "a": list(self.asked_ids),
+            "p": self._planned,
+            "st": self.strategy,
+            "q": self._current,
+            "o": self._obs,
+            "pv": self.pool.mtime,
+        }
+
+    @classmethod
+    def from_state(cls, session_id, state):
+        """Rebuilds an engine from to_state() output against the pool version the session started on."""
+        engine = cls.__new__(cls)
+        engine.session_id = session_id
+        engine.al_stream = state["s"]
+        engine.career = state["c"]
+        engine.total_questions = state["n"]
+        engine.pool = question_pool_version(state.get("pv"))
+        engine.trait_scores = dict(zip(TRAITS, state["ts"]))
+        engine.asked_ids = set(state["a"])
+        engine._planned = dict(state.get("p") or {})
+        engine._restore_selection(state)
+        return engine
+
+    def _restore_selection(self, state):
+        self.strategy = state.get("st", "weakest")
+        self._current = state.get("q")
+        self._obs = [list(o) for o in state["o"]] if state.get("o") else None
+        if self._obs is None and self.strategy == "info":
+            self._obs = self._fresh_obs()
+
+    @staticmethod
+    def _fresh_obs():
+        return [[0, 0.0, 0.0] for _ in TRAITS]
+
+    def __init__(self, al_stream, career, total_questions=12, session_id=None, strategy=None):
+        self.session_id = session_id or uuid4().hex
         self.al_stream = al_stream
         self.career = career
         self.total_questions = total_questions
 
-        print(f"Loading questions from: {QUESTION_POOL_FILE}")
-        self.questions = load_question_pool(QUESTION_POOL_FILE)
-        print(f"Loaded {len(self.questions)} validated questions.")
+        # Pinned for the whole session so a pool reload can't change scoring mid-quiz;
+        # sessions in a session backend re-pin by version (falling back to the current
+        # pool on a worker that never loaded theirs)
+        self.pool = get_question_pool()
         self.trait_scores = {t: 0.0 for t in TRAITS}
         self.asked_ids = set()
+        # trait -> question id picked ahead of time (its personalization is prefetched)
+        self._planned = {}
+        self.strategy = (strategy or SELECTION_STRATEGY).lower()
+        if self.strategy not in ("weakest", "info"):
+            raise ValueError(f"Unknown LEADERSHIP_SELECTION '{self.strategy}' (expected weakest or info).")
+        # question on screen, and (info only) per trait [answers, sum, sum of squares] of answer / best option
+        self._current = None
+        self._obs = self._fresh_obs() if self.strategy == "info" else None
 
-        # Group by trait
-        self.by_trait = {t: [q for q in self.questions if q["trait"] == t] for t in TRAITS}
-        self.per_trait_max = self._compute_per_trait_max()
+    @property
+    def questions(self):
+        return self.pool.questions
+
+    @property
+    def by_trait(self):
+        return self.pool.by_trait
+
+    @property
+    def per_trait_max(self):
+        return self.pool.per_trait_max
 
     def get_next_trait(self, first=False):
         if first: return random.choice(TRAITS)
         probs = inverse_weight_probs(self.trait_scores)
         return random.choices(TRAITS, weights=probs, k=1)[0]
 
-    def select_question(self, trait):
+    @property
+    def asked_count(self):
+        return len(self.asked_ids)
+
+    def _is_asked(self, question_id):
+        return question_id in self.asked_ids
+
+    def _mark_asked(self, question_id):
+        self.asked_ids.add(question_id)
+
+    def _pick_unasked(self, trait):
         pool = [q for q in self.by_trait.get(trait, []) if q["id"] not in self.asked_ids]
-        if not pool: return None
-        q = random.choice(pool)
-        self.asked_ids.add(q["id"])
+        return random.choice(pool) if pool else None
+
+    def select_question(self, trait):
+        planned = self._planned.pop(trait, None)
+        if planned is not None and planned in self.pool.by_id and not self._is_asked(planned):
+            q = self.pool.by_id[planned]
+        else:
+            q = self._pick_unasked(trait)
+            if q is None: return None
+        self._mark_asked(q["id"])
+        self._current = q["id"]
         return dict(q)
 
+    def _unasked(self):
+        return [q for q in self.questions if q["id"] not in self.asked_ids]
+
+    def trait_uncertainty(self, obs=None):
+        """Standard error of each trait's estimate (answer weight / best option weight, 0..1)."""
+        se = []
+        for n, s1, s2 in obs or self._obs:
+            if n < 2:
+                se.append(1.0)
+                continue
+            var = max(s2 - s1 * s1 / n, 0.0) / (n - 1)
+            se.append(math.sqrt(var / n))
+        return se
+
+    def _observe(self, weights, obs, question_id=None):
+        profile = self.pool.profiles.get(question_id or self._current)
+        if profile is None:
+            return obs
+        for k, t in enumerate(TRAITS):
+            top = profile[0][k]
+            if top > 0 and t in weights:
+                x = float(weights[t]) / top
+                o = obs[k]
+                o[0] += 1
+                o[1] += x
+                o[2] += x * x
+        return obs
+
+    def _most_informative(self, uncertainty, prefer=()):
+        # the unasked question whose options spread furthest on the uncertain traits
+        best, best_score = [], -1.0
+        for q in self._unasked():
+            score = sum(u * d for u, d in zip(uncertainty, self.pool.profiles[q["id"]][1]))
+            if score > best_score:
+                best, best_score = [q], score
+            elif score == best_score:
+                best.append(q)
+        if not best:
+            return None
+        return random.choice([q for q in best if q["id"] in prefer] or best)
+
+    def select_informative(self, prefer=()):
+        """Information-based pick; on ties, questions in `prefer` (already prefetched) win."""
+        q = self._most_informative(self.trait_uncertainty(), prefer)
+        if q is None: return None
+        self._mark_asked(q["id"])
+        self._current = q["id"]
+        return dict(q)
+
+    def _likely_next_questions(self, question):
+        # the informative pick after each possible answer to `question`
+        picks = {}
+        for o in question.get("options", []):
+            obs = self._observe(o.get("weights", {}), [list(x) for x in self._obs], question["id"])
+            q = self._most_informative(self.trait_uncertainty(obs))
+            if q is not None:
+                picks[q["id"]] = q
+        return list(picks.values())
+
+    def should_stop(self):
+        """True once the info strategy is confident enough to end before total_questions."""
+        if self.strategy != "info" or self.asked_count < MIN_QUESTIONS:
+            return False
+        return max(self.trait_uncertainty()) <= STOP_SE
+
     def evaluate_response(self, weights):
+        if self._obs is not None:
+            self._observe(weights, self._obs)
         for t, v in weights.items():
             if t in self.trait_scores:
                 self.trait_scores[t] += float(v)
@@ -59,15 +328,21 @@ class SBREEngine:
             trait = self.get_next_trait(first=(i == 0))
             q = self.select_question(trait)
             if not q: continue
-            q["scenario"] = personalize_scenario(q["scenario"], self.al_stream, self.career)
+            q["scenario"] = personalize_scenario(q["scenario"], self.al_stream, self.career, question_id=q["id"])
             quiz.append(q)
         return quiz
 
+    def _score_scale(self):
+        # a session that stopped early is scored as if it had run to total_questions
+        n = self.asked_count
+        return self.total_questions / n if 0 < n < self.total_questions else 1.0
+
     def evaluate_final_results(self):
         results = {}
+        scale = self._score_scale()
         for t in TRAITS:
             max_t = self.per_trait_max.get(t, 10 * self.total_questions)
-            results[t] = int(round((self.trait_scores[t] / max_t) * 10))
+            results[t] = int(round((self.trait_scores[t] * scale / max_t) * 10))
         overall = int(round(sum(results.values()) / len(TRAITS)))
         level, fb = feedback(overall * 10, {k: v * 10 for k, v in results.items()})  
         return {
@@ -80,16 +355,16 @@ class SBREEngine:
             "feedback": fb
         }
 
-    def _compute_per_trait_max(self):
-        per = {t: 0 for t in TRAITS}
-        for q in self.questions:
-            opts = q.get("options", [])
-            max_per_trait = {t: 0 for t in TRAITS}
-            for o in opts:
-                w = o.get("weights", {})
-                for t in TRAITS:
-                    val = w.get(t, 0)
-                    if val > max_per_trait[t]: max_per_trait[t] = val
-            for t in TRAITS:
-                per[t] += max_per_trait[t]
-        return per
+
+# LEADERSHIP_ENGINE=array serves sessions from NumPy arrays (logic/array_engine.py)
+ENGINE_MODE = os.getenv("LEADERSHIP_ENGINE", "dict").strip().lower()
+
+
+def engine_class(mode=None):
+    mode = (mode or ENGINE_MODE).lower()
+    if mode == "array":
+        from logic.array_engine import ArraySBREEngine
+        return ArraySBREEngine
+    if mode != "dict":
+        raise ValueError(f"Unknown LEADERSHIP_ENGINE '{mode}' (expected dict or array).")
+    return SBREEngine
@@ -0,0 +1,252 @@
+import os
+import json
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
+from utils.constant import TRAITS
+from utils.loader import load_question_pool, load_compiled_pool, compiled_path
+
+QUESTION_POOL_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "questions", "question_pool.json")
+
+
+class QuestionPool:
+    """
+    Validated question pool shared by every session in the process.
+
+    Built once per file version and never mutated afterwards; engines copy a
+    question before personalizing it.
+    """
+
+    def __init__(self, questions, mtime=None):
+        self.questions = tuple(questions)
+        self.mtime = mtime
+        self.ids = [q["id"] for q in self.questions]
+        self.row_of = {qid: i for i, qid in enumerate(self.ids)}
+        self.trait_codes = [TRAITS.index(q["trait"]) for q in self.questions]
+        self.option_counts = [len(q.get("options", [])) for q in self.questions]
+        self.by_id = MappingProxyType({q["id"]: q for q in self.questions})
+        self.by_trait = MappingProxyType({t: tuple(q for q in self.questions if q["trait"] == t) for t in TRAITS})
+        self.per_trait_max = MappingProxyType(self._compute_per_trait_max())
+        # id -> (best option weight per trait, spread of option weights / best per trait)
+        self.profiles = MappingProxyType({q["id"]: _profile(q) for q in self.questions})
+        # (questions x options x traits) ndarray; only compiled pools ship one
+        self.weights = None
+
+    @classmethod
+    def from_compiled(cls, parts, mtime=None):
+        """
+        Pool over load_compiled_pool() output. Nothing is validated or derived
+        per question: stats come precomputed and each question dict is decoded
+        from its record the first time it is read.
+        """
+        import numpy as np
+
+        pool = cls.__new__(cls)
+        codes = parts["traits"]
+        pool.questions = _CompiledQuestions(parts["ids"], codes.tolist(), parts["records"], parts["offsets"])
+        pool.mtime = mtime
+        pool.ids = parts["ids"]
+        pool.row_of = {qid: i for i, qid in enumerate(pool.ids)}
+        pool.trait_codes = pool.questions.trait_codes
+        pool.option_counts = parts["option_counts"]
+        pool.by_id = _QuestionsById(pool.questions, pool.row_of)
+        pool.by_trait = MappingProxyType({
+            t: _QuestionRows(pool.questions, np.flatnonzero(codes == k).tolist()) for k, t in enumerate(TRAITS)
+        })
+        pool.per_trait_max = MappingProxyType(parts["per_trait_max"])
+        pool.profiles = _Profiles(pool.row_of, parts["tops"], parts["spreads"])
+        pool.weights = parts["weights"]
+        return pool
+
+    def __len__(self):
+        return len(self.questions)
+
+    def _compute_per_trait_max(self):
+        per = {t: 0 for t in TRAITS}
+        for q in self.questions:
+            opts = q.get("options", [])
+            max_per_trait = {t: 0 for t in TRAITS}
+            for o in opts:
+                w = o.get("weights", {})
+                for t in TRAITS:
+                    val = w.get(t, 0)
+                    if val > max_per_trait[t]: max_per_trait[t] = val
+            for t in TRAITS:
+                per[t] += max_per_trait[t]
+        return per
+
+
+class _CompiledQuestions(Sequence):
+    # Question dicts of a compiled pool, decoded from their JSON records on first access
+    __slots__ = ("_ids", "trait_codes", "_records", "_offsets", "_decoded")
+
+    def __init__(self, ids, trait_codes, records, offsets):
+        self._ids = ids
+        self.trait_codes = trait_codes
+        self._records = records
+        self._offsets = offsets
+        self._decoded = [None] * len(ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self[j] for j in range(*i.indices(len(self))))
+        if i < 0:
+            i += len(self._ids)
+        q = self._decoded[i]
+        if q is None:
+            scenario, options = json.loads(self._records[self._offsets[i]:self._offsets[i + 1]])
+            q = self._decoded[i] = {
+                "id": self._ids[i], "scenario": scenario, "trait": TRAITS[self.trait_codes[i]], "options": options
+            }
+        return q
+
+
+class _QuestionRows(Sequence):
+    __slots__ = ("_questions", "_rows")
+
+    def __init__(self, questions, rows):
+        self._questions = questions
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self._questions[r] for r in self._rows[i])
+        return self._questions[self._rows[i]]
+
+
+class _QuestionsById(Mapping):
+    __slots__ = ("_questions", "_row_of")
+
+    def __init__(self, questions, row_of):
+        self._questions = questions
+        self._row_of = row_of
+
+    def __getitem__(self, qid):
+        return self._questions[self._row_of[qid]]
+
+    def __contains__(self, qid):
+        return qid in self._row_of
+
+    def __iter__(self):
+        return iter(self._row_of)
+
+    def __len__(self):
+        return len(self._row_of)
+
+
+class _Profiles(Mapping):
+    # id -> (tops, spreads) tuples, converted from the compiled arrays on first access
+    __slots__ = ("_row_of", "_tops", "_spreads", "_cache")
+
+    def __init__(self, row_of, tops, spreads):
+        self._row_of = row_of
+        self._tops = tops
+        self._spreads = spreads
+        self._cache = {}
+
+    def __getitem__(self, qid):
+        profile = self._cache.get(qid)
+        if profile is None:
+            row = self._row_of[qid]
+            profile = self._cache[qid] = (tuple(self._tops[row].tolist()), tuple(self._spreads[row].tolist()))
+        return profile
+
+    def __contains__(self, qid):
+        return qid in self._row_of
+
+    def __iter__(self):
+        return iter(self._row_of)
+
+    def __len__(self):
+        return len(self._row_of)
+
+
+def _profile(q):
+    # how far apart a question's options are on each trait; 0 means it can't tell respondents apart
+    tops, spreads = [], []
+    for t in TRAITS:
+        vals = [float(o.get("weights", {}).get(t, 0)) for o in q.get("options", [])]
+        top = max(vals, default=0.0)
+        tops.append(top)
+        if top > 0 and len(vals) > 1:
+            ratios = [v / top for v in vals]
+            mean = sum(ratios) / len(ratios)
+            spreads.append(math.sqrt(sum((r - mean) ** 2 for r in ratios) / len(ratios)))
+        else:
+            spreads.append(0.0)
+    return tuple(tops), tuple(spreads)
+
+
+_pool = None
+# mtime of a file version that failed to load, so it isn't re-parsed on every call
+_rejected_mtime = None
+_pool_lock = threading.Lock()
+# Recently replaced pools by mtime, so sessions rebuilt from a session backend
+# keep the pool they started on after a reload (see question_pool_version)
+POOL_VERSIONS_KEPT = 3
+_previous = OrderedDict()
+
+
+def _file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load(path, mtime):
+    # compile_question_pool.py output if present and built from this file, else the JSON
+    compiled = load_compiled_pool(compiled_path(path), source_path=path)
+    if compiled is not None:
+        print(f"Loaded compiled questions from: {compiled_path(path)}")
+        return QuestionPool.from_compiled(compiled, mtime)
+    print(f"Loading questions from: {path}")
+    questions = load_question_pool(path)
+    return QuestionPool(questions, mtime) if questions else None
+
+
+def get_question_pool(path=QUESTION_POOL_FILE):
+    """
+    Returns the shared pool, (re)loading it only when the file's mtime changes.
+    A reload that yields no valid questions keeps serving the previous pool.
+    """
+    global _pool, _rejected_mtime
+    mtime = _file_mtime(path)
+    pool = _pool
+    if pool is not None and mtime in (pool.mtime, _rejected_mtime):
+        return pool
+
+    with _pool_lock:
+        if _pool is not None and mtime in (_pool.mtime, _rejected_mtime):
+            return _pool
+        pool = _load(path, mtime)
+        if pool is None and _pool is not None:
+            print("Reload produced no valid questions; keeping the previous pool.")
+            _rejected_mtime = mtime
+            return _pool
+        if _pool is not None:
+            _previous[_pool.mtime] = _pool
+            while len(_previous) > POOL_VERSIONS_KEPT:
+                _previous.popitem(last=False)
+        _pool = pool or QuestionPool([], mtime)
+        print(f"Loaded {len(_pool)} validated questions.")
+        return _pool
+
+
+def question_pool_version(mtime, path=QUESTION_POOL_FILE):
+    """
+    The pool loaded from the file version `mtime` if this process still holds
+    it, else the current pool (e.g. a worker started after the reload).
+    """
+    pool = get_question_pool(path)
+    if mtime is None or mtime == pool.mtime:
+        return pool
+    return _previous.get(mtime, pool)
@@ -0,0 +1,136 @@
+"""
+Session backend contract tests (memory, SQLite, Redis via fakeredis).
+
+utils/session_backend.py is copied into all three services (see
+models/sync_shared_utils.py), so it is tested once, here. Run from the
+service directory:
+    python -m pytest tests
+"""
+
+import threading
+import time
+
+import pytest
+
+from utils.session_backend import (
+    MemorySessionBackend, RedisSessionBackend, SQLiteSessionBackend, make_session_backend
+)
+
+TTL = 0.2
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = MemorySessionBackend(ttl=TTL)
+    elif request.param == "sqlite":
+        backend = SQLiteSessionBackend(tmp_path / "sessions.sqlite3", ttl=TTL)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("redis")
+        backend = RedisSessionBackend(ttl=TTL, namespace="test:session", client=fakeredis.FakeRedis())
+    yield backend
+    backend.close()
+
+
+def _expire():
+    time.sleep(TTL * 1.5)
+
+
+def test_put_get_delete(backend):
+    backend.put("s1", {"q": [1, 2], "a": []})
+    assert backend.get("s1") == {"q": [1, 2], "a": []}
+    assert backend.get("missing") is None
+    assert backend.delete("s1") is True
+    assert backend.delete("s1") is False
+    assert backend.get("s1") is None
+
+
+def test_update_applies_mutation(backend):
+    backend.put("s1", {"a": []})
+
+    def record(state):
+        state["a"].append("x")
+        return state
+
+    assert backend.update("s1", record) == {"a": ["x"]}
+    assert backend.get("s1") == {"a": ["x"]}
+    # None from mutate leaves the session untouched
+    assert backend.update("s1", lambda state: None) == {"a": ["x"]}
+    assert backend.update("missing", record) is None
+    assert backend.get("missing") is None
+
+
+def test_concurrent_updates_are_not_lost(backend):
+    backend.put("s1", {"n": 0})
+
+    def bump(state):
+        state["n"] += 1
+        return state
+
+    def worker():
+        for _ in range(25):
+            backend.update("s1", bump)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert backend.get("s1") == {"n": 100}
+
+
+def test_count_and_live(backend):
+    for i in range(3):
+        backend.put(f"s{i}", {"i": i})
+    backend.delete("s1")
+    assert backend.count() == 2
+    assert backend.live(["s0", "s1", "s2", "missing"]) == {"s0", "s2"}
+
+
+def test_ttl_expiry_and_sweep(backend):
+    backend.put("old", {})
+    _expire()
+    backend.put("new", {})
+    assert backend.get("old") is None
+    assert backend.live(["old", "new"]) == {"new"}
+    backend.sweep()
+    assert backend.count() == 1
+
+
+def test_writes_refresh_ttl(backend):
+    backend.put("s1", {"n": 0})
+    time.sleep(TTL * 0.6)
+    backend.update("s1", lambda state: {"n": 1})
+    time.sleep(TTL * 0.6)
+    assert backend.get("s1") == {"n": 1}
+
+
+def test_redis_index_tracks_sessions_without_scanning(tmp_path):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("redis")
+    client = fakeredis.FakeRedis()
+    backend = RedisSessionBackend(ttl=TTL, namespace="test:session", client=client)
+    backend.put("a", {})
+    backend.put("b", {})
+    backend.delete("b")
+    assert client.zcard(backend.index) == 1
+
+    _expire()
+    assert backend.count() == 0
+    assert backend.sweep() == 1
+    assert client.zcard(backend.index) == 0
+
+
+def test_memory_backend_caps_entries():
+    backend = MemorySessionBackend(ttl=60, max_entries=2)
+    for i in range(3):
+        backend.put(f"s{i}", {})
+    assert backend.get("s0") is None
+    assert backend.count() == 2
+
+
+def test_factory_rejects_unknown_backend():
+    assert make_session_backend("test", kind="memory").name == "memory"
+    with pytest.raises(ValueError):
+        make_session_backend("test", kind="mongo")
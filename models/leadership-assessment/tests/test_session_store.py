@@ -0,0 +1,107 @@
+"""
+SessionStore / BackendSessionStore: atomic update() and eviction hooks
+for sessions the backend expires on its own TTL.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.session_backend import MemorySessionBackend, RedisSessionBackend, SQLiteSessionBackend
+from utils.session_store import BackendSessionStore, SessionStore
+
+TTL = 0.2
+
+
+def _dumps(value):
+    return dict(value)
+
+
+def _loads(session_id, state):
+    return dict(state)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    evicted = []
+    if request.param == "memory":
+        backend = MemorySessionBackend(ttl=TTL)
+    elif request.param == "sqlite":
+        backend = SQLiteSessionBackend(tmp_path / "sessions.sqlite3", ttl=TTL)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("redis")
+        backend = RedisSessionBackend(ttl=TTL, namespace="test:session", client=fakeredis.FakeRedis())
+    store = BackendSessionStore(backend, _dumps, _loads, on_evict=evicted.append)
+    store.evicted = evicted
+    yield store
+    backend.close()
+
+
+def _answer(value):
+    value["answers"] = value.get("answers", 0) + 1
+    return value
+
+
+def test_update_is_stored(store):
+    store.put("s1", {"answers": 0})
+    assert store.update("s1", _answer) == {"answers": 1}
+    assert store.update("s1", _answer) == {"answers": 2}
+    assert store.get("s1") == {"answers": 2}
+    assert store.update("missing", _answer) is None
+
+
+def test_backend_expiry_fires_on_evict_from_sweep(store):
+    store.put("gone", {})
+    store.put("ended", {})
+    store.pop("ended")
+    time.sleep(TTL * 1.5)
+    store.put("kept", {})
+    store.sweep()
+    assert store.evicted == ["gone"]
+    store.sweep()
+    assert store.evicted == ["gone"]
+
+
+def test_backend_expiry_fires_on_evict_on_access(store):
+    store.put("gone", {})
+    time.sleep(TTL * 1.5)
+    assert store.get("gone") is None
+    assert store.evicted == ["gone"]
+
+
+def test_memory_store_update_and_ttl_eviction():
+    evicted = []
+    store = SessionStore(ttl=TTL, max_sessions=10, on_evict=evicted.append)
+    store.put("s1", {"answers": 0})
+    assert store.update("s1", _answer) == {"answers": 1}
+    assert store.get("s1") == {"answers": 1}
+    time.sleep(TTL * 1.5)
+    assert store.sweep() == 1
+    assert evicted == ["s1"]
+
+
+def test_async_calls_run_off_loop_and_evict_on_loop(store):
+    threads = []
+
+    def answer(value):
+        threads.append(threading.get_ident())
+        return _answer(value)
+
+    async def run():
+        store._on_evict = lambda session_id: (threads.append(threading.get_ident()), store.evicted.append(session_id))
+        await store.aput("s1", {"answers": 0})
+        assert await store.aupdate("s1", answer) == {"answers": 1}
+        await store.aput("gone", {})
+        await asyncio.sleep(TTL * 1.5)
+        await store.asweep()
+        await asyncio.sleep(0)
+        assert await store.apop("s1") is None
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert threads[0] != loop_thread
+    assert set(store.evicted) == {"gone", "s1"}
+    assert threads[1:] == [loop_thread, loop_thread]
@@ -16,6 +16,20 @@ STREAM_CONTEXTS = {
     "Other/Vocational": "community project"
 }
 
+# Careers precomputed by warm_personalization.py (others are personalized on first request)
+POPULAR_CAREERS = [
+    "Software Engineer",
+    "Data Scientist",
+    "Data Analyst",
+    "Doctor",
+    "Business Analyst",
+    "Accountant",
+    "Teacher",
+    "Graphic Designer",
+    "Civil Engineer",
+    "Marketing Manager",
+]
+
 # STYLE_PREFIXES = {
 #     "Analytical": "After analyzing the available data, ",
 #     "Collaborative": "After discussing with your teammates, ",
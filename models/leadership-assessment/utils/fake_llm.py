@@ -0,0 +1,186 @@
+"""
+Local stand-in for the OpenAI chat API used by the assessment services.
+
+Answers each call according to the system prompt of the caller
+(generator, logic verifier, Bloom classifier, career mapper, scenario
+personalizer) with schema-valid canned output, after an optional
+simulated latency. Can also inject API failures. Used to benchmark and
+load-test without network or API spend (see utils.llm_backend).
+
+Shared module: identical copies live in each service's utils/ (services
+run and ship independently); edit the analytical-assessment copy and run
+models/sync_shared_utils.py.
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+
+class FakeLLMError(Exception):
+    """Injected API failure (stands in for openai.APIError and friends)."""
+
+
+def _completion(content: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+    message = SimpleNamespace(content=content, role="assistant")
+    usage = SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+    )
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+
+def _approx_tokens(messages) -> int:
+    # ~4 characters per token is close enough for relative comparisons
+    return sum(len(m.get("content") or "") for m in messages or []) // 4
+
+
+class FakeLLM:
+    """
+    Deterministic responder shared by the sync and async clients below.
+
+    Args:
+        latency (float): seconds to wait per call
+        invalid_rate (float): fraction of logic verdicts that come back invalid
+        seed (int): RNG seed so runs are reproducible
+        jitter (float): extra uniform random latency, 0..jitter seconds
+        failure_rate (float): fraction of calls that raise FakeLLMError
+    """
+
+    def __init__(self, latency: float = 0.0, invalid_rate: float = 0.0, seed: int = 42,
+                 jitter: float = 0.0, failure_rate: float = 0.0):
+        self.latency = latency
+        self.invalid_rate = invalid_rate
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._serial = 0
+        # Sync clients are called from worker threads
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def complete(self, messages):
+        """Builds one completion for `messages`, or raises an injected failure."""
+        with self._lock:
+            if self.failure_rate and self.rng.random() < self.failure_rate:
+                self.calls += 1
+                self.failures += 1
+                raise FakeLLMError("Injected LLM failure.")
+            content = self.respond(messages or [])
+            prompt_tokens, completion_tokens = _approx_tokens(messages), len(content) // 4
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return _completion(content, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def respond(self, messages) -> str:
+        self.calls += 1
+        system = (messages[0].get("content") or "").lower() if messages else ""
+        user = messages[-1].get("content") or "" if messages else ""
+
+        if "adapting educational scenarios" in system:
+            return self._scenario(user)
+        if "question generator" in system:
+            return self._question(user)
+        if "verifier" in system and "bloom" in system:
+            return self._verdict(with_bloom=True)
+        if "verifier" in system:
+            return self._verdict()
+        if "bloom" in system:
+            return "Analyze"
+        if "map careers" in system:
+            return json.dumps(["data_interpretation", "pattern_recognition"])
+        return "{}"
+
+    def _question(self, user_prompt: str) -> str:
+        self._serial += 1
+        category = "data_interpretation"
+        for line in user_prompt.splitlines():
+            if line.strip().lower().startswith("category:"):
+                category = line.split(":", 1)[1].strip()
+                break
+        n = self._serial
+        options = [f"{n * 10}%", f"{n * 10 + 5}%", f"{n * 10 + 10}%", f"{n * 10 + 15}%"]
+        return json.dumps({
+            "question": "Which trend best explains the reported change in weekly throughput across both teams?",
+            "options": options,
+            "correct_answer": options[2],
+            "explanation": "The change follows from comparing both periods.",
+            "category": category,
+            "bloom_level": "Analyze",
+            "irt_difficulty": 0.5,
+        })
+
+    def _scenario(self, user_prompt: str) -> str:
+        # Keep the original wording so the personalizer's keyword-overlap check passes
+        base = user_prompt.split("Original scenario:", 1)[-1].strip()
+        career = re.search(r"aspiring to be a '([^']*)'", user_prompt)
+        return f"{base} (as a {career.group(1) if career else 'student'})"
+
+    def _verdict(self, with_bloom: bool = False) -> str:
+        valid = self.rng.random() >= self.invalid_rate
+        verdict = {
+            "is_valid": valid,
+            "reason": "Answer follows from the data." if valid else "Answer is not supported.",
+            "solution_steps": "Compare the two values and pick the consistent option.",
+        }
+        if with_bloom:
+            verdict["bloom_level"] = "Analyze"
+        return json.dumps(verdict)
+
+
+class _Completions:
+    def __init__(self, fake: FakeLLM):
+        self._fake = fake
+
+    def create(self, model=None, messages=None, **kwargs):
+        delay = self._fake.delay()
+        if delay:
+            time.sleep(delay)
+        return self._fake.complete(messages)
+
+
+class _AsyncCompletions:
+    def __init__(self, fake: FakeLLM):
+        self._fake = fake
+
+    async def create(self, model=None, messages=None, **kwargs):
+        delay = self._fake.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._fake.complete(messages)
+
+
+class FakeOpenAI:
+    """Drop-in for OpenAI exposing `chat.completions.create`."""
+
+    def __init__(self, latency: float = 0.0, invalid_rate: float = 0.0, seed: int = 42, fake: FakeLLM = None):
+        self.fake = fake or FakeLLM(latency=latency, invalid_rate=invalid_rate, seed=seed)
+        self.chat = SimpleNamespace(completions=_Completions(self.fake))
+
+    @property
+    def calls(self) -> int:
+        return self.fake.calls
+
+
+class FakeAsyncOpenAI:
+    """Drop-in for AsyncOpenAI exposing `chat.completions.create`."""
+
+    def __init__(self, latency: float = 0.0, invalid_rate: float = 0.0, seed: int = 42, fake: FakeLLM = None):
+        self.fake = fake or FakeLLM(latency=latency, invalid_rate=invalid_rate, seed=seed)
+        self.chat = SimpleNamespace(completions=_AsyncCompletions(self.fake))
+
+    @property
+    def calls(self) -> int:
+        return self.fake.calls
@@ -1,6 +1,10 @@
-import json, os
+import json, os, hashlib
+from utils.constant import TRAITS
 from utils.utils import normalize_category
 
+# bump when the layout written by save_compiled_pool() changes
+COMPILED_FORMAT = 1
+
 def load_question_pool(file_path: str):
     try:
         with open(file_path, "r", encoding="utf-8") as f:
@@ -66,3 +70,98 @@ def load_question_pool(file_path: str):
         })
     print(f"Validated {len(validated)} questions out of {len(raw) if isinstance(raw, list) else 0}.")
     return validated
+
+
+def compiled_path(file_path: str):
+    return os.path.splitext(file_path)[0] + ".npz"
+
+
+def file_sha256(file_path: str):
+    try:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def save_compiled_pool(out_path, questions, source_sha256, per_trait_max, profiles):
+    """
+    Writes validated questions as a .npz: option-weight tensor, trait codes,
+    option counts, per-question profiles, the ID list and each question's
+    [scenario, options] as a JSON record (with offsets), plus the hash of
+    the source JSON it was built from.
+    """
+    import numpy as np
+
+    n_options = max((len(q["options"]) for q in questions), default=0)
+    weights = np.zeros((len(questions), n_options, len(TRAITS)), dtype=np.float64)
+    for i, q in enumerate(questions):
+        for j, o in enumerate(q["options"]):
+            w = o.get("weights", {})
+            weights[i, j] = [float(w.get(t, 0)) for t in TRAITS]
+    records = [json.dumps([q["scenario"], q["options"]], separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+               for q in questions]
+    offsets = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum([len(r) for r in records], out=offsets[1:])
+    ids = json.dumps([q["id"] for q in questions], separators=(",", ":")).encode("utf-8")
+    meta = {
+        "format": COMPILED_FORMAT,
+        "source_sha256": source_sha256,
+        "traits": list(TRAITS),
+        "count": len(questions),
+        "per_trait_max": dict(per_trait_max),
+    }
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            meta=np.array(json.dumps(meta)),
+            ids=np.frombuffer(ids, dtype=np.uint8),
+            records=np.frombuffer(b"".join(records), dtype=np.uint8),
+            offsets=offsets,
+            traits=np.array([TRAITS.index(q["trait"]) for q in questions], dtype=np.uint8),
+            option_counts=np.array([len(q["options"]) for q in questions], dtype=np.uint8),
+            weights=weights,
+            tops=np.array([profiles[q["id"]][0] for q in questions], dtype=np.float64).reshape(-1, len(TRAITS)),
+            spreads=np.array([profiles[q["id"]][1] for q in questions], dtype=np.float64).reshape(-1, len(TRAITS)),
+        )
+    os.replace(tmp, out_path)
+
+
+def load_compiled_pool(file_path: str, source_path: str = None):
+    """
+    Reads an artifact written by save_compiled_pool() without re-validating
+    or decoding any question. Returns its parts as a dict, or None if it is
+    missing, unreadable, from another format version, or stale against
+    `source_path`.
+    """
+    if not os.path.exists(file_path):
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    try:
+        with np.load(file_path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != COMPILED_FORMAT or meta.get("traits") != list(TRAITS):
+                print(f"Compiled pool {file_path} has an old format; ignoring it.")
+                return None
+            if source_path and os.path.exists(source_path) and file_sha256(source_path) != meta["source_sha256"]:
+                print(f"Compiled pool {file_path} is stale (source changed); ignoring it.")
+                return None
+            return {
+                "ids": json.loads(data["ids"].tobytes()),
+                "records": data["records"].tobytes(),
+                "offsets": data["offsets"].tolist(),
+                "traits": data["traits"],
+                "option_counts": data["option_counts"].tolist(),
+                "weights": data["weights"],
+                "tops": data["tops"],
+                "spreads": data["spreads"],
+                "per_trait_max": meta["per_trait_max"],
+                "source_sha256": meta["source_sha256"],
+            }
+    except Exception as e:
+        print(json.dumps({"error": f"Failed to load compiled pool: {str(e)}"}))
+        return None
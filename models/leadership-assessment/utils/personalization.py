@@ -1,13 +1,36 @@
 import os
 from utils.constant import STREAM_CONTEXTS
-import openai
 from dotenv import load_dotenv
+from utils.llm_backend import make_client, make_async_client
+from utils.llm_client import chat_completion, achat_completion, record_failure
+from utils.personalization_cache import personalization_cache
 
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+_client = None
+_async_client = None
 
-def personalize_scenario(base, al_stream, career):
+
+def _get_client():
+    # Created on first use so the service still starts (with fallback scenarios) without a key
+    global _client
+    if _client is None:
+        _client = make_client()
+    return _client
+
+
+def _get_async_client():
+    global _async_client
+    if _async_client is None:
+        _async_client = make_async_client()
+    return _async_client
+
+
+def _fallback_scenario(base, al_stream, career):
     context = STREAM_CONTEXTS.get(al_stream, "team project")
+    return f"{base.replace('project', context)} as a {career}"
+
+
+def _messages(base, al_stream, career):
     prompt = (
         f"Personalize the following scenario for a student in the '{al_stream}' stream "
         f"who is aspiring to be a '{career}'. The core meaning and challenge of the scenario must remain unchanged, "
@@ -15,24 +38,80 @@ def personalize_scenario(base, al_stream, career):
         f"Do not add extra instructions or commentary. Only return the personalized scenario.\n\n"
         f"Original scenario: {base}"
     )
+    return [
+        {"role": "system", "content": "You are an expert at adapting educational scenarios to user backgrounds."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _checked(base, scenario):
+    if not validate_personalization(base, scenario):
+        record_failure("personalization.personalize_scenario", "validation")
+        return None
+    return scenario
+
+
+def generate_personalized_scenario(base, al_stream, career):
+    """LLM personalization only; returns None when the call fails or the output drifts from the original."""
+    try:
+        response = chat_completion(
+            _get_client(), "personalization.personalize_scenario",
+            model="gpt-3.5-turbo",
+            messages=_messages(base, al_stream, career),
+            max_tokens=120,
+            temperature=0.4,
+        )
+        scenario = response.choices[0].message.content.strip()
+    except Exception as e:
+        return None
+    return _checked(base, scenario)
+
+
+async def agenerate_personalized_scenario(base, al_stream, career):
+    """Async variant of generate_personalized_scenario()."""
     try:
-        response = openai.ChatCompletion.create(
+        response = await achat_completion(
+            _get_async_client(), "personalization.personalize_scenario",
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert at adapting educational scenarios to user backgrounds."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=_messages(base, al_stream, career),
             max_tokens=120,
             temperature=0.4,
         )
         scenario = response.choices[0].message.content.strip()
-        # If validation fails, fallback to basic personalization, but do not stop the quiz
-        if not validate_personalization(base, scenario):
-            scenario = f"{base.replace('project', context)} as a {career}"
-        return scenario
     except Exception as e:
-        # On error, fallback to basic personalization, but do not stop the quiz
-        return f"{base.replace('project', context)} as a {career}"
+        return None
+    return _checked(base, scenario)
+
+
+def personalize_scenario(base, al_stream, career, question_id=None):
+    # Cached scenarios (see warm_personalization.py) turn this into a dict lookup
+    if question_id is not None:
+        cached = personalization_cache.get(question_id, al_stream, career, base)
+        if cached is not None:
+            return cached
+
+    scenario = generate_personalized_scenario(base, al_stream, career)
+    if scenario is None:
+        # On error or failed validation, fallback to basic personalization, but do not stop the quiz
+        return _fallback_scenario(base, al_stream, career)
+    if question_id is not None:
+        personalization_cache.put(question_id, al_stream, career, base, scenario)
+    return scenario
+
+
+async def apersonalize_scenario(base, al_stream, career, question_id=None):
+    """Async variant of personalize_scenario(); cache reads and writes never block the event loop."""
+    if question_id is not None:
+        cached = await personalization_cache.aget(question_id, al_stream, career, base)
+        if cached is not None:
+            return cached
+
+    scenario = await agenerate_personalized_scenario(base, al_stream, career)
+    if scenario is None:
+        return _fallback_scenario(base, al_stream, career)
+    if question_id is not None:
+        await personalization_cache.aput(question_id, al_stream, career, base, scenario)
+    return scenario
 
 def validate_personalization(original, personalized):
     import re
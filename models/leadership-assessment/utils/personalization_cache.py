@@ -0,0 +1,190 @@
+import os
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_PATH = Path(os.getenv(
+    "PERSONALIZATION_CACHE_PATH",
+    Path(__file__).parent.parent / "data" / "personalization_cache.sqlite3"
+))
+CACHE_ENABLED = os.getenv("PERSONALIZATION_CACHE_ENABLED", "true").lower() == "true"
+# Careers are free text, so both tiers are bounded: an LRU of entries in memory
+# and a row cap on disk (oldest rows are pruned first)
+CACHE_MEMORY_ENTRIES = int(os.getenv("PERSONALIZATION_CACHE_MEMORY_ENTRIES", "5000"))
+CACHE_MAX_ROWS = int(os.getenv("PERSONALIZATION_CACHE_MAX_ROWS", "100000"))
+PRUNE_EVERY = 256  # puts between row-cap checks
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    question_id   TEXT NOT NULL,
+    al_stream     TEXT NOT NULL,
+    career        TEXT NOT NULL,
+    base_hash     TEXT NOT NULL,
+    scenario      TEXT NOT NULL,
+    created_at    REAL NOT NULL,
+    PRIMARY KEY (question_id, al_stream, career)
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_created_at ON scenarios (created_at);
+"""
+
+
+def _norm(value) -> str:
+    return " ".join(str(value or "").split()).lower()
+
+
+def base_hash(base: str) -> str:
+    # Stored with each entry so an edited scenario in the pool invalidates it
+    return hashlib.sha256(_norm(base).encode("utf-8")).hexdigest()[:16]
+
+
+class PersonalizationCache:
+    """
+    Personalized scenarios keyed on (question id, al_stream, career).
+
+    The most recently written rows (up to memory_entries) are loaded into an
+    LRU dict when the cache opens, so warmed lookups on the answer path are
+    dict hits; writes go to both, and a dict miss checks SQLite for older rows
+    or rows written by other worker processes. The async variants run the
+    SQLite work in a thread so it never blocks the event loop.
+    """
+
+    def __init__(self, path=CACHE_PATH, enabled=CACHE_ENABLED,
+                 memory_entries=CACHE_MEMORY_ENTRIES, max_rows=CACHE_MAX_ROWS):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._conn = None
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        if enabled:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._prune()
+            rows = self._conn.execute(
+                "SELECT question_id, al_stream, career, base_hash, scenario FROM scenarios "
+                "ORDER BY created_at DESC LIMIT ?",
+                (memory_entries,),
+            ).fetchall()
+            for qid, stream, career, h, scenario in reversed(rows):
+                self._memory[(qid, stream, career)] = (h, scenario)
+
+    @staticmethod
+    def key(question_id, al_stream, career):
+        return (str(question_id), _norm(al_stream), _norm(career))
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _from_memory(self, key):
+        entry = self._memory.get(key)
+        if entry is not None:
+            with self._lock:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+        return entry
+
+    def _from_disk(self, key):
+        # Older than the memory tier, or stored by another worker process since this one started
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT base_hash, scenario FROM scenarios WHERE question_id = ? AND al_stream = ? AND career = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        entry = (row[0], row[1])
+        self._remember(key, entry)
+        return entry
+
+    def _lookup(self, key):
+        entry = self._from_memory(key)
+        if entry is None and self._conn is not None:
+            entry = self._from_disk(key)
+        return entry
+
+    async def _alookup(self, key):
+        entry = self._from_memory(key)
+        if entry is None and self._conn is not None:
+            entry = await asyncio.to_thread(self._from_disk, key)
+        return entry
+
+    def _count(self, entry, base):
+        if entry is None or entry[0] != base_hash(base):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def has(self, question_id, al_stream, career, base):
+        """Like get() but without touching the hit/miss counters."""
+        entry = self._lookup(self.key(question_id, al_stream, career))
+        return entry is not None and entry[0] == base_hash(base)
+
+    def get(self, question_id, al_stream, career, base):
+        if not self.enabled:
+            return None
+        return self._count(self._lookup(self.key(question_id, al_stream, career)), base)
+
+    async def aget(self, question_id, al_stream, career, base):
+        """Async get(): a memory hit returns inline, a miss queries SQLite in a thread."""
+        if not self.enabled:
+            return None
+        return self._count(await self._alookup(self.key(question_id, al_stream, career)), base)
+
+    def put(self, question_id, al_stream, career, base, scenario):
+        if not self.enabled:
+            return
+        key = self.key(question_id, al_stream, career)
+        h = base_hash(base)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scenarios (question_id, al_stream, career, base_hash, scenario, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, h, scenario, time.time()),
+            )
+            self._puts += 1
+            prune = self._puts % PRUNE_EVERY == 0
+        self._remember(key, (h, scenario))
+        if prune:
+            self._prune()
+
+    async def aput(self, question_id, al_stream, career, base, scenario):
+        if self.enabled:
+            await asyncio.to_thread(self.put, question_id, al_stream, career, base, scenario)
+
+    def _prune(self):
+        """Drops the oldest rows beyond max_rows."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM scenarios WHERE rowid IN "
+                "(SELECT rowid FROM scenarios ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            )
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+personalization_cache = PersonalizationCache()
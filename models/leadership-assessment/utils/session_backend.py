@@ -0,0 +1,381 @@
+"""
+Pluggable session-state backends.
+
+Services keep quiz state as small JSON-serializable dicts (question IDs,
+scores, answers) behind this interface, so it can live outside the worker
+process and any uvicorn worker behind a load balancer can serve any request:
+
+    memory  - process-local (single worker; the default)
+    sqlite  - a WAL-mode SQLite file shared by all workers on one host
+    redis   - any Redis-protocol server, shared across hosts
+              (needs the optional `redis` package)
+
+Selected with SESSION_BACKEND; every write refreshes the session's idle TTL.
+
+Shared module: identical copies live in each service's utils/ (services
+run and ship independently); edit the analytical-assessment copy and run
+models/sync_shared_utils.py.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+# -----------------------------------------------------------
+# 🔧 Configuration
+# -----------------------------------------------------------
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").strip().lower()
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(30 * 60)))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+SESSION_SQLITE_PATH = Path(os.getenv(
+    "SESSION_SQLITE_PATH",
+    Path(__file__).parent.parent / "data" / "sessions.sqlite3"
+))
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+
+State = Dict[str, Any]
+Mutator = Callable[[State], Optional[State]]
+
+
+def dumps(state: State) -> str:
+    return json.dumps(state, separators=(",", ":"))
+
+
+def loads(blob) -> State:
+    return json.loads(blob)
+
+
+# -----------------------------------------------------------
+# 🧩 Interface
+# -----------------------------------------------------------
+class SessionBackend:
+    """
+    Key → state-dict store with idle-TTL expiry.
+
+    update() is the only safe way to change a session that another worker
+    (or a background task) may also be changing: `mutate` receives the
+    current state and returns the new one, or None to leave it untouched.
+    """
+
+    name = "base"
+
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS):
+        self.ttl = ttl
+
+    def get(self, session_id: str) -> Optional[State]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, state: State):
+        raise NotImplementedError
+
+    def update(self, session_id: str, mutate: Mutator) -> Optional[State]:
+        """Applies `mutate` atomically; returns the stored state, or None if the session is missing."""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def live(self, session_ids: Iterable[str]) -> Set[str]:
+        """The subset of `session_ids` that still exist (not expired or deleted)."""
+        return {session_id for session_id in session_ids if self.get(session_id) is not None}
+
+    def sweep(self) -> int:
+        """Drops expired sessions; returns how many."""
+        return 0
+
+    def close(self):
+        pass
+
+
+# -----------------------------------------------------------
+# 🧠 In-process (single worker)
+# -----------------------------------------------------------
+class MemorySessionBackend(SessionBackend):
+    """Serialized states in an LRU-ordered dict, capped at `max_entries`."""
+
+    name = "memory"
+
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS, max_entries: int = SESSION_MAX_ENTRIES):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (blob, expires_at)
+        self._lock = threading.Lock()
+
+    def _live_locked(self, session_id: str, now: float):
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._entries[session_id]
+            return None
+        return entry[0]
+
+    def _store_locked(self, session_id: str, blob: str, now: float):
+        self._entries[session_id] = (blob, now + self.ttl)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[State]:
+        with self._lock:
+            blob = self._live_locked(session_id, time.time())
+        return loads(blob) if blob is not None else None
+
+    def put(self, session_id: str, state: State):
+        blob = dumps(state)
+        with self._lock:
+            self._store_locked(session_id, blob, time.time())
+
+    def update(self, session_id: str, mutate: Mutator) -> Optional[State]:
+        with self._lock:
+            now = time.time()
+            blob = self._live_locked(session_id, now)
+            if blob is None:
+                return None
+            state = mutate(loads(blob))
+            if state is None:
+                return loads(blob)
+            self._store_locked(session_id, dumps(state), now)
+            return state
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._entries.pop(session_id, None) is not None
+
+    def count(self) -> int:
+        return len(self._entries)
+
+    def live(self, session_ids: Iterable[str]) -> Set[str]:
+        now = time.time()
+        with self._lock:
+            return {session_id for session_id in session_ids if self._live_locked(session_id, now) is not None}
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]
+            for k in expired:
+                del self._entries[k]
+        return len(expired)
+
+
+# -----------------------------------------------------------
+# 🗄️ SQLite (all workers on one host)
+# -----------------------------------------------------------
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id         TEXT PRIMARY KEY,
+    state      TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at);
+"""
+_SQLITE_MAX_PARAMS = 500
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """One row per session; update() runs inside BEGIN IMMEDIATE so workers serialize."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path = SESSION_SQLITE_PATH, ttl: float = SESSION_TTL_SECONDS):
+        super().__init__(ttl)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+
+    def get(self, session_id: str) -> Optional[State]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def put(self, session_id: str, state: State):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, state, expires_at) VALUES (?, ?, ?)",
+                (session_id, dumps(state), time.time() + self.ttl),
+            )
+
+    def update(self, session_id: str, mutate: Mutator) -> Optional[State]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT state FROM sessions WHERE id = ? AND expires_at > ?", (session_id, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                current = loads(row[0])
+                state = mutate(current)
+                if state is not None:
+                    self._conn.execute(
+                        "UPDATE sessions SET state = ?, expires_at = ? WHERE id = ?",
+                        (dumps(state), now + self.ttl, session_id),
+                    )
+                self._conn.execute("COMMIT")
+                return state if state is not None else current
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return cur.rowcount > 0
+
+    def count(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)
+            ).fetchone()
+        return n
+
+    def live(self, session_ids: Iterable[str]) -> Set[str]:
+        session_ids, found = list(session_ids), set()
+        now = time.time()
+        for i in range(0, len(session_ids), _SQLITE_MAX_PARAMS):
+            chunk = session_ids[i:i + _SQLITE_MAX_PARAMS]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id FROM sessions WHERE expires_at > ? AND id IN ({','.join('?' * len(chunk))})",
+                    (now, *chunk),
+                ).fetchall()
+            found.update(row[0] for row in rows)
+        return found
+
+    def sweep(self) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+        return max(cur.rowcount, 0)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# -----------------------------------------------------------
+# 🌐 Redis protocol (any number of hosts)
+# -----------------------------------------------------------
+class RedisSessionBackend(SessionBackend):
+    """
+    One string key per session with a native TTL; update() uses WATCH/MULTI
+    and retries on conflict. A sorted set (`<namespace>_index`, id → expiry in
+    ms) is written alongside every session so count() and sweep() never scan
+    the keyspace. Pass `client` to reuse an existing connection (or a local
+    stand-in such as fakeredis).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = SESSION_REDIS_URL, ttl: float = SESSION_TTL_SECONDS,
+                 namespace: str = "session", client=None):
+        super().__init__(ttl)
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("SESSION_BACKEND=redis requires the 'redis' package (pip install redis).") from e
+            client = redis.Redis.from_url(url)
+        self._redis = client
+        self.prefix = f"{namespace}:"
+        self.index = f"{namespace}_index"
+        self._ttl_ms = max(1, int(ttl * 1000))
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def _write(self, pipe, session_id: str, blob: str):
+        pipe.set(self._key(session_id), blob, px=self._ttl_ms)
+        pipe.zadd(self.index, {session_id: int(time.time() * 1000) + self._ttl_ms})
+
+    def get(self, session_id: str) -> Optional[State]:
+        blob = self._redis.get(self._key(session_id))
+        return loads(blob) if blob is not None else None
+
+    def put(self, session_id: str, state: State):
+        with self._redis.pipeline() as pipe:
+            self._write(pipe, session_id, dumps(state))
+            pipe.execute()
+
+    def update(self, session_id: str, mutate: Mutator) -> Optional[State]:
+        from redis.exceptions import WatchError
+
+        key = self._key(session_id)
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    blob = pipe.get(key)
+                    if blob is None:
+                        pipe.unwatch()
+                        return None
+                    current = loads(blob)
+                    state = mutate(current)
+                    if state is None:
+                        pipe.unwatch()
+                        return current
+                    pipe.multi()
+                    self._write(pipe, session_id, dumps(state))
+                    pipe.execute()
+                    return state
+                except WatchError:
+                    continue  # another worker changed it first; re-read and re-apply
+
+    def delete(self, session_id: str) -> bool:
+        with self._redis.pipeline() as pipe:
+            pipe.delete(self._key(session_id))
+            pipe.zrem(self.index, session_id)
+            deleted, _ = pipe.execute()
+        return bool(deleted)
+
+    def count(self) -> int:
+        return int(self._redis.zcount(self.index, f"({int(time.time() * 1000)}", "+inf"))
+
+    def live(self, session_ids: Iterable[str]) -> Set[str]:
+        session_ids = list(session_ids)
+        with self._redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.exists(self._key(session_id))
+            return {session_id for session_id, n in zip(session_ids, pipe.execute()) if n}
+
+    def sweep(self) -> int:
+        """Redis expires the keys itself; this drops their index entries and returns how many."""
+        return int(self._redis.zremrangebyscore(self.index, "-inf", int(time.time() * 1000)))
+
+    def close(self):
+        self._redis.close()
+
+
+# -----------------------------------------------------------
+# 🏭 Factory
+# -----------------------------------------------------------
+def make_session_backend(namespace: str, kind: str = None, ttl: float = None, **kwargs) -> SessionBackend:
+    """
+    Builds the backend named by `kind` (default: SESSION_BACKEND).
+    `namespace` keeps services apart when they share one Redis server.
+    """
+    kind = (kind or SESSION_BACKEND).lower()
+    ttl = SESSION_TTL_SECONDS if ttl is None else ttl
+    if kind == "memory":
+        return MemorySessionBackend(ttl=ttl, **kwargs)
+    if kind == "sqlite":
+        return SQLiteSessionBackend(ttl=ttl, **kwargs)
+    if kind == "redis":
+        return RedisSessionBackend(ttl=ttl, namespace=f"{namespace}:session", **kwargs)
+    raise ValueError(f"Unknown SESSION_BACKEND '{kind}' (expected memory, sqlite or redis).")
@@ -0,0 +1,320 @@
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from utils.metrics import REGISTRY
+from utils.session_backend import SESSION_BACKEND, make_session_backend
+
+SESSION_TTL_SECONDS = float(os.getenv("LEADERSHIP_SESSION_TTL_SECONDS", str(30 * 60)))
+MAX_SESSIONS = int(os.getenv("LEADERSHIP_MAX_SESSIONS", "10000"))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("LEADERSHIP_SESSION_SWEEP_SECONDS", "60"))
+
+SESSIONS_LIVE = REGISTRY.gauge("leadership_sessions_live", "Sessions currently held in memory.")
+SESSION_BYTES = REGISTRY.gauge("leadership_session_bytes", "Approximate bytes of per-session state held in memory.")
+SESSIONS_EVICTED = REGISTRY.counter("leadership_sessions_evicted_total", "Sessions dropped before completion, by reason.")
+
+
+class SessionStore:
+    """
+    In-memory session map with idle-TTL expiry and an LRU size cap.
+
+    Every get() refreshes a session's idle clock. Sessions idle for longer
+    than `ttl` are dropped lazily on access and by the background sweeper;
+    once `max_sessions` is reached the least recently used one is evicted.
+    `on_evict(session_id)` runs for every session dropped that way (not for pop()).
+    """
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS, max_sessions=MAX_SESSIONS,
+                 sweep_interval=SWEEP_INTERVAL_SECONDS, sizeof=None, on_evict=None):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+        self._sizeof = sizeof or (lambda value: 0)
+        self._on_evict = on_evict
+        # session_id -> [value, last_access, approx_bytes], oldest access first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._task = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def _set_gauges(self):
+        SESSIONS_LIVE.set(len(self._entries))
+        SESSION_BYTES.set(self._bytes)
+
+    def _drop_locked(self, session_id, reason=None):
+        value, _, size = self._entries.pop(session_id)
+        self._bytes -= size
+        if reason:
+            SESSIONS_EVICTED.inc(reason=reason)
+        return value
+
+    def _evicted(self, session_ids):
+        if self._on_evict:
+            for session_id in session_ids:
+                self._on_evict(session_id)
+
+    def put(self, session_id, value):
+        evicted = []
+        with self._lock:
+            if session_id in self._entries:
+                self._drop_locked(session_id)
+            while len(self._entries) >= self.max_sessions:
+                oldest = next(iter(self._entries))
+                self._drop_locked(oldest, "capacity")
+                evicted.append(oldest)
+            size = self._sizeof(value)
+            self._entries[session_id] = [value, time.monotonic(), size]
+            self._bytes += size
+            self._set_gauges()
+        self._evicted(evicted)
+
+    def get(self, session_id):
+        """Returns the session and refreshes its idle clock, or None if missing/expired."""
+        evicted = []
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            now = time.monotonic()
+            if now - entry[1] > self.ttl:
+                self._drop_locked(session_id, "ttl")
+                evicted.append(session_id)
+                self._set_gauges()
+                value = None
+            else:
+                entry[1] = now
+                self._entries.move_to_end(session_id)
+                value = entry[0]
+        self._evicted(evicted)
+        return value
+
+    def update(self, session_id, mutate):
+        """
+        Applies `mutate(value)` (which returns the value to keep) to a live
+        session and refreshes it; returns the new value, or None if the session
+        is missing/expired. Atomic for callers that don't await inside `mutate`.
+        """
+        value = self.get(session_id)
+        if value is None:
+            return None
+        value = mutate(value)
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                entry[0] = value
+        self.touch(session_id)
+        return value
+
+    def touch(self, session_id, value=None):
+        """Re-measures a session after its state changed (e.g. an answer was recorded)."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                size = self._sizeof(entry[0])
+                self._bytes += size - entry[2]
+                entry[2] = size
+                self._set_gauges()
+
+    def pop(self, session_id):
+        with self._lock:
+            value = self._drop_locked(session_id) if session_id in self._entries else None
+            self._set_gauges()
+        return value
+
+    def sweep(self):
+        """Drops every session idle for longer than the TTL; returns how many."""
+        cutoff = time.monotonic() - self.ttl
+        evicted = []
+        with self._lock:
+            # Entries are ordered by last access, so expired ones are all at the front
+            while self._entries:
+                session_id, entry = next(iter(self._entries.items()))
+                if entry[1] > cutoff:
+                    break
+                self._drop_locked(session_id, "ttl")
+                evicted.append(session_id)
+            self._set_gauges()
+        self._evicted(evicted)
+        return len(evicted)
+
+    # Async entry points for request handlers. Nothing here blocks, so they run
+    # inline (in a thread, update()'s mutate could race another one).
+    async def aput(self, session_id, value):
+        return self.put(session_id, value)
+
+    async def aupdate(self, session_id, mutate):
+        return self.update(session_id, mutate)
+
+    async def apop(self, session_id):
+        return self.pop(session_id)
+
+    async def asweep(self):
+        return self.sweep()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            dropped = await self.asweep()
+            if dropped:
+                print(f"Session sweeper dropped {dropped} idle sessions ({len(self)} live).")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class BackendSessionStore:
+    """
+    SessionStore-compatible view over an external SessionBackend (SQLite,
+    Redis). Sessions are stored as compact state via `dumps`/`loads`, so
+    any worker can serve any request; the backend owns TTL expiry.
+
+    The backend doesn't report what it expired, so the store remembers the
+    sessions this worker served: `on_evict(session_id)` runs for those found
+    expired on access or by the sweeper (not for pop()).
+    """
+
+    def __init__(self, backend, dumps, loads, sweep_interval=SWEEP_INTERVAL_SECONDS, on_evict=None):
+        self.backend = backend
+        self.ttl = backend.ttl
+        self.max_sessions = None
+        self.sweep_interval = sweep_interval
+        self._dumps = dumps
+        self._loads = loads
+        self._on_evict = on_evict
+        self._served = set()
+        self._lock = threading.Lock()
+        self._task = None
+        self._loop = None
+
+    def __len__(self):
+        return self.backend.count()
+
+    def __contains__(self, session_id):
+        return self.backend.get(session_id) is not None
+
+    def _serving(self, session_id):
+        with self._lock:
+            self._served.add(session_id)
+
+    def _expired(self, session_ids):
+        with self._lock:
+            session_ids = [s for s in session_ids if s in self._served]
+            self._served.difference_update(session_ids)
+        self._evicted(session_ids)
+
+    def put(self, session_id, value):
+        self.backend.put(session_id, self._dumps(value))
+        self._serving(session_id)
+
+    def get(self, session_id):
+        state = self.backend.get(session_id)
+        if state is None:
+            self._expired([session_id])
+            return None
+        self._serving(session_id)
+        return self._loads(session_id, state)
+
+    def update(self, session_id, mutate):
+        """
+        SessionStore.update() through the backend's atomic read-modify-write:
+        `mutate` runs on a freshly loaded session (again if another worker
+        changed it first) and the value it returns is stored.
+        """
+        applied = []
+
+        def apply(state):
+            value = mutate(self._loads(session_id, state))
+            applied[:] = [value]
+            return self._dumps(value)
+
+        if self.backend.update(session_id, apply) is None:
+            self._expired([session_id])
+            return None
+        self._serving(session_id)
+        return applied[0]
+
+    def touch(self, session_id, value=None):
+        """Writes back a session after its state changed (and refreshes its TTL)."""
+        if value is not None:
+            self.put(session_id, value)
+
+    def pop(self, session_id):
+        value = self.get(session_id)
+        self.backend.delete(session_id)
+        with self._lock:
+            self._served.discard(session_id)
+        return value
+
+    def sweep(self):
+        dropped = self.backend.sweep()
+        SESSIONS_LIVE.set(len(self))
+        if dropped:
+            SESSIONS_EVICTED.inc(dropped, reason="ttl")
+        with self._lock:
+            served = list(self._served)
+        if served:
+            live = self.backend.live(served)
+            self._expired([s for s in served if s not in live])
+        return dropped
+
+    def _evicted(self, session_ids):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is not None and session_ids:
+                # In an asyncio.to_thread worker: on_evict (prefetch task.cancel()) belongs on the loop
+                self._loop.call_soon_threadsafe(SessionStore._evicted, self, session_ids)
+                return
+        SessionStore._evicted(self, session_ids)
+
+    # Backend calls block on locks or network round trips (SQLite BEGIN
+    # IMMEDIATE, Redis WATCH retries), so async callers run them in a thread.
+    async def _in_thread(self, fn, *args):
+        self._loop = asyncio.get_running_loop()
+        return await asyncio.to_thread(fn, *args)
+
+    async def aput(self, session_id, value):
+        return await self._in_thread(self.put, session_id, value)
+
+    async def aupdate(self, session_id, mutate):
+        return await self._in_thread(self.update, session_id, mutate)
+
+    async def apop(self, session_id):
+        return await self._in_thread(self.pop, session_id)
+
+    async def asweep(self):
+        return await self._in_thread(self.sweep)
+
+    _run = SessionStore._run
+    start = SessionStore.start
+    stop = SessionStore.stop
+
+
+def make_session_store(dumps, loads, sizeof=None, on_evict=None, kind=None):
+    """
+    SESSION_BACKEND=memory keeps live objects in a SessionStore (one worker);
+    sqlite / redis go through BackendSessionStore so workers share sessions.
+    """
+    kind = (kind or SESSION_BACKEND).lower()
+    if kind == "memory":
+        return SessionStore(sizeof=sizeof, on_evict=on_evict)
+    return BackendSessionStore(
+        make_session_backend("leadership", kind=kind, ttl=SESSION_TTL_SECONDS), dumps, loads, on_evict=on_evict
+    )
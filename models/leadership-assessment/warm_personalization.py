@@ -0,0 +1,73 @@
+"""
+Precomputes personalized scenarios into the personalization cache.
+
+Covers every pool question for every stream in STREAM_CONTEXTS and each
+career given (POPULAR_CAREERS by default). Entries already cached for the
+current scenario text are skipped, so the command can be re-run after
+editing the pool or adding careers.
+
+Run from the service directory:
+    python warm_personalization.py
+    python warm_personalization.py --careers "Pilot" "Lawyer" --workers 16
+    python warm_personalization.py --dry-run
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from logic.question_pool import get_question_pool
+from utils.constant import STREAM_CONTEXTS, POPULAR_CAREERS
+from utils.personalization import generate_personalized_scenario
+from utils.personalization_cache import personalization_cache
+
+
+def pending_jobs(careers, streams):
+    pool = get_question_pool()
+    for q in pool.questions:
+        for stream in streams:
+            for career in careers:
+                if not personalization_cache.has(q["id"], stream, career, q["scenario"]):
+                    yield q, stream, career
+
+
+def warm(careers, streams, workers=8, dry_run=False):
+    jobs = list(pending_jobs(careers, streams))
+    print(f"{len(jobs)} scenarios to personalize ({len(careers)} careers x {len(streams)} streams).")
+    if dry_run or not jobs:
+        return {"pending": len(jobs), "stored": 0, "failed": 0}
+
+    def run(job):
+        q, stream, career = job
+        scenario = generate_personalized_scenario(q["scenario"], stream, career)
+        if scenario is not None:
+            personalization_cache.put(q["id"], stream, career, q["scenario"], scenario)
+        return scenario is not None
+
+    stored = failed = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run, job) for job in jobs]
+        for i, future in enumerate(as_completed(futures), 1):
+            if future.result():
+                stored += 1
+            else:
+                failed += 1
+            if i % 100 == 0 or i == len(jobs):
+                print(f"  {i}/{len(jobs)} done ({stored} stored, {failed} failed)")
+    print(f"Finished in {time.perf_counter() - started:.1f}s; failed entries fall back at request time.")
+    return {"pending": len(jobs), "stored": stored, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--careers", nargs="+", default=POPULAR_CAREERS)
+    parser.add_argument("--streams", nargs="+", default=list(STREAM_CONTEXTS))
+    parser.add_argument("--workers", type=int, default=8, help="concurrent LLM calls")
+    parser.add_argument("--dry-run", action="store_true", help="only count missing entries")
+    args = parser.parse_args()
+    warm(args.careers, args.streams, workers=args.workers, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
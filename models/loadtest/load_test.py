@@ -0,0 +1,354 @@
+"""
+Load-test harness for the three assessment services.
+
+Drives complete start → answer → complete flows for many concurrent
+virtual users and reports session throughput plus p50/p95/p99 latency
+per endpoint.
+
+With --spawn the services are started locally on the deterministic fake
+LLM backend (LLM_BACKEND=fake, no API key or network needed), with
+scratch data and log paths and a local sink standing in for the Node results
+backend. Without --spawn, point it at running services with --*-url.
+
+Run from the models/ directory:
+    python loadtest/load_test.py --spawn --users 20 --sessions 100
+    python loadtest/load_test.py --spawn --services leadership --fake-latency 0.5
+    python loadtest/load_test.py --spawn --session-backend sqlite --workers 4
+    python loadtest/load_test.py --services analytical --analytical-url http://127.0.0.1:8001
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+MODELS_DIR = Path(__file__).resolve().parent.parent
+CAREERS = ["Data Analyst", "AI Engineer", "System Engineer", "Data Scientist"]
+STREAMS = ["Physical Science", "Biological Science", "Commerce", "Technology"]
+MAX_STEPS = 100  # guard against a service that never reports completion
+
+
+# ------------------------------------------------------------
+# 📊 Latency Recording
+# ------------------------------------------------------------
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Recorder:
+    """Per-endpoint latencies and error counts for one service."""
+
+    def __init__(self, think_time: float = 0.0):
+        self.think_time = think_time
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.sessions_ok = 0
+        self.sessions_failed = 0
+
+    async def call(self, client: httpx.AsyncClient, method: str, path: str, payload=None) -> Dict[str, Any]:
+        name = f"{method} {path}"
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=payload)
+        except httpx.HTTPError:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            raise
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            raise RuntimeError(f"{name} → {response.status_code}: {response.text[:200]}")
+        body = response.json()
+        if isinstance(body, dict) and body.get("error"):
+            self.errors[name] = self.errors.get(name, 0) + 1
+            raise RuntimeError(f"{name} → {body['error']}")
+        return body
+
+    async def think(self):
+        """Simulated reading time between receiving a question and answering it."""
+        if self.think_time:
+            await asyncio.sleep(self.think_time)
+
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        requests = sum(len(v) for v in self.latencies.values())
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            endpoints[name] = {
+                "count": len(values),
+                "errors": self.errors.get(name, 0),
+                "mean_ms": round(1000 * sum(values) / len(values), 1),
+                "p50_ms": round(1000 * percentile(values, 50), 1),
+                "p95_ms": round(1000 * percentile(values, 95), 1),
+                "p99_ms": round(1000 * percentile(values, 99), 1),
+            }
+        return {
+            "sessions_ok": self.sessions_ok,
+            "sessions_failed": self.sessions_failed,
+            "wall_seconds": round(wall_seconds, 2),
+            "sessions_per_second": round(self.sessions_ok / wall_seconds, 2) if wall_seconds else 0.0,
+            "requests_per_second": round(requests / wall_seconds, 2) if wall_seconds else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+# ------------------------------------------------------------
+# 🧭 Session Flows (one virtual user = one full assessment)
+# ------------------------------------------------------------
+async def analytical_flow(client: httpx.AsyncClient, rec: Recorder, rng: random.Random, n: int):
+    user_id = f"load-{n}-{rng.randrange(10 ** 9)}"
+    body = await rec.call(client, "POST", "/start-quiz", {
+        "user_id": user_id, "career": rng.choice(CAREERS), "AL_stream": rng.choice(STREAMS),
+    })
+    question = body["first_question"]
+    for _ in range(MAX_STEPS):
+        await rec.think()
+        body = await rec.call(client, "POST", "/submit-answer", {
+            "user_id": user_id,
+            "question_id": question["id"],
+            "selected_answer": rng.choice(question["options"]),
+            "correct_answer": question["correct_answer"],
+            "category": question["category"],
+        })
+        if body.get("status") == "completed":
+            return
+        question = body["next_question"]
+    raise RuntimeError("analytical session did not complete")
+
+
+async def leadership_flow(client: httpx.AsyncClient, rec: Recorder, rng: random.Random, n: int):
+    body = await rec.call(client, "POST", "/start", {
+        "al_stream": rng.choice(STREAMS), "career": rng.choice(CAREERS),
+    })
+    session_id, question = body["session_id"], body["first_question"]
+    for _ in range(MAX_STEPS):
+        await rec.think()
+        option = rng.choice(question["options"])
+        body = await rec.call(client, "POST", "/answer", {
+            "session_id": session_id, "weights": option["weights"],
+        })
+        if "results" in body:
+            return
+        question = body["next_question"]
+    raise RuntimeError("leadership session did not complete")
+
+
+async def problem_solving_flow(client: httpx.AsyncClient, rec: Recorder, rng: random.Random, n: int):
+    body = await rec.call(client, "POST", "/generate", {
+        "user_id": f"load-{n}", "career": rng.choice(CAREERS),
+    })
+    session_id, question = body["session_id"], body["current_question"]
+    for _ in range(MAX_STEPS):
+        await rec.think()
+        body = await rec.call(client, "POST", "/answer", {
+            "session_id": session_id,
+            "question_id": str(question["id"]),
+            "selected": rng.choice(question["options"]),
+            "correct": question["answer"],
+            "sub_skill": question.get("sub_skill", "General"),
+            "difficulty": question.get("difficulty", "medium"),
+        })
+        if body.get("status") == "completed":
+            return
+        question = body["next_question"]
+    raise RuntimeError("problem-solving session did not complete")
+
+
+SERVICES: Dict[str, Dict[str, Any]] = {
+    "analytical": {"dir": "analytical-assessment", "port": 8101, "flow": analytical_flow},
+    "leadership": {"dir": "leadership-assessment", "port": 8102, "flow": leadership_flow},
+    "problem_solving": {"dir": "problemSolving_assessment", "port": 8103, "flow": problem_solving_flow},
+}
+
+
+async def run_service(name: str, base_url: str, users: int, sessions: int, timeout: float, seed: int,
+                      think_time: float = 0.0) -> Dict[str, Any]:
+    """Runs `sessions` full assessments against one service with `users` in flight at once."""
+    flow: Callable = SERVICES[name]["flow"]
+    rec = Recorder(think_time)
+    counter = iter(range(sessions))
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def virtual_user(worker: int):
+            rng = random.Random(seed * 1000 + worker)
+            for n in counter:
+                try:
+                    await flow(client, rec, rng, n)
+                    rec.sessions_ok += 1
+                except Exception as e:
+                    rec.sessions_failed += 1
+                    if rec.sessions_failed <= 3:
+                        print(f"⚠️ {name} session {n} failed: {e}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(w) for w in range(users)))
+        wall = time.perf_counter() - started
+
+    return rec.summary(wall)
+
+
+# ------------------------------------------------------------
+# 🚀 Local Service Spawning (fake LLM backend)
+# ------------------------------------------------------------
+class _SinkHandler(BaseHTTPRequestHandler):
+    """Accepts result uploads the problem-solving service sends to the Node backend."""
+
+    received = 0
+    _lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with _SinkHandler._lock:
+            _SinkHandler.received += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"ok": true}')
+
+    def log_message(self, *args):
+        pass
+
+
+def start_result_sink() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SinkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def spawn_service(name: str, scratch: Path, env_overrides: Dict[str, str], workers: int = 1) -> subprocess.Popen:
+    spec = SERVICES[name]
+    env = dict(os.environ, **env_overrides)
+    env.update({
+        "QUESTION_BANK_PATH": str(scratch / f"{name}_question_bank.sqlite3"),
+        "VALIDATION_CACHE_PATH": str(scratch / f"{name}_validation_cache.sqlite3"),
+        "PERSONALIZATION_CACHE_PATH": str(scratch / f"{name}_personalization_cache.sqlite3"),
+        "SESSION_SQLITE_PATH": str(scratch / f"{name}_sessions.sqlite3"),
+        "RESULT_OUTBOX_PATH": str(scratch / f"{name}_result_outbox.sqlite3"),
+        "LOG_DIR": str(scratch / f"{name}_logs"),
+    })
+    log = open(scratch / f"{name}.log", "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1",
+         "--port", str(spec["port"]), "--log-level", "warning", "--workers", str(workers)],
+        cwd=MODELS_DIR / spec["dir"], env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def wait_until_up(base_url: str, proc: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"service at {base_url} exited with code {proc.returncode}")
+        try:
+            if httpx.get(base_url + "/", timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"service at {base_url} did not come up within {timeout}s")
+
+
+# ------------------------------------------------------------
+# 🧾 Reporting
+# ------------------------------------------------------------
+def print_report(name: str, summary: Dict[str, Any]):
+    print(f"\n== {name} ==")
+    print(f"sessions ok={summary['sessions_ok']} failed={summary['sessions_failed']} "
+          f"wall={summary['wall_seconds']}s  {summary['sessions_per_second']} sessions/s  "
+          f"{summary['requests_per_second']} req/s")
+    print(f"{'endpoint':<24}{'count':>7}{'errors':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for endpoint, s in summary["endpoints"].items():
+        print(f"{endpoint:<24}{s['count']:>7}{s['errors']:>8}{s['mean_ms']:>8}ms{s['p50_ms']:>8}ms"
+              f"{s['p95_ms']:>8}ms{s['p99_ms']:>8}ms")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", nargs="+", choices=list(SERVICES), default=list(SERVICES))
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users per service")
+    parser.add_argument("--sessions", type=int, default=50, help="complete assessments per service")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds a user spends on each question")
+    parser.add_argument("--spawn", action="store_true", help="start the services locally on the fake LLM backend")
+    parser.add_argument("--fake-latency", type=float, default=0.2, help="simulated seconds per LLM call (--spawn)")
+    parser.add_argument("--fake-jitter", type=float, default=0.1, help="extra random latency per LLM call (--spawn)")
+    parser.add_argument("--fake-failure-rate", type=float, default=0.0, help="fraction of LLM calls that fail (--spawn)")
+    parser.add_argument("--fake-invalid-rate", type=float, default=0.1, help="fraction of rejected verdicts (--spawn)")
+    parser.add_argument("--session-backend", choices=["memory", "sqlite", "redis"],
+                        help="SESSION_BACKEND for spawned services (default: inherited)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn workers per spawned service (needs --session-backend sqlite/redis)")
+    parser.add_argument("--json", help="also write the report to this file")
+    for name, spec in SERVICES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}-url", default=f"http://127.0.0.1:{spec['port']}")
+    args = parser.parse_args(argv)
+
+    procs, sink = [], None
+    scratch = Path(tempfile.mkdtemp(prefix="auraskill_load_"))
+    try:
+        if args.spawn:
+            sink = start_result_sink()
+            env = {
+                "LLM_BACKEND": "fake",
+                "FAKE_LLM_LATENCY": str(args.fake_latency),
+                "FAKE_LLM_JITTER": str(args.fake_jitter),
+                "FAKE_LLM_FAILURE_RATE": str(args.fake_failure_rate),
+                "FAKE_LLM_INVALID_RATE": str(args.fake_invalid_rate),
+                "FAKE_LLM_SEED": str(args.seed),
+                "NODE_BACKEND_URL": f"http://127.0.0.1:{sink.server_address[1]}",
+            }
+            if args.session_backend:
+                env["SESSION_BACKEND"] = args.session_backend
+            for name in args.services:
+                procs.append(spawn_service(name, scratch, env, workers=args.workers))
+            for name, proc in zip(args.services, procs):
+                wait_until_up(getattr(args, f"{name}_url"), proc)
+            print(f"🚀 Spawned {', '.join(args.services)} on the fake LLM backend (logs in {scratch})")
+
+        report = {}
+        for name in args.services:
+            report[name] = asyncio.run(run_service(
+                name, getattr(args, f"{name}_url"), args.users, args.sessions, args.timeout, args.seed,
+                think_time=args.think_time,
+            ))
+            print_report(name, report[name])
+
+        if sink and "problem_solving" in args.services:
+            time.sleep(0.5)  # results are delivered in the background
+            print(f"📥 Result sink received {_SinkHandler.received} upload(s)")
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+        return report
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if sink:
+            sink.shutdown()
+
+
+if __name__ == "__main__":
+    main()
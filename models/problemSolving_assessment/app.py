@@ -7,32 +7,39 @@ Problem-Solving Adaptive Assessment Engine.
 Enhanced version:
  - Automatically fetches next question after user answers
  - Ends the assessment automatically and returns summary
- - Sends final results to Node backend for saving in MongoDB
+ - Queues final results for delivery to the Node backend (saved in MongoDB)
  - Handles invalid sessions and missing fields gracefully
- - Provides detailed logs for debugging
+ - Provides structured JSON logs written off the request path
 
 Author: AuraSkill Research Team (Senil)
 Version: 2.2
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import requests
 
 # ------------------------------------------------------------
 # 🧠 Internal Imports
 # ------------------------------------------------------------
 from engine.question_generator import generate_quiz
 from engine.evaluator import evaluate_quiz
+from engine.batch_evaluator import evaluate_sessions, evaluate_columns
 from engine.session_manager import (
-    create_session, get_next_question,
+    SESSIONS, create_session, create_adaptive_session, get_next_question,
     record_answer, close_session
 )
+from engine.similarity_matrix import SUBSKILL_MATRIX
+from utils.dataset_registry import DATASETS
+from utils.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from utils.result_outbox import ResultOutbox
 from utils.logger import (
     log_startup, log_generation_start, log_session_created,
-    log_question_selected, log_difficulty_update, log_session_closed, log_error
+    log_question_selected, log_difficulty_update, log_session_closed, log_error,
+    log_answer_received, log_next_question, log_result_queued
 )
 
 # ------------------------------------------------------------
@@ -40,6 +47,62 @@ from utils.logger import (
 # ------------------------------------------------------------
 NODE_BACKEND_URL = os.getenv("NODE_BACKEND_URL", "http://127.0.0.1:5000")
 SAVE_RESULT_ENDPOINT = f"{NODE_BACKEND_URL}/api/problemsolving/save-result"
+RESULT_OUTBOX = ResultOutbox(SAVE_RESULT_ENDPOINT)
+SESSION_SWEEP_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+DATASET_RELOAD_SECONDS = float(os.getenv("DATASET_RELOAD_SECONDS", "10"))  # 0 disables hot reload
+# QUIZ_MODE=fixed samples the whole quiz at /generate; =adaptive draws each next
+# question from the sub-skill's current difficulty as answers come in
+QUIZ_MODE = os.getenv("QUIZ_MODE", "fixed").strip().lower()
+if QUIZ_MODE not in ("fixed", "adaptive"):
+    raise ValueError(f"Unknown QUIZ_MODE '{QUIZ_MODE}' (expected fixed or adaptive).")
+
+
+# ------------------------------------------------------------
+# 🧹 Expired-session sweeper
+# ------------------------------------------------------------
+async def _sweep_sessions():
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_SECONDS)
+        SESSIONS.sweep()
+
+
+# ------------------------------------------------------------
+# 🔄 Dataset hot reload
+# ------------------------------------------------------------
+async def _watch_datasets():
+    while True:
+        await asyncio.sleep(DATASET_RELOAD_SECONDS)
+        await asyncio.to_thread(DATASETS.refresh)
+        if SUBSKILL_MATRIX.refresh():
+            print("🔄 Sub-skill similarity matrix changed; reloading on next use")
+
+
+def _report_task_exit(task: asyncio.Task):
+    """Lifespan tasks run until shutdown cancels them; any other exit is reported."""
+    if task.cancelled():
+        return
+    error = task.exception()
+    reason = f"{type(error).__name__}: {error}" if error else "returned"
+    print(f"❌ Background task {task.get_name()} stopped ({reason})")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"📚 Loaded {DATASETS.load_all()}/{len(DATASETS.categories)} question datasets")
+    shape = SUBSKILL_MATRIX.shape()
+    if shape:
+        print(f"🧭 Sub-skill similarity matrix: {shape[0]} careers × {shape[1]} sub-skills (mmap)")
+    tasks = [
+        asyncio.create_task(_sweep_sessions(), name="session_sweeper"),
+        asyncio.create_task(RESULT_OUTBOX.run(), name="result_outbox"),
+    ]
+    if DATASET_RELOAD_SECONDS > 0:
+        tasks.append(asyncio.create_task(_watch_datasets(), name="dataset_watcher"))
+    for task in tasks:
+        task.add_done_callback(_report_task_exit)
+    yield
+    for task in tasks:
+        task.cancel()
 
 # ------------------------------------------------------------
 # 🚀 Initialize FastAPI App
@@ -48,6 +111,7 @@ app = FastAPI(
     title="AuraSkill - Problem Solving Adaptive Engine",
     version="2.2",
     description="Adaptive quiz generation and evaluation microservice with automatic next-question flow and result persistence.",
+    lifespan=lifespan,
 )
 
 # ------------------------------------------------------------
@@ -67,6 +131,17 @@ class AnswerRequest(BaseModel):
     difficulty: str
 
 
+class BatchSession(BaseModel):
+    session_id: str
+    responses: List[Dict[str, Any]]
+
+
+class BatchEvaluationRequest(BaseModel):
+    # either per-session response lists or one-row-per-response columns
+    sessions: Optional[List[BatchSession]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
+
+
 # ------------------------------------------------------------
 # 🧠 Root Endpoint
 # ------------------------------------------------------------
@@ -79,6 +154,14 @@ def root():
     }
 
 
+# ------------------------------------------------------------
+# 📊 Metrics (result delivery queue depth / latency)
+# ------------------------------------------------------------
+@app.get("/metrics")
+def metrics():
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # ------------------------------------------------------------
 # 🎯 Generate a New Quiz
 # ------------------------------------------------------------
@@ -89,7 +172,13 @@ def generate_quiz_route(request: QuizRequest):
     """
     try:
         log_generation_start(request.user_id, request.career)
-        questions = generate_quiz(career=request.career, user_id=request.user_id)
+        if QUIZ_MODE == "adaptive":
+            session = create_adaptive_session(request.user_id, request.career)
+            questions = session["questions"]
+            total_questions = session["total_questions"]
+        else:
+            questions = generate_quiz(career=request.career, user_id=request.user_id)
+            total_questions = len(questions)
 
         if not questions or len(questions) == 0:
             raise HTTPException(
@@ -98,7 +187,8 @@ def generate_quiz_route(request: QuizRequest):
             )
 
         # Create a new quiz session
-        session = create_session(request.user_id, questions)
+        if QUIZ_MODE != "adaptive":
+            session = create_session(request.user_id, questions)
         log_session_created(session["session_id"], request.user_id)
 
         first_question = questions[0]
@@ -106,7 +196,7 @@ def generate_quiz_route(request: QuizRequest):
             "status": "success",
             "session_id": session["session_id"],
             "current_question": first_question,
-            "total_questions": len(questions)
+            "total_questions": total_questions
         }
 
     except HTTPException as e:
@@ -117,6 +207,27 @@ def generate_quiz_route(request: QuizRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ------------------------------------------------------------
+# 📊 Batch Evaluation (cohort re-scoring)
+# ------------------------------------------------------------
+@app.post("/evaluate-batch")
+def evaluate_batch_route(request: BatchEvaluationRequest):
+    """
+    Scores many sessions at once; each result is identical to evaluate_quiz.
+    """
+    if (request.sessions is None) == (request.columns is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'sessions' or 'columns'.")
+    try:
+        if request.columns is not None:
+            results = evaluate_columns(request.columns)
+        else:
+            results = evaluate_sessions((s.session_id, s.responses) for s in request.sessions)
+    except ValueError as e:
+        log_error(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "count": len(results), "results": results}
+
+
 # ------------------------------------------------------------
 # 🧩 Submit Answer → Auto Next or Auto End
 # ------------------------------------------------------------
@@ -130,7 +241,7 @@ def submit_and_next(request: AnswerRequest):
       - If quiz finished → evaluates and sends result to Node backend
     """
     try:
-        print("🟢 Received Answer Request:", request.dict())
+        log_answer_received(request.model_dump())
 
         # Record user's response
         result = record_answer(
@@ -161,7 +272,7 @@ def submit_and_next(request: AnswerRequest):
                 next_q.get("sub_skill"),
                 next_q.get("difficulty")
             )
-            print("🟣 Next question:", next_q)
+            log_next_question(next_q)
             return {
                 "status": "in_progress",
                 "message": "Next question generated.",
@@ -175,10 +286,9 @@ def submit_and_next(request: AnswerRequest):
 
         summary = evaluate_quiz(responses)
         log_session_closed(request.session_id, len(responses))
-        print(f"✅ Quiz completed for session: {request.session_id}")
 
         # ------------------------------------------------------------
-        # 📤 Send Result to Node Backend for Saving
+        # 📤 Queue Result for the Node Backend (sent in the background)
         # ------------------------------------------------------------
         payload = {
             "category": "problem_solving",
@@ -186,19 +296,10 @@ def submit_and_next(request: AnswerRequest):
         }
 
         try:
-            response = requests.post(
-                SAVE_RESULT_ENDPOINT,
-                json=payload,
-                headers={"Authorization": f"Bearer {session_result.get('token', '')}"}
-            )
-
-            if response.status_code == 200:
-                print("✅ Result successfully sent to Node backend")
-            else:
-                print(f"⚠️ Failed to save result: {response.status_code}, {response.text}")
-
+            RESULT_OUTBOX.enqueue(payload, token=session_result.get("token", ""))
+            log_result_queued(request.session_id)
         except Exception as e:
-            print("❌ Error sending result to Node backend:", e)
+            log_error(f"Error queueing result for Node backend: {e}")
 
         # ------------------------------------------------------------
         # 🧾 Return result summary to frontend
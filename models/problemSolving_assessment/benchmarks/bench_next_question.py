@@ -0,0 +1,89 @@
+"""
+Benchmarks next-question selection in the session manager: the old
+rebuild-and-choose pick (answered-ID set built per call, every session
+question filtered, random.choice over the rest) vs the session cursor
+(_next_question_id), over growing session sizes. Each run answers a whole
+session, so the per-pick time of the old pick grows with the session
+while the cursor stays flat.
+
+The JSON round trip that the session backends pay per update is shown
+separately; it is linear in the stored state for both.
+
+Run from the service directory:
+    python -m benchmarks.bench_next_question
+    python -m benchmarks.bench_next_question --sizes 15 100 1000 5000
+"""
+
+import argparse
+import random
+import time
+
+from engine.session_manager import _next_question_id
+from utils.session_backend import dumps, loads
+
+
+def _legacy_pick(state, index):
+    used_ids = {a["id"] for a in state["answered"]}
+    remaining = [qid for qid in state["q"] if qid not in used_ids and qid in index]
+    return random.choice(remaining) if remaining else None
+
+
+def _cursor_pick(state, index):
+    return _next_question_id(state, index)
+
+
+def _new_state(size):
+    ids = [f"Q{n}" for n in range(size)]
+    random.shuffle(ids)
+    return {"q": ids, "i": 0, "answered": [], "answered_ids": {}}, dict.fromkeys(ids, {})
+
+
+def _run_session(pick, size):
+    """Answers every question of one session; returns (seconds in pick, picks)."""
+    state, index = _new_state(size)
+    spent, picks = 0.0, 0
+    while True:
+        start = time.perf_counter()
+        qid = pick(state, index)
+        spent += time.perf_counter() - start
+        if qid is None:
+            return spent, picks
+        picks += 1
+        state["answered"].append({"id": qid, "was_correct": True})
+        state["answered_ids"][qid] = 1
+
+
+def _codec_us(size):
+    state, _ = _new_state(size)
+    state["answered"] = [{"id": qid, "sub_skill": "General", "difficulty": "medium", "selected": "A",
+                          "answer": "A", "was_correct": True} for qid in state["q"][: size // 2]]
+    state["answered_ids"] = {a["id"]: 1 for a in state["answered"]}
+    blob, rounds = dumps(state), 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        blob = dumps(loads(blob))
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 50, 200, 1000, 5000])
+    parser.add_argument("--seconds", type=float, default=0.5, help="minimum measuring time per cell")
+    args = parser.parse_args()
+
+    random.seed(7)
+    print(f"{'questions':>10}{'legacy/pick':>14}{'cursor/pick':>14}{'speedup':>10}{'json rt':>12}")
+    for size in args.sizes:
+        per_pick = {}
+        for name, pick in (("legacy", _legacy_pick), ("cursor", _cursor_pick)):
+            spent, picks, started = 0.0, 0, time.perf_counter()
+            while time.perf_counter() - started < args.seconds or not picks:
+                s, p = _run_session(pick, size)
+                spent, picks = spent + s, picks + p
+            per_pick[name] = spent / picks * 1e6
+        print(f"{size:>10}{per_pick['legacy']:>12.2f}us{per_pick['cursor']:>12.2f}us"
+              f"{per_pick['legacy'] / per_pick['cursor']:>9.1f}x{_codec_us(size):>10.1f}us")
+
+
+if __name__ == "__main__":
+    main()
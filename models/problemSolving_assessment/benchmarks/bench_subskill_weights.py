@@ -0,0 +1,66 @@
+"""
+Benchmarks per-quiz sub-skill weighting: the old substring match that
+question_generator recomputed for every quiz, the keyword-overlap
+weighting (semantic_weighting's fallback) and the memory-mapped
+similarity-matrix row lookup now used by compute_subskill_weights.
+
+Also prints how many careers get a non-uniform question split, and the
+largest share any one sub-skill receives, under each weighting.
+
+Run from the service directory (after python build_similarity_matrix.py):
+    python -m benchmarks.bench_subskill_weights
+"""
+
+import argparse
+import time
+
+from engine.question_generator import allocate_question_targets
+from engine.semantic_weighting import compute_keyword_weights, compute_subskill_weights
+from utils.constants import CAREER_CATEGORY_MAP, TOTAL_QUESTIONS
+from utils.dataset_registry import DATASETS
+
+
+def _legacy_substring_weights(subskills, career):
+    base_keywords = career.lower().split()
+    weights = {sub: max(sum(1 for word in base_keywords if word in sub.lower()), 1) for sub in subskills}
+    total = sum(weights.values())
+    return {k: round(v / total, 2) for k, v in weights.items()}
+
+
+def _cases():
+    return [(list(DATASETS.get(category).by_sub_skill), career)
+            for category, careers in CAREER_CATEGORY_MAP.items() for career in careers]
+
+
+def _per_call_us(weigh, cases, seconds):
+    calls, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for subskills, career in cases:
+            weigh(subskills, career)
+        calls += len(cases)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def _allocation(weigh, cases):
+    splits = [allocate_question_targets(weigh(subskills, career), TOTAL_QUESTIONS) for subskills, career in cases]
+    uneven = sum(1 for targets in splits if max(targets.values()) - min(targets.values()) > 1)
+    return uneven, max(max(targets.values()) for targets in splits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="minimum measuring time per weighting")
+    args = parser.parse_args()
+
+    cases = _cases()
+    print(f"{'weighting':>20}{'per call':>12}{'careers tilted':>16}{'max share':>11}")
+    for name, weigh in (("substring (old)", _legacy_substring_weights),
+                        ("keyword overlap", compute_keyword_weights),
+                        ("matrix lookup", compute_subskill_weights)):
+        us = _per_call_us(weigh, cases, args.seconds)
+        uneven, top = _allocation(weigh, cases)
+        print(f"{name:>20}{us:>10.2f}us{uneven:>10}/{len(cases):<5}{top:>7}/{TOTAL_QUESTIONS}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+build_similarity_matrix.py
+-----------------------------------
+Offline build of the career × sub-skill similarity matrix used for
+career-aware question allocation (engine/similarity_matrix.py).
+
+Re-run after editing the question datasets or CAREER_CATEGORY_MAP;
+running services pick up the new file within DATASET_RELOAD_SECONDS.
+Careers or sub-skills missing from the matrix fall back to keyword
+weighting until it is rebuilt.
+
+Run from the service directory:
+    python build_similarity_matrix.py
+    python build_similarity_matrix.py --show      # print each career's weights and question split
+"""
+
+import argparse
+import time
+
+from engine.similarity_matrix import (
+    SUBSKILL_MATRIX_PATH, SimilarityMatrix, build_similarity_matrix, save_similarity_matrix
+)
+from engine.semantic_weighting import compute_subskill_weights
+from engine.question_generator import allocate_question_targets
+from utils.constants import TOTAL_QUESTIONS
+
+
+# ------------------------------------------------------------
+# 🚀 Main
+# ------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=SUBSKILL_MATRIX_PATH, help="matrix path (.npy; the index is saved as .json)")
+    parser.add_argument("--show", action="store_true", help="print each career's sub-skill weights")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    matrix, careers, sub_skills = build_similarity_matrix()
+    save_similarity_matrix(matrix, careers, sub_skills, args.out)
+    print(f"✅ {len(careers)} careers × {len(sub_skills)} sub-skills → {args.out} "
+          f"({matrix.nbytes} bytes, {time.perf_counter() - started:.2f}s)")
+
+    if args.show:
+        saved = SimilarityMatrix(args.out)
+        for title, category in careers:
+            subs = [sub for c, sub in sub_skills if c == category]
+            weights = compute_subskill_weights(subs, title, matrix=saved)
+            targets = allocate_question_targets(weights, TOTAL_QUESTIONS)
+            split = ", ".join(f"{sub} {targets[sub]}" for sub in sorted(targets, key=targets.get, reverse=True))
+            print(f"🧭 {title}: {split}")
+
+
+if __name__ == "__main__":
+    main()
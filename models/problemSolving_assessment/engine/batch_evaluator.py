@@ -0,0 +1,199 @@
+"""
+batch_evaluator.py — Vectorized evaluation of many quiz sessions
+
+Scores thousands of sessions at once for cohort re-scoring. All responses
+are flattened into arrays (session, sub-skill, difficulty, correct) and
+every tally evaluate_quiz makes per session — totals, correct counts,
+hardest and most frequent difficulty per sub-skill — is computed with
+NumPy group-by operations (unique / bincount) over the whole batch.
+
+Each session's result is identical to evaluate_quiz(responses), including
+sub-skill order, score rounding, tie-breaking of the dominant difficulty
+(first seen wins, as statistics.mode does) and the feedback text. Sessions
+evaluate_quiz would raise on (an unknown difficulty) get an "error" entry.
+Identical sub-skill entries are shared between sessions' summaries, so
+treat the results as read-only (serialize them, don't edit them in place).
+
+Input shapes:
+    sessions: iterable of (session_id, responses) pairs
+    columns:  {"session_id": [...], "sub_skill": [...], "difficulty": [...],
+               "selected": [...], "answer": [...]} — one entry per response
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+import numpy as np
+from engine.evaluator import _generate_feedback
+
+DIFFICULTY_LEVELS = ["easy", "medium", "hard"]
+_LEVEL_CODE = {d: i for i, d in enumerate(DIFFICULTY_LEVELS)}
+_N_LEVELS = len(DIFFICULTY_LEVELS)
+
+
+# ------------------------------------------------------------
+# 🎯 Batch Evaluation (session lists)
+# ------------------------------------------------------------
+def evaluate_sessions(sessions: Iterable[Tuple[Any, List[Dict]]]) -> List[Dict]:
+    """
+    Evaluates many sessions' responses in one pass.
+
+    Returns:
+        list of {"session_id": ..., "summary": evaluate_quiz-equivalent dict}
+        in input order; sessions evaluate_quiz would raise on carry "error" instead.
+    """
+    ids, counts, rows = [], [], []
+    for session_id, responses in sessions:
+        ids.append(session_id)
+        counts.append(len(responses or ()))
+        rows.extend(responses or ())
+    sess = np.repeat(np.arange(len(ids), dtype=np.int64), counts)
+    subs = [r.get("sub_skill", "Unknown") for r in rows]
+    diffs = [r.get("difficulty", "medium") for r in rows]
+    correct = [r.get("selected") == r.get("answer") for r in rows]
+    return _evaluate_rows(ids, sess, subs, diffs, correct)
+
+
+# ------------------------------------------------------------
+# 📊 Batch Evaluation (columnar input)
+# ------------------------------------------------------------
+def evaluate_columns(columns: Dict[str, List]) -> List[Dict]:
+    """
+    Same as evaluate_sessions for one-row-per-response columns. Sessions are
+    reported in order of first appearance; a session's rows may be interleaved
+    with others and are taken in row order. Missing sub_skill / difficulty
+    columns default like evaluate_quiz does for missing keys.
+    """
+    if "session_id" not in columns:
+        raise ValueError("columns must include 'session_id'")
+    session_col = columns["session_id"]
+    n = len(session_col)
+    subs = columns.get("sub_skill") or ["Unknown"] * n
+    diffs = columns.get("difficulty") or ["medium"] * n
+    selected = columns.get("selected") or [None] * n
+    answers = columns.get("answer") or [None] * n
+    if not all(len(c) == n for c in (subs, diffs, selected, answers)):
+        raise ValueError("All columns must have the same length.")
+
+    sess, ids = _factorize(session_col)
+    correct = [a == b for a, b in zip(selected, answers)]
+    return _evaluate_rows(ids, sess, list(subs), list(diffs), correct)
+
+
+# ------------------------------------------------------------
+# ⚙️ Vectorized Core
+# ------------------------------------------------------------
+def _factorize(values: List) -> Tuple[np.ndarray, List]:
+    """Codes in order of first appearance, and the distinct values."""
+    uniques = list(dict.fromkeys(values))
+    codes = {v: i for i, v in enumerate(uniques)}
+    return np.fromiter(map(codes.__getitem__, values), dtype=np.int64, count=len(values)), uniques
+
+
+def _percentages(correct: np.ndarray, total: np.ndarray) -> List[float]:
+    """round(correct / total * 100, 2) per entry, rounded once per distinct (correct, total) pair."""
+    base = int(total.max(initial=0)) + 1
+    pairs, inverse = np.unique(correct * base + total, return_inverse=True)
+    rounded = [round(((p // base) / t) * 100, 2) if t else 0.0 for p, t in zip(pairs.tolist(), (pairs % base).tolist())]
+    return [rounded[i] for i in inverse.tolist()]
+
+
+def _evaluate_rows(ids: List, sess: np.ndarray, subs: List, diffs: List, correct: List[bool]) -> List[Dict]:
+    n_sessions, n_rows = len(ids), len(sess)
+    results: List[Dict] = [
+        {"session_id": session_id, "summary": {"error": "No responses provided for evaluation."}}
+        for session_id in ids
+    ]
+    if not n_rows:
+        return results
+
+    sess_arr = np.asarray(sess, dtype=np.int64)
+    correct_arr = np.asarray(correct, dtype=bool)
+    sub_codes, sub_names = _factorize(subs)
+    diff_codes, diff_values = _factorize(diffs)
+    level = np.array([_LEVEL_CODE.get(d, -1) if isinstance(d, str) else -1 for d in diff_values],
+                     dtype=np.int64)[diff_codes]
+
+    # ---- per session ---------------------------------------------------
+    totals = np.bincount(sess_arr, minlength=n_sessions)
+    correct_totals = np.bincount(sess_arr, weights=correct_arr, minlength=n_sessions).astype(np.int64)
+
+    # ---- per (session, sub-skill) group, in order of first appearance ---
+    keys = sess_arr * len(sub_names) + sub_codes
+    uniq, first_row, group = np.unique(keys, return_index=True, return_inverse=True)
+    n_groups = len(uniq)
+    group_total = np.bincount(group, minlength=n_groups)
+    group_correct = np.bincount(group, weights=correct_arr, minlength=n_groups).astype(np.int64)
+
+    valid = level >= 0
+    cell = group[valid] * _N_LEVELS + level[valid]
+    level_counts = np.bincount(cell, minlength=n_groups * _N_LEVELS).reshape(n_groups, _N_LEVELS)
+
+    # hardest level seen ("easy" when none, as _max_difficulty starts there)
+    seen = level_counts > 0
+    max_level = np.where(seen[:, 2], 2, np.where(seen[:, 1], 1, 0))
+
+    # most frequent level; ties go to the level seen first (statistics.mode)
+    first_seen = np.full(n_groups * _N_LEVELS, n_rows, dtype=np.int64)
+    cells, cell_first = np.unique(cell, return_index=True)
+    first_seen[cells] = np.flatnonzero(valid)[cell_first]
+    first_seen = first_seen.reshape(n_groups, _N_LEVELS)
+    dominant = np.argmax(level_counts * (n_rows + 1) + (n_rows - first_seen), axis=1)
+
+    group_session = uniq // len(sub_names)
+    group_sub = uniq % len(sub_names)
+    order = np.lexsort((first_row, group_session))
+
+    # evaluate_quiz raises on a difficulty outside DIFFICULTY_LEVELS (in _max_difficulty),
+    # naming the first one in its sub-skill loop; those sessions get an "error" entry
+    bad_sessions = {}
+    bad_rows = np.flatnonzero(~valid)
+    if len(bad_rows):
+        rank = np.empty(n_groups, dtype=np.int64)
+        rank[order] = np.arange(n_groups)
+        for row in sorted(bad_rows.tolist(), key=lambda r: (rank[group[r]], r)):
+            bad_sessions.setdefault(int(sess_arr[row]), diffs[row])
+
+    # ---- assemble evaluate_quiz-shaped summaries ------------------------
+    bounds = np.searchsorted(group_session[order], np.arange(n_sessions + 1))
+    order_l = order.tolist()
+    totals_l = totals.tolist()
+    overall = _percentages(correct_totals, totals)
+
+    # the same sub-skill entry recurs across many sessions: build each distinct
+    # (sub-skill, correct, total, max, dominant) entry and its feedback line once
+    base = int(group_total.max()) + 1
+    signature = ((((group_sub * base + group_correct) * base + group_total)
+                  * _N_LEVELS + max_level) * _N_LEVELS + dominant)
+    _, entry_first, entry_of = np.unique(signature, return_index=True, return_inverse=True)
+    g_score = _percentages(group_correct[entry_first], group_total[entry_first])
+    entries = []
+    for e, g in enumerate(entry_first.tolist()):
+        name = sub_names[int(group_sub[g])]
+        entry = {
+            "score": g_score[e],
+            "questions_attempted": int(group_total[g]),
+            "max_difficulty_reached": DIFFICULTY_LEVELS[int(max_level[g])],
+            "dominant_difficulty": DIFFICULTY_LEVELS[int(dominant[g])],
+        }
+        strengths, improvements = _generate_feedback({name: entry})
+        entries.append((name, entry, bool(strengths), (strengths or improvements)[0]))
+    entry_of = entry_of.tolist()
+
+    for s in range(n_sessions):
+        if not totals_l[s]:
+            continue
+        if s in bad_sessions:
+            results[s] = {"session_id": ids[s], "error": f"{bad_sessions[s]!r} is not in list"}
+            continue
+        subskill_summary, strengths, improvements = {}, [], []
+        for g in order_l[bounds[s]:bounds[s + 1]]:
+            name, entry, strong, line = entries[entry_of[g]]
+            subskill_summary[name] = entry
+            (strengths if strong else improvements).append(line)
+        results[s]["summary"] = {
+            "overall_score": overall[s],
+            "total_questions": totals_l[s],
+            "subskill_summary": subskill_summary,
+            "strengths": strengths,
+            "improvements": improvements,
+        }
+    return results
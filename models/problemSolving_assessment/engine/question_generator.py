@@ -1,9 +1,10 @@
 import json
 import os
 import random
-from typing import List, Dict
-from engine.difficulty_controller import get_initial_difficulty
-from utils.data_loader import load_category_file
+from typing import List, Dict, Optional, Tuple
+from engine.difficulty_controller import get_initial_difficulty, DIFFICULTY_LEVELS
+from engine.semantic_weighting import compute_subskill_weights
+from utils.dataset_registry import DATASETS
 from utils.constants import CAREER_CATEGORY_MAP
 
 # ------------------------------------------------------------
@@ -30,16 +31,16 @@ def generate_quiz(career: str, user_id: str = None, total_questions: int = 15) -
         raise ValueError(f"No valid category found for career: {career}")
 
     # --------------------------------------------------------
-    # 2️⃣ Load Question Pool
+    # 2️⃣ Load Question Pool (cached, indexed by the dataset registry)
     # --------------------------------------------------------
-    questions = load_category_file(category)
-    if not questions:
+    dataset = DATASETS.get(category)
+    if not dataset.questions:
         raise ValueError(f"No question data found for category: {category}")
 
     # --------------------------------------------------------
     # 3️⃣ Group Questions by Sub-skill
     # --------------------------------------------------------
-    grouped = group_by_subskill(questions)
+    grouped = dataset.by_sub_skill
     if not grouped:
         raise ValueError(f"No sub-skills found in dataset for category: {category}")
 
@@ -49,8 +50,9 @@ def generate_quiz(career: str, user_id: str = None, total_questions: int = 15) -
     initial_difficulty = get_initial_difficulty()
     selected_questions = []
 
-    # Dynamic weighting — assign more questions to sub-skills relevant to the career name
-    weights = compute_subskill_weights(grouped, career)
+    # Dynamic weighting — assign more questions to sub-skills relevant to the career
+    # (precomputed career × sub-skill similarity, see engine/similarity_matrix.py)
+    weights = compute_subskill_weights(list(grouped), career)
     question_targets = allocate_question_targets(weights, total_questions)
 
     # --------------------------------------------------------
@@ -58,18 +60,20 @@ def generate_quiz(career: str, user_id: str = None, total_questions: int = 15) -
     # --------------------------------------------------------
     for sub_skill, target_count in question_targets.items():
         pool = grouped[sub_skill]
+        by_difficulty = dataset.by_difficulty[sub_skill]
         difficulty = initial_difficulty
         sampled = []
+        taken = set()
 
-        # Ensure no duplicates, adapt difficulty pattern
-        while len(sampled) < target_count and pool:
-            available = [q for q in pool if q["difficulty"] == difficulty]
+        # Ensure no duplicates, adapt difficulty pattern (the shared indexes are never modified)
+        while len(sampled) < target_count and len(taken) < len(pool):
+            available = [q for q in by_difficulty.get(difficulty, ()) if q["id"] not in taken]
             if not available:
                 # fallback if difficulty pool empty
-                available = pool
+                available = [q for q in pool if q["id"] not in taken]
 
             q = random.choice(available)
-            pool.remove(q)
+            taken.add(q["id"])
             sampled.append(q)
 
             # Randomly vary difficulty path
@@ -86,6 +90,65 @@ def generate_quiz(career: str, user_id: str = None, total_questions: int = 15) -
     return selected_questions[:total_questions]
 
 
+# ------------------------------------------------------------
+# 🧭 Plan a Live Adaptive Quiz
+# ------------------------------------------------------------
+def plan_adaptive_quiz(career: str, total_questions: int = 15) -> Tuple[str, List[str]]:
+    """
+    Plans a live adaptive quiz: the order of sub-skills to test, with
+    the same career weighting as generate_quiz. The questions themselves
+    are drawn one at a time with draw_adaptive_question, at the
+    sub-skill's current difficulty.
+
+    Returns:
+        (category, sub-skill sequence of length total_questions)
+    """
+    category = get_category_from_career(career)
+    if not category:
+        raise ValueError(f"No valid category found for career: {career}")
+
+    dataset = DATASETS.get(category)
+    if not dataset.by_sub_skill:
+        raise ValueError(f"No sub-skills found in dataset for category: {category}")
+
+    targets = allocate_question_targets(compute_subskill_weights(list(dataset.by_sub_skill), career), total_questions)
+    plan = [sub for sub, count in targets.items() for _ in range(min(count, len(dataset.by_sub_skill[sub])))]
+    random.shuffle(plan)
+    return category, plan[:total_questions]
+
+
+# ------------------------------------------------------------
+# 🎲 Draw One Question from a (Sub-skill, Difficulty) Bucket
+# ------------------------------------------------------------
+def draw_adaptive_question(category: str, sub_skill: str, difficulty: str, asked: Dict) -> Optional[Dict]:
+    """
+    Picks an unasked question for `sub_skill` at `difficulty`, falling back
+    to the nearest other difficulty when that bucket is used up.
+
+    Draws are random probes into the registry's prebuilt bucket tuples, so
+    a pick is O(1) until a bucket is nearly exhausted; only then is the
+    (small) bucket scanned.
+    """
+    levels = DATASETS.get(category).by_difficulty.get(sub_skill, {})
+    for level in _nearest_levels(difficulty):
+        bucket = levels.get(level, ())
+        for _ in range(min(len(bucket), 4)):
+            q = random.choice(bucket)
+            if q["id"] not in asked:
+                return q
+        free = [q for q in bucket if q["id"] not in asked]
+        if free:
+            return random.choice(free)
+    return None
+
+
+def _nearest_levels(difficulty: str) -> List[str]:
+    if difficulty not in DIFFICULTY_LEVELS:
+        difficulty = get_initial_difficulty()
+    i = DIFFICULTY_LEVELS.index(difficulty)
+    return sorted(DIFFICULTY_LEVELS, key=lambda level: (abs(DIFFICULTY_LEVELS.index(level) - i), level))
+
+
 # ------------------------------------------------------------
 # 🔍 Get Category from Career
 # ------------------------------------------------------------
@@ -107,33 +170,6 @@ def group_by_subskill(questions: List[Dict]) -> Dict[str, List[Dict]]:
     return groups
 
 
-# ------------------------------------------------------------
-# ⚖️ Compute Sub-skill Weights (Semantic Career Match)
-# ------------------------------------------------------------
-def compute_subskill_weights(grouped: Dict[str, List[Dict]], career: str) -> Dict[str, float]:
-    """
-    Approximates how relevant each sub-skill is to a career
-    by checking overlap between sub-skill name and career keywords.
-
-    (Light semantic version — no embeddings required)
-    """
-    base_keywords = career.lower().split()
-    weights = {}
-
-    for sub_skill in grouped.keys():
-        score = 0
-        for word in base_keywords:
-            if word in sub_skill.lower():
-                score += 1
-        # default small base score
-        weights[sub_skill] = max(score, 1)
-
-    # Normalize weights
-    total = sum(weights.values())
-    normalized = {k: round(v / total, 2) for k, v in weights.items()}
-    return normalized
-
-
 # ------------------------------------------------------------
 # 📊 Allocate Question Targets Based on Weights
 # ------------------------------------------------------------
@@ -10,6 +10,10 @@ receive more questions (context-based weighting).
 This is the "intelligence" layer that makes the quiz career-aware
 even without any prior user data.
 
+Relevance comes from the precomputed career × sub-skill similarity
+matrix (engine/similarity_matrix.py); careers or sub-skills the matrix
+doesn't cover fall back to keyword overlap.
+
 Author: AuraSkill Research Team (Senil)
 Version: 1.0
 """
@@ -17,8 +21,12 @@ Version: 1.0
 import re
 import math
 from typing import Dict, List
+from engine.similarity_matrix import SUBSKILL_MATRIX
 from utils.text_preprocessor import clean_text
 
+# Base relevance every sub-skill gets, so each keeps a share of the quiz
+SIMILARITY_FLOOR = 0.2
+
 
 # ------------------------------------------------------------
 # 🧠 Extract Keywords
@@ -66,18 +74,32 @@ def compute_similarity(career_keywords: List[str], sub_keywords: List[str]) -> f
 # ------------------------------------------------------------
 # 🎯 Compute Weighted Importance for Each Sub-skill
 # ------------------------------------------------------------
-def compute_subskill_weights(subskills: List[str], career: str) -> Dict[str, float]:
+def compute_subskill_weights(subskills: List[str], career: str, matrix=SUBSKILL_MATRIX) -> Dict[str, float]:
     """
     Calculates normalized weight distribution for all sub-skills
-    relative to a user's chosen career.
+    relative to a user's chosen career: one row lookup in the
+    precomputed similarity matrix, or keyword overlap when the
+    matrix doesn't cover them.
 
     Args:
         subskills (List[str]): list of sub-skill names
         career (str): selected career title
+        matrix (SimilarityMatrix, optional): defaults to the service's matrix
 
     Returns:
         Dict[str, float]: normalized weights for each sub-skill
     """
+    similarities = matrix.similarities(career, subskills)
+    if similarities is None:
+        return compute_keyword_weights(subskills, career)
+
+    raw = [sim + SIMILARITY_FLOOR for sim in similarities]
+    total = sum(raw) or 1
+    return {sub: round(v / total, 3) for sub, v in zip(subskills, raw)}
+
+
+def compute_keyword_weights(subskills: List[str], career: str) -> Dict[str, float]:
+    """Keyword-overlap weighting (the fallback for compute_subskill_weights)."""
     career_keywords = extract_keywords(career)
     raw_scores = {}
 
@@ -1,17 +1,35 @@
 """
 session_manager.py — Adaptive Session Management
 Aligned with unified question schema that uses "id" as primary key.
+
+Sessions are stored as compact state (question IDs, sub-skill states and
+answer records) in the backend chosen by SESSION_BACKEND, so any worker
+can serve any request. Question objects are resolved by ID from the
+dataset registry when they are handed out. Each session keeps its question
+IDs in a pre-shuffled queue with a cursor and a map of answered IDs, so
+picking the next question does not rescan the session. Live adaptive
+sessions (create_adaptive_session) instead draw each question when it is
+needed, at the sub-skill's current difficulty.
 """
 
 import random
 import uuid
-from typing import Dict, List
+from typing import Dict, List, Optional
 from engine.difficulty_controller import get_initial_difficulty, update_difficulty
+from utils.constants import SESSION_EXPIRY_MINUTES
+from engine.question_generator import plan_adaptive_quiz, draw_adaptive_question
+from utils.dataset_registry import DATASETS
+from utils.session_backend import make_session_backend
 
 # ------------------------------------------------------------
-# 🧠 In-memory session storage
+# 🧠 Session storage (memory / sqlite / redis)
 # ------------------------------------------------------------
-ACTIVE_SESSIONS: Dict[str, Dict] = {}
+SESSIONS = make_session_backend("problem_solving", ttl=SESSION_EXPIRY_MINUTES * 60)
+
+
+def _question_index(category: str) -> Dict[str, Dict]:
+    """id → question for one category dataset (from the dataset registry)."""
+    return DATASETS.get(category).by_id
 
 
 # ------------------------------------------------------------
@@ -31,7 +49,24 @@ def create_session(user_id: str, questions: List[Dict]) -> Dict:
                 "attempted": 0,
             }
 
-    session = {
+    # Question order is drawn once: the first question is already on screen,
+    # the rest are shuffled and served in turn from the cursor "i"
+    order = [q["id"] for q in questions]
+    rest = order[1:]
+    random.shuffle(rest)
+
+    SESSIONS.put(session_id, {
+        "user_id": user_id,
+        "category": questions[0]["category"] if questions else None,
+        "q": order[:1] + rest,
+        "i": 0,
+        "subskill_states": subskill_states,
+        "answered": [],
+        "answered_ids": {},
+        "completed": False,
+    })
+
+    return {
         "session_id": session_id,
         "user_id": user_id,
         "questions": questions,
@@ -40,69 +75,157 @@ def create_session(user_id: str, questions: List[Dict]) -> Dict:
         "completed": False,
     }
 
-    ACTIVE_SESSIONS[session_id] = session
-    return session
+
+# ------------------------------------------------------------
+# 🧭 Create live adaptive quiz session
+# ------------------------------------------------------------
+def create_adaptive_session(user_id: str, career: str, total_questions: int = 15) -> Dict:
+    """
+    Starts a session whose questions are not fixed up front: each one is
+    drawn when needed from the (sub_skill, current_difficulty) bucket, so
+    the difficulty tracks the user's answers within each sub-skill.
+    """
+    category, plan = plan_adaptive_quiz(career, total_questions)
+    state = {
+        "mode": "adaptive",
+        "user_id": user_id,
+        "category": category,
+        "plan": plan,
+        "i": 0,
+        "q": [],
+        "served": {},
+        "subskill_states": {},
+        "answered": [],
+        "answered_ids": {},
+        "completed": False,
+    }
+    first = _draw_adaptive(state)
+    if first is None:
+        raise ValueError(f"No questions found for career '{career}'")
+
+    session_id = str(uuid.uuid4())
+    SESSIONS.put(session_id, state)
+
+    return {
+        "session_id": session_id,
+        "user_id": user_id,
+        "questions": [first],
+        "total_questions": len(plan),
+        "subskill_states": state["subskill_states"],
+        "answered": [],
+        "completed": False,
+    }
+
+
+def _draw_adaptive(state: Dict) -> Optional[Dict]:
+    """Serves the next planned sub-skill at its current difficulty; skips sub-skills that ran dry."""
+    plan, served = state["plan"], state["served"]
+    while state["i"] < len(plan):
+        sub = plan[state["i"]]
+        state["i"] += 1
+        sub_state = state["subskill_states"].setdefault(sub, {
+            "current_difficulty": get_initial_difficulty(),
+            "asked": [],
+            "correct_count": 0,
+            "attempted": 0,
+        })
+        q = draw_adaptive_question(state["category"], sub, sub_state["current_difficulty"], served)
+        if q is None:
+            continue
+        served[q["id"]] = 1
+        state["q"].append(q["id"])
+        return q
+    return None
 
 
 # ------------------------------------------------------------
 # 🔄 Fetch next question
 # ------------------------------------------------------------
-def get_next_question(session_id: str) -> Dict:
-    session = ACTIVE_SESSIONS.get(session_id)
-    if not session:
-        raise ValueError("Invalid session ID")
+def _answered_ids(state: Dict) -> Dict[str, int]:
+    # sessions stored before "answered_ids" existed rebuild it once
+    if "answered_ids" not in state:
+        state["answered_ids"] = {a["id"]: 1 for a in state["answered"]}
+    return state["answered_ids"]
 
-    used_ids = [q["id"] for q in session["answered"]]
-    remaining = [q for q in session["questions"] if q["id"] not in used_ids]
 
-    if not remaining:
-        session["completed"] = True
-        return None
+def _next_question_id(state: Dict, index: Dict[str, Dict]) -> Optional[str]:
+    """
+    Advances the session cursor past answered questions (and IDs dropped by a
+    dataset reload) and returns the next ID, or None when the queue is empty.
+    Each position is skipped at most once, so a pick is amortized O(1).
+    """
+    order, answered, i = state["q"], _answered_ids(state), state.get("i", 0)
+    while i < len(order) and (order[i] in answered or order[i] not in index):
+        i += 1
+    state["i"] = i + 1 if i < len(order) else i
+    return order[i] if i < len(order) else None
+
 
-    random.shuffle(remaining)
-    next_q = remaining[0]
+def get_next_question(session_id: str) -> Optional[Dict]:
+    picked = {}
 
-    sub = next_q.get("sub_skill", "General")
-    sub_state = session["subskill_states"][sub]
-    sub_state["attempted"] += 1
-    sub_state["asked"].append(next_q["id"])
+    def pick(state):
+        index = _question_index(state["category"])
+        if state.get("mode") == "adaptive":
+            next_q = _draw_adaptive(state)
+            next_id = next_q["id"] if next_q else None
+        else:
+            next_id = _next_question_id(state, index)
 
-    return next_q
+        if next_id is None:
+            state["completed"] = True
+            picked["id"] = None
+            return state
+
+        next_q = index[next_id]
+        sub = next_q.get("sub_skill", "General")
+        sub_state = state["subskill_states"][sub]
+        sub_state["attempted"] += 1
+        sub_state["asked"].append(next_q["id"])
+
+        picked["id"] = next_q["id"]
+        picked["category"] = state["category"]
+        return state
+
+    if SESSIONS.update(session_id, pick) is None:
+        raise ValueError("Invalid session ID")
+    if picked["id"] is None:
+        return None
+    return _question_index(picked["category"])[picked["id"]]
 
 
 # ------------------------------------------------------------
 # 🧩 Record answer + update difficulty
 # ------------------------------------------------------------
 def record_answer(session_id: str, question_id: str, selected: str, correct: str, sub_skill: str, difficulty: str):
-    session = ACTIVE_SESSIONS.get(session_id)
-    if not session:
-        raise ValueError("Session not found")
-
     was_correct = selected.strip().lower() == correct.strip().lower()
-    sub_state = session["subskill_states"].get(sub_skill)
+    new_diff = update_difficulty(difficulty, was_correct)
 
-    if not sub_state:
-        sub_state = {"current_difficulty": get_initial_difficulty(), "asked": [], "correct_count": 0, "attempted": 0}
+    def record(state):
+        sub_state = state["subskill_states"].get(sub_skill)
+        if not sub_state:
+            sub_state = {"current_difficulty": get_initial_difficulty(), "asked": [], "correct_count": 0, "attempted": 0}
 
-    sub_state["attempted"] += 1
-    if was_correct:
-        sub_state["correct_count"] += 1
+        sub_state["attempted"] += 1
+        if was_correct:
+            sub_state["correct_count"] += 1
+        sub_state["current_difficulty"] = new_diff
+        state["subskill_states"][sub_skill] = sub_state
 
-    new_diff = update_difficulty(difficulty, was_correct)
-    sub_state["current_difficulty"] = new_diff
-    session["subskill_states"][sub_skill] = sub_state
-
-    # ✅ store answer record with "id"
-    session["answered"].append({
-        "id": question_id,
-        "sub_skill": sub_skill,
-        "difficulty": difficulty,
-        "selected": selected,
-        "answer": correct,
-        "was_correct": was_correct,
-    })
+        # ✅ store answer record with "id"
+        state["answered"].append({
+            "id": question_id,
+            "sub_skill": sub_skill,
+            "difficulty": difficulty,
+            "selected": selected,
+            "answer": correct,
+            "was_correct": was_correct,
+        })
+        _answered_ids(state)[question_id] = 1
+        return state
 
-    ACTIVE_SESSIONS[session_id] = session
+    if SESSIONS.update(session_id, record) is None:
+        raise ValueError("Session not found")
     return {"status": "recorded", "next_difficulty": new_diff}
 
 
@@ -110,14 +233,17 @@ def record_answer(session_id: str, question_id: str, selected: str, correct: str
 # 🧾 End session + get responses
 # ------------------------------------------------------------
 def close_session(session_id: str) -> Dict:
-    session = ACTIVE_SESSIONS.get(session_id)
+    def complete(state):
+        state["completed"] = True
+        return state
+
+    session = SESSIONS.update(session_id, complete)
     if not session:
         raise ValueError("Session not found")
 
-    session["completed"] = True
     return {
         "user_id": session["user_id"],
-        "session_id": session["session_id"],
+        "session_id": session_id,
         "responses": session["answered"],
         "subskill_states": session["subskill_states"]
     }
@@ -127,7 +253,6 @@ def close_session(session_id: str) -> Dict:
 # 🧹 Remove session
 # ------------------------------------------------------------
 def remove_session(session_id: str):
-    if session_id in ACTIVE_SESSIONS:
-        del ACTIVE_SESSIONS[session_id]
+    if SESSIONS.delete(session_id):
         return {"status": "deleted"}
     return {"error": "Session not found"}
@@ -0,0 +1,230 @@
+"""
+similarity_matrix.py
+-----------------------------------
+Precomputed career × sub-skill relevance for the
+Problem-Solving Adaptive Assessment Engine.
+
+Offline (build_similarity_matrix.py), every career in CAREER_CATEGORY_MAP
+and every sub-skill in the question datasets is turned into a TF-IDF
+vector over words and character 3–5-grams — the career from its title,
+the sub-skill from its name plus the keywords of its questions — and
+their cosine similarities are saved as one float32 matrix (.npy) with a
+JSON index of its rows and columns. Character n-grams let related word
+forms meet ("Statistician" ~ "statistical", "Analyst" ~ "analytical")
+without any embedding model or network access.
+
+At request time the matrix is memory-mapped and a career's sub-skill
+weights are one row lookup (see semantic_weighting.compute_subskill_weights).
+
+Files (SUBSKILL_MATRIX_PATH, default data/subskill_similarity.npy):
+    subskill_similarity.npy   float32 [careers, sub-skills]
+    subskill_similarity.json  {"careers": [[title, category], ...],
+                               "sub_skills": [[category, sub_skill], ...], ...}
+"""
+
+import os
+import json
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from utils.constants import BASE_DIR, CAREER_CATEGORY_MAP
+from utils.dataset_registry import DATASETS
+from utils.text_preprocessor import tokenize_text
+
+# ------------------------------------------------------------
+# 🔧 Configuration
+# ------------------------------------------------------------
+SUBSKILL_MATRIX_PATH = os.getenv(
+    "SUBSKILL_MATRIX_PATH", os.path.join(BASE_DIR, "data", "subskill_similarity.npy")
+)
+NGRAM_RANGE = (3, 5)
+SUBSKILL_NAME_WEIGHT = 3.0  # a sub-skill's own name counts as much as three keywords
+
+
+# ------------------------------------------------------------
+# 🔤 TF-IDF Vectorizer (words + character n-grams)
+# ------------------------------------------------------------
+def extract_features(text: str) -> List[str]:
+    """Cleaned word tokens plus the character n-grams of each (padded) word."""
+    features = []
+    low, high = NGRAM_RANGE
+    for word in tokenize_text(text):
+        features.append("w:" + word)
+        padded = f" {word} "
+        for n in range(low, high + 1):
+            features.extend("c:" + padded[i:i + n] for i in range(len(padded) - n + 1))
+    return features
+
+
+def _term_counts(parts: List[Tuple[str, float]]) -> Dict[str, float]:
+    counts: Dict[str, float] = {}
+    for text, weight in parts:
+        for feature in extract_features(text):
+            counts[feature] = counts.get(feature, 0.0) + weight
+    return counts
+
+
+def _tfidf(docs: List[Dict[str, float]], vocab: Dict[str, int], idf: np.ndarray) -> np.ndarray:
+    """L2-normalized sublinear TF-IDF rows; features outside vocab are ignored."""
+    matrix = np.zeros((len(docs), len(vocab)), dtype=np.float64)
+    for row, counts in enumerate(docs):
+        for feature, tf in counts.items():
+            col = vocab.get(feature)
+            if col is not None:
+                matrix[row, col] = 1.0 + math.log(tf)
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+# ------------------------------------------------------------
+# 🏗️ Offline Build
+# ------------------------------------------------------------
+def build_similarity_matrix(careers: Optional[Dict[str, List[str]]] = None):
+    """
+    Builds the career × sub-skill cosine similarity matrix from the
+    question datasets. IDF is fitted on the sub-skill documents, so
+    words every sub-skill shares carry little weight.
+
+    Returns:
+        (matrix float32 [careers, sub-skills], careers [[title, category]],
+         sub_skills [[category, sub_skill]])
+    """
+    careers = careers or CAREER_CATEGORY_MAP
+    sub_skills, sub_docs = [], []
+    for category in careers:
+        for sub, questions in DATASETS.get(category).by_sub_skill.items():
+            sub_skills.append([category, sub])
+            parts = [(sub, SUBSKILL_NAME_WEIGHT)]
+            parts.extend((keyword, 1.0) for q in questions for keyword in q.get("keywords") or ())
+            sub_docs.append(_term_counts(parts))
+
+    career_rows = [[title, category] for category, titles in careers.items() for title in titles]
+    career_docs = [_term_counts([(title, 1.0)]) for title, _ in career_rows]
+
+    vocab: Dict[str, int] = {}
+    for counts in sub_docs:
+        for feature in counts:
+            vocab.setdefault(feature, len(vocab))
+    df = np.zeros(len(vocab))
+    for counts in sub_docs:
+        df[[vocab[f] for f in counts]] += 1
+    idf = np.log((1 + len(sub_docs)) / (1 + df)) + 1
+
+    similarity = _tfidf(career_docs, vocab, idf) @ _tfidf(sub_docs, vocab, idf).T
+    return similarity.astype(np.float32), career_rows, sub_skills
+
+
+def save_similarity_matrix(matrix: np.ndarray, careers: List, sub_skills: List, path: str = SUBSKILL_MATRIX_PATH):
+    """
+    Writes the matrix (.npy) and its index (.json) next to each other. Both are
+    written to temp files and renamed into place, index first: running services
+    keep their mapping of the old file and pick up the new one when the .npy
+    changes (SimilarityMatrix.refresh).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    index = {
+        "vectorizer": {"ngram_range": list(NGRAM_RANGE), "subskill_name_weight": SUBSKILL_NAME_WEIGHT},
+        "careers": careers,
+        "sub_skills": sub_skills,
+    }
+    with open(_index_path(path) + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    with open(path + ".tmp", "wb") as f:
+        np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+    os.replace(_index_path(path) + ".tmp", _index_path(path))
+    os.replace(path + ".tmp", path)
+
+
+def _index_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+# ------------------------------------------------------------
+# 📈 Request-time Lookup (memory-mapped)
+# ------------------------------------------------------------
+class SimilarityMatrix:
+    """
+    Lazily memory-maps the saved matrix; refresh() reloads it when the file
+    changes. similarities() returns None when the matrix is missing or
+    doesn't cover the career / sub-skills, so callers can fall back.
+    """
+
+    def __init__(self, path: str = SUBSKILL_MATRIX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # (mtime_ns, matrix, row by career, column by (category, sub), resolved lookups);
+        # matrix is None when unavailable
+        self._loaded = None
+
+    def similarities(self, career: str, subskills: List[str]) -> Optional[Tuple[float, ...]]:
+        """Career's similarity to each sub-skill, in the given order (cached per career and sub-skill list)."""
+        loaded = self._loaded or self._load()
+        if loaded[1] is None:
+            return None
+        resolved = loaded[4]
+        key = (career.lower().strip(), tuple(subskills))
+        if key not in resolved:
+            resolved[key] = self._resolve(loaded, *key)
+        return resolved[key]
+
+    def shape(self) -> Optional[Tuple[int, int]]:
+        loaded = self._loaded or self._load()
+        return None if loaded[1] is None else loaded[1].shape
+
+    def refresh(self) -> bool:
+        """Drops the mapping if the matrix file changed, so the next lookup loads the new one."""
+        loaded = self._loaded
+        if loaded is None or _mtime_ns(self.path) == loaded[0]:
+            return False
+        with self._lock:
+            self._loaded = None
+        return True
+
+    @staticmethod
+    def _resolve(loaded, career: str, subskills: tuple):
+        _, matrix, rows, columns, _ = loaded
+        match = rows.get(career)
+        if match is None:
+            return None
+        row, category = match
+        cols = [columns.get((category, sub)) for sub in subskills]
+        if None in cols:
+            return None  # datasets changed since the build: rebuild the matrix
+        return tuple(matrix[row, cols].tolist())
+
+    def _load(self):
+        with self._lock:
+            if self._loaded is not None:
+                return self._loaded
+            mtime_ns = _mtime_ns(self.path)
+            try:
+                with open(_index_path(self.path), "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                matrix = np.load(self.path, mmap_mode="r")
+                if matrix.shape != (len(index["careers"]), len(index["sub_skills"])):
+                    raise ValueError(f"shape {matrix.shape} doesn't match its index")
+            except (OSError, ValueError, KeyError) as e:
+                # reported once per file version; refresh() retries when the file changes
+                print(f"⚠️ Sub-skill similarity matrix unavailable ({e}); using keyword weighting")
+                self._loaded = (mtime_ns, None, None, None, None)
+                return self._loaded
+            rows = {title.lower().strip(): (i, category) for i, (title, category) in enumerate(index["careers"])}
+            columns = {(category, sub): j for j, (category, sub) in enumerate(index["sub_skills"])}
+            self._loaded = (mtime_ns, matrix, rows, columns, {})
+            return self._loaded
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+# ------------------------------------------------------------
+# 🌐 Process-wide Matrix
+# ------------------------------------------------------------
+SUBSKILL_MATRIX = SimilarityMatrix()
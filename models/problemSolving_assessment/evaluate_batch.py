@@ -0,0 +1,116 @@
+"""
+evaluate_batch.py
+-----------------------------------
+Offline re-scoring of stored problem-solving sessions with the
+vectorized batch evaluator (engine/batch_evaluator.py).
+
+Input (by extension):
+    .jsonl  one session per line: {"session_id": ..., "responses": [...]}
+            (a bare list of responses is also accepted; its line number is the ID)
+    .json   columnar: {"session_id": [...], "sub_skill": [...], "difficulty": [...],
+                       "selected": [...], "answer": [...]}
+
+Output: one JSON line per session, {"session_id": ..., "summary": {...}}
+(or "error"), identical to running evaluate_quiz on each session.
+
+Run from the service directory:
+    python evaluate_batch.py sessions.jsonl --out rescored.jsonl
+    python evaluate_batch.py sessions.jsonl --check      # also verify against evaluate_quiz
+"""
+
+import argparse
+import json
+import sys
+import time
+from itertools import islice
+
+from engine.batch_evaluator import evaluate_sessions, evaluate_columns
+from engine.evaluator import evaluate_quiz
+
+
+# ------------------------------------------------------------
+# 📥 Input Readers
+# ------------------------------------------------------------
+def read_jsonl_chunks(path: str, chunk_size: int):
+    with open(path, "r", encoding="utf-8") as f:
+        lines = ((n, line) for n, line in enumerate(f, 1) if line.strip())
+        while True:
+            chunk = []
+            for n, line in islice(lines, chunk_size):
+                record = json.loads(line)
+                if isinstance(record, list):
+                    chunk.append((n, record))
+                else:
+                    chunk.append((record.get("session_id", n), record.get("responses") or []))
+            if not chunk:
+                return
+            yield chunk
+
+
+def _columns_to_sessions(columns):
+    """Columnar rows regrouped as (session_id, responses), for --check."""
+    fields = [k for k in ("sub_skill", "difficulty", "selected", "answer") if k in columns]
+    sessions = {}
+    for i, session_id in enumerate(columns["session_id"]):
+        sessions.setdefault(session_id, []).append({k: columns[k][i] for k in fields})
+    return list(sessions.items())
+
+
+def _reference(session_id, responses):
+    try:
+        return {"session_id": session_id, "summary": evaluate_quiz(responses)}
+    except ValueError as e:
+        return {"session_id": session_id, "error": str(e)}
+
+
+# ------------------------------------------------------------
+# 🚀 Main
+# ------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help=".jsonl sessions or .json columnar responses")
+    parser.add_argument("--out", help="output JSONL (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="sessions scored per batch (.jsonl)")
+    parser.add_argument("--check", action="store_true", help="compare every session with evaluate_quiz")
+    args = parser.parse_args()
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    started = time.perf_counter()
+    sessions = mismatches = 0
+    scoring = 0.0
+    try:
+        if args.input.endswith(".json"):
+            with open(args.input, "r", encoding="utf-8") as f:
+                columns = json.load(f)
+            chunks = [columns]
+            evaluate = evaluate_columns
+        else:
+            chunks = read_jsonl_chunks(args.input, args.chunk_size)
+            evaluate = evaluate_sessions
+
+        for chunk in chunks:
+            t0 = time.perf_counter()
+            results = evaluate(chunk)
+            scoring += time.perf_counter() - t0
+            if args.check:
+                reference = _columns_to_sessions(chunk) if evaluate is evaluate_columns else chunk
+                for (session_id, responses), result in zip(reference, results):
+                    if _reference(session_id, responses) != result:
+                        mismatches += 1
+                        print(f"❌ Mismatch for session {session_id}", file=sys.stderr)
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+            sessions += len(results)
+    finally:
+        if args.out:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Scored {sessions} sessions in {elapsed:.2f}s ({scoring:.2f}s scoring, the rest JSON I/O)", file=sys.stderr)
+    if args.check:
+        print(f"🔍 {mismatches} mismatch(es) against evaluate_quiz", file=sys.stderr)
+        sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+dataset_registry.py
+-----------------------------------
+In-memory registry of the category question datasets used by the
+Problem-Solving Adaptive Assessment Engine.
+
+Each category file is read, validated and indexed once; quiz generation
+and session lookups then work from the cached indexes without touching
+the disk. refresh() re-reads only the files whose modification time has
+changed (the service calls it periodically), so dataset edits go live
+without a restart.
+
+Indexes (read-only — question dicts are shared, never mutate them):
+ - questions:     tuple of valid questions, in file order
+ - by_id:         id → question
+ - by_sub_skill:  sub_skill → tuple of questions
+ - by_difficulty: sub_skill → difficulty → tuple of questions
+"""
+
+import os
+import threading
+from types import MappingProxyType
+from typing import Dict, Optional
+from utils.constants import CAREER_CATEGORY_MAP, get_dataset_path
+from utils.data_loader import load_category_file
+
+
+# ------------------------------------------------------------
+# 📦 One Loaded Category Dataset
+# ------------------------------------------------------------
+class CategoryDataset:
+    """Immutable, indexed snapshot of one category file."""
+
+    __slots__ = ("category", "mtime_ns", "questions", "by_id", "by_sub_skill", "by_difficulty")
+
+    def __init__(self, category: str, questions: list, mtime_ns: int):
+        self.category = category
+        self.mtime_ns = mtime_ns
+        self.questions = tuple(questions)
+
+        by_sub_skill, by_difficulty = {}, {}
+        for q in self.questions:
+            sub = q.get("sub_skill", "General")
+            by_sub_skill.setdefault(sub, []).append(q)
+            by_difficulty.setdefault(sub, {}).setdefault(q["difficulty"], []).append(q)
+
+        self.by_id = MappingProxyType({q["id"]: q for q in self.questions})
+        self.by_sub_skill = MappingProxyType({sub: tuple(qs) for sub, qs in by_sub_skill.items()})
+        self.by_difficulty = MappingProxyType({
+            sub: MappingProxyType({d: tuple(qs) for d, qs in levels.items()})
+            for sub, levels in by_difficulty.items()
+        })
+
+
+# ------------------------------------------------------------
+# 🗂️ Registry of All Categories
+# ------------------------------------------------------------
+class DatasetRegistry:
+    def __init__(self, categories=None):
+        self.categories = tuple(categories or CAREER_CATEGORY_MAP.keys())
+        self._datasets: Dict[str, CategoryDataset] = {}
+        self._lock = threading.Lock()
+
+    def get(self, category: str) -> CategoryDataset:
+        """
+        Returns the cached dataset for a category, loading it on first use.
+        Raises the loader's FileNotFoundError / ValueError if it cannot be loaded.
+        """
+        dataset = self._datasets.get(category)
+        if dataset is None:
+            with self._lock:
+                dataset = self._datasets.get(category)
+                if dataset is None:
+                    dataset = self._load(category)
+        return dataset
+
+    def load_all(self):
+        """Loads every known category (skipping ones that fail) and returns how many loaded."""
+        loaded = 0
+        for category in self.categories:
+            try:
+                self.get(category)
+                loaded += 1
+            except (FileNotFoundError, ValueError) as e:
+                print(f"⚠️ Dataset '{category}' not loaded: {e}")
+        return loaded
+
+    def refresh(self):
+        """
+        Reloads datasets whose file changed since they were loaded.
+        A file that fails to load keeps serving its previous version.
+        """
+        reloaded = []
+        for category, dataset in list(self._datasets.items()):
+            mtime_ns = _mtime_ns(category)
+            if mtime_ns is None or mtime_ns == dataset.mtime_ns:
+                continue
+            with self._lock:
+                if self._datasets.get(category) is not dataset:
+                    continue
+                try:
+                    self._load(category)
+                    reloaded.append(category)
+                    print(f"🔄 Reloaded dataset '{category}'")
+                except (FileNotFoundError, ValueError) as e:
+                    # don't retry the same broken file every tick
+                    self._datasets[category] = _with_mtime(dataset, mtime_ns)
+                    print(f"⚠️ Keeping previous '{category}' dataset: {e}")
+        return reloaded
+
+    def _load(self, category: str) -> CategoryDataset:
+        # stat before reading so an edit landing mid-read is picked up by the next refresh
+        mtime_ns = _mtime_ns(category)
+        dataset = CategoryDataset(category, load_category_file(category), mtime_ns or 0)
+        self._datasets[category] = dataset
+        return dataset
+
+
+def _mtime_ns(category: str) -> Optional[int]:
+    try:
+        return os.stat(get_dataset_path(category)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _with_mtime(dataset: CategoryDataset, mtime_ns: int) -> CategoryDataset:
+    copy = CategoryDataset.__new__(CategoryDataset)
+    for name in CategoryDataset.__slots__:
+        setattr(copy, name, getattr(dataset, name))
+    copy.mtime_ns = mtime_ns
+    return copy
+
+
+# ------------------------------------------------------------
+# 🌐 Process-wide Registry
+# ------------------------------------------------------------
+DATASETS = DatasetRegistry()
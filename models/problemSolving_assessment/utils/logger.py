@@ -1,46 +1,228 @@
+"""
+logger.py
+-----------------------------------
+Structured, non-blocking logging for the
+Problem-Solving Adaptive Assessment Engine.
+
+Request handlers only put log records on an in-memory queue
+(QueueHandler); a background QueueListener thread formats them and
+does the disk / console I/O, so a slow disk never shows up in
+request latency.
+
+Handles:
+ - JSON-lines log file per day (LOG_DIR/engine_log_<YYYY-MM-DD>.jsonl); every
+   uvicorn worker appends to the same day's file and switches at midnight
+   without renaming anything, so workers can't rotate over each other
+ - Human-readable console output
+ - Per-level sampling of the per-question events (LOG_SAMPLE_RATES)
+ - Dropping records when the queue is full instead of blocking, counted in
+   problem_solving_log_records_dropped_total (/metrics)
+
+Environment:
+    LOG_DIR           log directory (default results/logs in the service directory)
+    LOG_LEVEL         minimum level (default INFO)
+    LOG_SAMPLE_RATES  e.g. "DEBUG=0.05,INFO=1" — share of per-question events kept
+    LOG_BACKUP_DAYS   daily files to keep (default 14)
+    LOG_QUEUE_SIZE    max queued records (default 10000)
+    LOG_CONSOLE       0 disables console output
+"""
+
 import os
-import datetime
+import json
+import atexit
+import queue
+import random
 import logging
+import logging.handlers
+from datetime import date, datetime, timedelta, timezone
+from utils.metrics import REGISTRY
+
+# ------------------------------------------------------------
+# 🔧 Configuration
+# ------------------------------------------------------------
+LOG_DIR = os.getenv(
+    "LOG_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "results", "logs")
+)
+os.makedirs(LOG_DIR, exist_ok=True)
+
+LOG_FILE_PREFIX = "engine_log_"
+LOG_FILE_SUFFIX = ".jsonl"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_BACKUP_DAYS = int(os.getenv("LOG_BACKUP_DAYS", "14"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_CONSOLE = os.getenv("LOG_CONSOLE", "1") != "0"
+
+
+def _parse_sample_rates(spec: str) -> dict:
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        level, _, rate = part.partition("=")
+        rates[logging.getLevelName(level.strip().upper())] = min(max(float(rate), 0.0), 1.0)
+    return rates
 
-LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "results", "logs")
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
 
-LOG_FILE = os.path.join(LOG_DIR, f"engine_log_{datetime.date.today()}.log")
+SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "DEBUG=0.05,INFO=1"))
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler()
-    ]
+
+# ------------------------------------------------------------
+# 🧾 Formatters (run on the listener thread)
+# ------------------------------------------------------------
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, event, message plus the event's fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "event": getattr(record, "event", "message"),
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "problem_solving_log_records_dropped_total", "Log records dropped because the log queue was full."
 )
 
+
+class DailyFileHandler(logging.FileHandler):
+    """
+    Appends to LOG_DIR/engine_log_<local date>.jsonl and opens the next day's
+    file at midnight. Files are never renamed, so any number of worker
+    processes can share the directory; files older than `backup_days` are
+    deleted when the day changes.
+    """
+
+    def __init__(self, directory: str, backup_days: int = LOG_BACKUP_DAYS):
+        self.directory = directory
+        self.backup_days = backup_days
+        self.day = date.today()
+        super().__init__(self._path(self.day), encoding="utf-8", delay=True)
+
+    def _path(self, day: date) -> str:
+        return os.path.join(self.directory, f"{LOG_FILE_PREFIX}{day.isoformat()}{LOG_FILE_SUFFIX}")
+
+    def emit(self, record):
+        day = date.fromtimestamp(record.created)
+        if day != self.day:
+            self.day = day
+            self.close()
+            self.baseFilename = self._path(day)
+            self._prune(day)
+        super().emit(record)
+
+    def _prune(self, today: date):
+        cutoff = (today - timedelta(days=self.backup_days)).isoformat()
+        for name in os.listdir(self.directory):
+            if not (name.startswith(LOG_FILE_PREFIX) and name.endswith(LOG_FILE_SUFFIX)):
+                continue
+            if name[len(LOG_FILE_PREFIX):-len(LOG_FILE_SUFFIX)] < cutoff:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass  # another worker pruned it first
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the queue is full the record is dropped and counted."""
+
+    def prepare(self, record):
+        # the record is ours alone (single handler, no propagation): queue it as is and
+        # leave message formatting to the listener thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+# ------------------------------------------------------------
+# 🚀 Pipeline Setup
+# ------------------------------------------------------------
+def _build_handlers():
+    file_handler = DailyFileHandler(LOG_DIR)
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+    if LOG_CONSOLE:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
+        handlers.append(console)
+    return handlers
+
+
+_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_listener = logging.handlers.QueueListener(_queue, *_build_handlers(), respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
 logger = logging.getLogger("AdaptiveEngineLogger")
+logger.setLevel(LOG_LEVEL)
+logger.addHandler(_DroppingQueueHandler(_queue))
+logger.propagate = False
 
+
+def _log(level: int, event: str, message: str, **fields):
+    if not logger.isEnabledFor(level):
+        return
+    # built directly rather than via logger.log(), which walks the stack for a caller we don't log
+    record = logger.makeRecord(logger.name, level, __name__, 0, message, None, None,
+                               extra={"event": event, "fields": fields})
+    logger.handle(record)
+
+
+def _log_sampled(level: int, event: str, message: str, **fields):
+    # per-question events: decide before building the record, so a skipped event costs one random()
+    if logger.isEnabledFor(level) and random.random() < SAMPLE_RATES.get(level, 1.0):
+        _log(level, event, message, sampled=True, **fields)
+
+
+# ------------------------------------------------------------
+# 🧩 Engine Events
+# ------------------------------------------------------------
 # ✅ make sure these exist exactly
 def log_startup():
-    logger.info("🚀 Problem-Solving Adaptive Engine initialized successfully.")
+    _log(logging.INFO, "startup", "🚀 Problem-Solving Adaptive Engine initialized successfully.")
 
 def log_generation_start(user_id: str, career: str):
-    logger.info(f"🧠 Generating quiz for User: {user_id} | Career: {career}")
+    _log(logging.INFO, "generation_start", f"🧠 Generating quiz for User: {user_id} | Career: {career}",
+         user_id=user_id, career=career)
 
 def log_question_selected(question_id: str, sub_skill: str, difficulty: str):
-    logger.info(f"📘 Selected Question {question_id} | Sub-skill: {sub_skill} | Difficulty: {difficulty}")
+    _log_sampled(logging.INFO, "question_selected",
+                 f"📘 Selected Question {question_id} | Sub-skill: {sub_skill} | Difficulty: {difficulty}",
+                 question_id=question_id, sub_skill=sub_skill, difficulty=difficulty)
 
 def log_difficulty_update(sub_skill: str, previous: str, new: str, was_correct: bool):
     status = "✅ Correct" if was_correct else "❌ Incorrect"
-    logger.info(f"{status} | {sub_skill}: Difficulty changed {previous} → {new}")
+    _log_sampled(logging.INFO, "difficulty_update", f"{status} | {sub_skill}: Difficulty changed {previous} → {new}",
+                 sub_skill=sub_skill, previous=previous, new=new, was_correct=was_correct)
+
+def log_answer_received(request: dict):
+    _log_sampled(logging.DEBUG, "answer_received", f"🟢 Received Answer Request: {request}", **request)
+
+def log_next_question(question: dict):
+    _log_sampled(logging.DEBUG, "next_question", f"🟣 Next question: {question.get('id')}", question=question)
 
 def log_session_created(session_id: str, user_id: str):
-    logger.info(f"🧾 Session Created | ID: {session_id} | User: {user_id}")
+    _log(logging.INFO, "session_created", f"🧾 Session Created | ID: {session_id} | User: {user_id}",
+         session_id=session_id, user_id=user_id)
 
 def log_session_closed(session_id: str, total_responses: int):
-    logger.info(f"📊 Session Closed | ID: {session_id} | Responses: {total_responses}")
+    _log(logging.INFO, "session_closed", f"📊 Session Closed | ID: {session_id} | Responses: {total_responses}",
+         session_id=session_id, responses=total_responses)
+
+def log_result_queued(session_id: str):
+    _log(logging.INFO, "result_queued", f"📤 Result queued for Node backend | Session: {session_id}",
+         session_id=session_id)
 
 def log_error(message: str):
-    logger.error(f"❌ ERROR: {message}")
+    _log(logging.ERROR, "error", f"❌ ERROR: {message}")
 
 def log_warning(message: str):
-    logger.warning(f"⚠️ WARNING: {message}")
+    _log(logging.WARNING, "warning", f"⚠️ WARNING: {message}")
@@ -0,0 +1,266 @@
+"""
+result_outbox.py
+-----------------------------------
+Outbound delivery queue for finished quiz results.
+
+The /answer route spools each result to a local SQLite file (WAL, shared
+by all workers on the host) and returns immediately; a background task
+in every worker claims due rows and POSTs them to the Node backend over
+one pooled async HTTP client, retrying failures with exponential backoff.
+
+Handles:
+ - Durable spooling (results survive restarts and backend outages)
+ - Batching: with RESULT_BATCH_ENDPOINT set, due results are sent as one
+   {"results": [...]} request; otherwise they are sent concurrently
+ - Retry with capped, jittered backoff; 4xx responses (other than 408/429)
+   and rows past RESULT_MAX_ATTEMPTS are parked as dead, not dropped
+ - Queue depth / delivery latency metrics (served at /metrics)
+
+Delivery is at-least-once: a worker that dies mid-send leaves its claimed
+rows to be retried by any worker once their lease runs out.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from utils.metrics import REGISTRY
+
+import httpx
+
+# ------------------------------------------------------------
+# 🔧 Configuration
+# ------------------------------------------------------------
+RESULT_OUTBOX_PATH = Path(os.getenv(
+    "RESULT_OUTBOX_PATH",
+    Path(__file__).parent.parent / "data" / "result_outbox.sqlite3"
+))
+RESULT_BATCH_ENDPOINT = os.getenv("RESULT_BATCH_ENDPOINT", "")
+RESULT_BATCH_SIZE = int(os.getenv("RESULT_BATCH_SIZE", "20"))
+RESULT_MAX_ATTEMPTS = int(os.getenv("RESULT_MAX_ATTEMPTS", "8"))
+RESULT_TIMEOUT_SECONDS = float(os.getenv("RESULT_TIMEOUT_SECONDS", "10"))
+RESULT_MAX_CONNECTIONS = int(os.getenv("RESULT_MAX_CONNECTIONS", "10"))
+RESULT_RETRY_BASE_SECONDS = float(os.getenv("RESULT_RETRY_BASE_SECONDS", "1"))
+RESULT_RETRY_MAX_SECONDS = float(os.getenv("RESULT_RETRY_MAX_SECONDS", "300"))
+RESULT_POLL_SECONDS = float(os.getenv("RESULT_POLL_SECONDS", "2"))
+RESULT_LEASE_SECONDS = float(os.getenv("RESULT_LEASE_SECONDS", "60"))
+
+# ------------------------------------------------------------
+# 📊 Metrics
+# ------------------------------------------------------------
+OUTBOX_DEPTH = REGISTRY.gauge(
+    "problem_solving_result_outbox_depth", "Results in the delivery spool, by state (pending or dead)."
+)
+DELIVERY_LATENCY = REGISTRY.histogram(
+    "problem_solving_result_delivery_seconds", "Time from spooling a result to the backend accepting it.",
+    buckets=(0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 1800.0, 3600.0),
+)
+POST_LATENCY = REGISTRY.histogram(
+    "problem_solving_result_post_duration_seconds", "Backend save-result call latency, by mode and outcome."
+)
+DELIVERIES = REGISTRY.counter(
+    "problem_solving_result_deliveries_total", "Result delivery attempts, by outcome (delivered, retry, dead)."
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    token TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    dead INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (dead, next_attempt_at);
+"""
+
+
+# ------------------------------------------------------------
+# 📤 Result Outbox
+# ------------------------------------------------------------
+class ResultOutbox:
+    def __init__(self, endpoint: str, path: Path = RESULT_OUTBOX_PATH, batch_endpoint: str = RESULT_BATCH_ENDPOINT,
+                 batch_size: int = RESULT_BATCH_SIZE, max_attempts: int = RESULT_MAX_ATTEMPTS):
+        self.endpoint = endpoint
+        self.batch_endpoint = batch_endpoint
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._refresh_depth()
+
+    # --------------------------------------------------------
+    # Spool side (called from request handlers)
+    # --------------------------------------------------------
+    def enqueue(self, payload: Dict, token: str = "") -> int:
+        """Spools one result for delivery and wakes this worker's sender."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO outbox (payload, token, created_at, next_attempt_at) VALUES (?, ?, ?, ?)",
+                (json.dumps(payload, separators=(",", ":")), token or "", now, now),
+            )
+        OUTBOX_DEPTH.inc(state="pending")
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return cur.lastrowid
+
+    def depth(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT dead, COUNT(*) FROM outbox GROUP BY dead").fetchall()
+        counts = dict(rows)
+        return {"pending": counts.get(0, 0), "dead": counts.get(1, 0)}
+
+    def _refresh_depth(self):
+        for state, n in self.depth().items():
+            OUTBOX_DEPTH.set(n, state=state)
+
+    # --------------------------------------------------------
+    # Claim / acknowledge (short transactions, run in a thread)
+    # --------------------------------------------------------
+    def _claim(self, limit: int) -> List[tuple]:
+        # leased rows are invisible to other workers until delivered or the lease runs out
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                rows = self._conn.execute(
+                    "SELECT id, payload, token, created_at, attempts FROM outbox "
+                    "WHERE dead = 0 AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                        [(now + RESULT_LEASE_SECONDS, r[0]) for r in rows],
+                    )
+                self._conn.execute("COMMIT")
+                return rows
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _settle(self, delivered: List[int], failed: List[tuple]):
+        """Deletes delivered rows; reschedules failed ones as (row, error, permanent)."""
+        now = time.time()
+        with self._lock:
+            if delivered:
+                self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in delivered])
+            for (row_id, _, _, _, attempts), error, permanent in failed:
+                attempts += 1
+                dead = permanent or attempts >= self.max_attempts
+                delay = min(RESULT_RETRY_BASE_SECONDS * 2 ** (attempts - 1), RESULT_RETRY_MAX_SECONDS)
+                self._conn.execute(
+                    "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?, dead = ? WHERE id = ?",
+                    (attempts, now + delay * random.uniform(0.8, 1.2), error[:500], int(dead), row_id),
+                )
+                DELIVERIES.inc(outcome="dead" if dead else "retry")
+                if dead:
+                    print(f"❌ Result {row_id} parked after {attempts} attempt(s): {error}")
+        self._refresh_depth()
+
+    # --------------------------------------------------------
+    # Sender side (background task)
+    # --------------------------------------------------------
+    async def deliver_due(self, client: httpx.AsyncClient) -> int:
+        """Sends one batch of due results; returns how many rows were claimed."""
+        rows = await asyncio.to_thread(self._claim, self.batch_size)
+        if not rows:
+            return 0
+
+        if self.batch_endpoint and len(rows) > 1:
+            by_token: Dict[str, List[tuple]] = {}
+            for row in rows:
+                by_token.setdefault(row[2], []).append(row)
+            outcomes = await asyncio.gather(*(self._post_batch(client, group) for group in by_token.values()))
+        else:
+            outcomes = await asyncio.gather(*(self._post_one(client, row) for row in rows))
+
+        delivered, failed = [], []
+        for ok_ids, failures in outcomes:
+            delivered.extend(ok_ids)
+            failed.extend(failures)
+        await asyncio.to_thread(self._settle, delivered, failed)
+        return len(rows)
+
+    async def _post_one(self, client, row):
+        payload = json.loads(row[1])
+        return await self._post(client, self.endpoint, payload, [row], "single")
+
+    async def _post_batch(self, client, rows):
+        payload = {"results": [json.loads(r[1]) for r in rows]}
+        delivered, failed = await self._post(client, self.batch_endpoint, payload, rows, "batch")
+        if failed and failed[0][2]:
+            # a rejected batch is resent one by one so a single bad result can't park the rest
+            outcomes = await asyncio.gather(*(self._post_one(client, row) for row in rows))
+            delivered = [i for ok_ids, _ in outcomes for i in ok_ids]
+            failed = [f for _, failures in outcomes for f in failures]
+        return delivered, failed
+
+    async def _post(self, client, url, payload, rows, mode):
+        headers = {"Authorization": f"Bearer {rows[0][2]}"} if rows[0][2] else {}
+        start = time.perf_counter()
+        try:
+            response = await client.post(url, json=payload, headers=headers)
+        except httpx.HTTPError as e:
+            POST_LATENCY.observe(time.perf_counter() - start, mode=mode, outcome="error")
+            return [], [(row, f"{type(e).__name__}: {e}", False) for row in rows]
+
+        status = response.status_code
+        POST_LATENCY.observe(time.perf_counter() - start, mode=mode, outcome=str(status))
+        if 200 <= status < 300:
+            now = time.time()
+            for row in rows:
+                DELIVERY_LATENCY.observe(now - row[3])
+            DELIVERIES.inc(len(rows), outcome="delivered")
+            return [row[0] for row in rows], []
+
+        error = f"HTTP {status}: {response.text[:200]}"
+        permanent = 400 <= status < 500 and status not in (408, 429)
+        return [], [(row, error, permanent) for row in rows]
+
+    async def run(self):
+        """Delivery loop for the service lifespan; cancel the task to stop it."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        limits = httpx.Limits(max_connections=RESULT_MAX_CONNECTIONS, max_keepalive_connections=RESULT_MAX_CONNECTIONS)
+        async with httpx.AsyncClient(timeout=RESULT_TIMEOUT_SECONDS, limits=limits) as client:
+            errors = 0
+            while True:
+                # cleared before claiming, so a result spooled mid-send still wakes the next wait
+                self._wakeup.clear()
+                try:
+                    claimed = await self.deliver_due(client)
+                    errors = 0
+                except Exception as e:
+                    # anything unexpected (SQLite, a bad endpoint URL, ...) must not end the loop;
+                    # rows claimed by the failed pass come back once their lease runs out
+                    errors += 1
+                    delay = min(RESULT_RETRY_BASE_SECONDS * 2 ** (errors - 1), RESULT_RETRY_MAX_SECONDS)
+                    print(f"⚠️ Result outbox error ({type(e).__name__}: {e}); retrying in {delay:g}s")
+                    await asyncio.sleep(delay)
+                    continue
+                if claimed >= self.batch_size:
+                    continue  # more may be due right now
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), RESULT_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    await asyncio.to_thread(self._refresh_depth)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,63 @@
+"""
+sync_shared_utils.py
+-----------------------------------
+Keeps the utility modules shared by the assessment services identical.
+
+Each service runs and ships on its own from its directory (`uvicorn app:app`,
+imports as `utils.<module>`), so there is no common package to install;
+the shared modules are copied into every service's utils/ that uses them.
+Edit the copy in the first listed service, then run from models/:
+
+    python sync_shared_utils.py           # copy it to the other services
+    python sync_shared_utils.py --check   # exit 1 if any copy has drifted
+"""
+
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# module → services carrying a copy; the first is the one to edit
+SHARED_MODULES = {
+    "llm_client.py": ["analytical-assessment", "leadership-assessment"],
+    "llm_backend.py": ["analytical-assessment", "leadership-assessment"],
+    "fake_llm.py": ["analytical-assessment", "leadership-assessment"],
+    "metrics.py": ["analytical-assessment", "leadership-assessment", "problemSolving_assessment"],
+    "session_backend.py": ["analytical-assessment", "leadership-assessment", "problemSolving_assessment"],
+}
+
+
+def drifted():
+    """(source, copy) path pairs whose contents differ."""
+    pairs = []
+    for module, services in SHARED_MODULES.items():
+        source = os.path.join(ROOT, services[0], "utils", module)
+        for service in services[1:]:
+            copy = os.path.join(ROOT, service, "utils", module)
+            if not os.path.exists(copy) or not filecmp.cmp(source, copy, shallow=False):
+                pairs.append((source, copy))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only report drifted copies")
+    args = parser.parse_args()
+
+    pairs = drifted()
+    for source, copy in pairs:
+        if args.check:
+            print(f"❌ {os.path.relpath(copy, ROOT)} differs from {os.path.relpath(source, ROOT)}")
+        else:
+            shutil.copyfile(source, copy)
+            print(f"🔄 {os.path.relpath(source, ROOT)} → {os.path.relpath(copy, ROOT)}")
+    if not pairs:
+        print(f"✅ {len(SHARED_MODULES)} shared modules in sync")
+    sys.exit(1 if args.check and pairs else 0)
+
+
+if __name__ == "__main__":
+    main()